@@ -0,0 +1,36 @@
+"""Ensure date_received indexes used by the analytics range filters.
+
+Revision ID: 002_date_received_indexes
+Revises: 001_initial
+Create Date: 2026-10-17
+
+The analytics endpoints filter on a half-open ``[start, end)`` window over
+``date_received`` and group top senders inside that window. Both indexes are
+declared on the model, but databases created before they were added never
+got them from ``create_all``, so create them here if they are missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002_date_received_indexes"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_emails_date_received "
+        "ON emails (date_received)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_emails_sender_date "
+        "ON emails (sender, date_received)"
+    )
+
+
+def downgrade() -> None:
+    # Both indexes are part of the model schema; leave them in place.
+    pass
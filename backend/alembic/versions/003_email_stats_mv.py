@@ -0,0 +1,49 @@
+"""Add email_stats_mv materialized view for dashboard breakdowns.
+
+Revision ID: 003_email_stats_mv
+Revises: 002_date_received_indexes
+Create Date: 2026-10-17
+
+Pre-aggregates email counts per (year, month, category, sender) so the
+statistics endpoint can read its yearly/monthly/sender/category breakdowns
+without scanning ``emails``. The view is refreshed by the background sync
+service; the unique index is required for REFRESH ... CONCURRENTLY.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003_email_stats_mv"
+down_revision: Union[str, None] = "002_date_received_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS email_stats_mv AS
+        SELECT
+            EXTRACT(YEAR FROM date_received)::int AS year,
+            EXTRACT(MONTH FROM date_received)::int AS month,
+            category,
+            sender,
+            COUNT(*) AS email_count,
+            COUNT(*) FILTER (WHERE is_read) AS read_count,
+            COUNT(*) FILTER (WHERE NOT is_read) AS unread_count,
+            COUNT(*) FILTER (WHERE is_starred) AS starred_count,
+            COUNT(*) FILTER (WHERE is_important) AS important_count
+        FROM emails
+        GROUP BY 1, 2, 3, 4
+        WITH DATA
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_email_stats_mv_key "
+        "ON email_stats_mv (year, month, category, sender)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS email_stats_mv")
@@ -0,0 +1,78 @@
+"""Add trigger-maintained sender_counts table.
+
+Revision ID: 004_sender_counts
+Revises: 003_email_stats_mv
+Create Date: 2026-10-17
+
+Top-sender queries grouped every row of ``emails``. ``sender_counts`` keeps a
+running total per sender so the top-K becomes an index scan over a handful of
+rows. A row-level trigger maintains it, which also covers inserts that bypass
+the ORM (raw SQL, bulk loads).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004_sender_counts"
+down_revision: Union[str, None] = "003_email_stats_mv"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sender_counts (
+            sender VARCHAR(500) PRIMARY KEY,
+            count BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sender_counts_count "
+        "ON sender_counts (count DESC)"
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sender_counts_track() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.sender IS NOT NULL THEN
+                UPDATE sender_counts SET count = count - 1 WHERE sender = OLD.sender;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.sender IS NOT NULL THEN
+                INSERT INTO sender_counts (sender, count) VALUES (NEW.sender, 1)
+                ON CONFLICT (sender) DO UPDATE SET count = sender_counts.count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS emails_sender_counts ON emails")
+    op.execute(
+        """
+        CREATE TRIGGER emails_sender_counts
+        AFTER INSERT OR DELETE OR UPDATE OF sender ON emails
+        FOR EACH ROW EXECUTE FUNCTION sender_counts_track()
+        """
+    )
+
+    # Backfill from the existing mailbox; the table may already exist (and be
+    # empty) if create_all ran before this migration.
+    op.execute("TRUNCATE sender_counts")
+    op.execute(
+        """
+        INSERT INTO sender_counts (sender, count)
+        SELECT sender, COUNT(*) FROM emails
+        WHERE sender IS NOT NULL
+        GROUP BY sender
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS emails_sender_counts ON emails")
+    op.execute("DROP FUNCTION IF EXISTS sender_counts_track()")
+    op.execute("DROP TABLE IF EXISTS sender_counts")
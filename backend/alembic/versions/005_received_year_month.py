@@ -0,0 +1,42 @@
+"""Add generated received_year/received_month columns to emails.
+
+Revision ID: 005_received_year_month
+Revises: 004_sender_counts
+Create Date: 2026-10-17
+
+Yearly and monthly breakdowns grouped by EXTRACT(... FROM date_received),
+which no index can serve. Store the UTC year and month as generated columns
+and index them so the breakdowns group over an index instead. Adding a
+stored generated column rewrites the table once.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005_received_year_month"
+down_revision: Union[str, None] = "004_sender_counts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE emails
+            ADD COLUMN IF NOT EXISTS received_year SMALLINT GENERATED ALWAYS AS
+                (CAST(EXTRACT(YEAR FROM date_received AT TIME ZONE 'UTC') AS SMALLINT)) STORED,
+            ADD COLUMN IF NOT EXISTS received_month SMALLINT GENERATED ALWAYS AS
+                (CAST(EXTRACT(MONTH FROM date_received AT TIME ZONE 'UTC') AS SMALLINT)) STORED
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_emails_year_month "
+        "ON emails (received_year, received_month)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_emails_year_month")
+    op.execute("ALTER TABLE emails DROP COLUMN IF EXISTS received_month")
+    op.execute("ALTER TABLE emails DROP COLUMN IF EXISTS received_year")
@@ -0,0 +1,43 @@
+"""Add trigram and full-text indexes for /search/fast.
+
+Revision ID: 006_search_indexes
+Revises: 005_received_year_month
+Create Date: 2026-10-17
+
+Fast search matched ``ILIKE '%q%'`` against subject, sender and body, which
+scans the whole table. Trigram GIN indexes let Postgres answer the substring
+match on subject and sender from the index; the body is matched with a
+``simple`` full-text index instead, since a trigram index over full bodies
+would be far larger than the table it indexes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006_search_indexes"
+down_revision: Union[str, None] = "005_received_year_month"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_emails_subject_trgm "
+        "ON emails USING gin (subject gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_emails_sender_trgm "
+        "ON emails USING gin (sender gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_emails_body_fts "
+        "ON emails USING gin (to_tsvector('simple', coalesce(body_plain, '')))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_emails_body_fts")
+    op.execute("DROP INDEX IF EXISTS idx_emails_sender_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_emails_subject_trgm")
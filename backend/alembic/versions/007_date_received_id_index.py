@@ -0,0 +1,30 @@
+"""Add (date_received DESC, id DESC) index for keyset pagination.
+
+Revision ID: 007_date_received_id_index
+Revises: 006_search_indexes
+Create Date: 2026-10-17
+
+The fast listing endpoints page with a ``(date_received, id) < cursor``
+seek ordered by ``date_received DESC, id DESC``. This index serves that
+order directly, so each page reads only the rows it returns.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007_date_received_id_index"
+down_revision: Union[str, None] = "006_search_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_emails_date_received_id "
+        "ON emails (date_received DESC, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_emails_date_received_id")
@@ -0,0 +1,44 @@
+"""Add composite and partial indexes for the analytics filters.
+
+Revision ID: 008_analytics_indexes
+Revises: 007_date_received_id_index
+Create Date: 2026-10-17
+
+Per-sender read counts, the sentiment/priority breakdown and the unread
+listings each ended up in a sequential scan. The indexes are built
+CONCURRENTLY so an existing mailbox stays writable while the migration
+runs; that cannot happen inside a transaction, hence the autocommit block.
+date_received and category are already indexed (001/002).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008_analytics_indexes"
+down_revision: Union[str, None] = "007_date_received_id_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_sender_is_read "
+            "ON emails (sender, is_read)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_sentiment_priority "
+            "ON emails (sentiment_score, priority_score)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_unread_date "
+            "ON emails (date_received DESC) WHERE is_read = false"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_unread_date")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_sentiment_priority")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_sender_is_read")
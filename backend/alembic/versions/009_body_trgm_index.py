@@ -0,0 +1,35 @@
+"""Add a bounded trigram index over email bodies.
+
+Revision ID: 009_body_trgm_index
+Revises: 008_analytics_indexes
+Create Date: 2026-10-17
+
+Substring search over bodies (``ILIKE '%q%'``) could not use an index, so
+every search OR'ed a sequential scan into otherwise index-backed subject and
+sender matches. Index the first 4 KB of each body with trigrams: full bodies
+would make the index larger than the table, and the leading part of a body
+is where a searched phrase almost always appears.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009_body_trgm_index"
+down_revision: Union[str, None] = "008_analytics_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_body_trgm "
+            "ON emails USING gin ((LEFT(body_plain, 4096)) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_body_trgm")
@@ -0,0 +1,31 @@
+"""Index emails.created_at.
+
+Revision ID: 010_created_at_index
+Revises: 009_body_trgm_index
+Create Date: 2026-10-17
+
+The real-time sync status reports when the newest email was stored via
+MAX(created_at), which sorted the whole table without an index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010_created_at_index"
+down_revision: Union[str, None] = "009_body_trgm_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_created_at "
+            "ON emails (created_at)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_created_at")
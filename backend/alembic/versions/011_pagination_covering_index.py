@@ -0,0 +1,42 @@
+"""Replace the keyset pagination index with a covering one.
+
+Revision ID: 011_pagination_covering_index
+Revises: 010_created_at_index
+Create Date: 2026-10-17
+
+The listing endpoints select id, subject, sender, date_received, is_read and
+is_starred in (date_received DESC, id DESC) order. INCLUDE-ing those columns
+lets the scan that finds a page also return it; only the short body preview
+still needs the heap, for just the rows on the page. Bodies are too wide to
+include. Supersedes idx_emails_date_received_id from 007.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011_pagination_covering_index"
+down_revision: Union[str, None] = "010_created_at_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_date_id_cover "
+            "ON emails (date_received DESC, id DESC) "
+            "INCLUDE (subject, sender, is_read, is_starred)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_date_received_id")
+        # Index-only scans need an up-to-date visibility map
+        op.execute("VACUUM (ANALYZE) emails")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_date_received_id "
+            "ON emails (date_received DESC, id DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_date_id_cover")
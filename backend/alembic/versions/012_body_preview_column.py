@@ -0,0 +1,34 @@
+"""Add generated body_preview column to emails.
+
+Revision ID: 012_body_preview_column
+Revises: 011_pagination_covering_index
+Create Date: 2026-10-17
+
+Listings showed LEFT(body_plain, 200) for every row, which detoasts and
+decompresses each full body just to keep its first 200 characters. Store
+the preview as a generated column so listings read a short inline value.
+Adding a stored generated column rewrites the table once.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012_body_preview_column"
+down_revision: Union[str, None] = "011_pagination_covering_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE emails
+            ADD COLUMN IF NOT EXISTS body_preview VARCHAR(200)
+                GENERATED ALWAYS AS (LEFT(body_plain, 200)) STORED
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE emails DROP COLUMN IF EXISTS body_preview")
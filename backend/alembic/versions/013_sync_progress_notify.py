@@ -0,0 +1,56 @@
+"""Notify listeners on the sync_progress channel when a sync session changes.
+
+Revision ID: 013_sync_progress_notify
+Revises: 012_body_preview_column
+Create Date: 2026-10-17
+
+Clients polled /sync/progress and /sync/real-time-status every second or
+two to notice sync progress. A row-level trigger on ``sync_sessions`` now
+publishes each inserted or updated session with pg_notify, and
+/sync/stream forwards those notifications as server-sent events. Being a
+trigger, it also covers the sync process and scripts that write sessions
+with raw SQL. Notifications are delivered when the writing transaction
+commits.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013_sync_progress_notify"
+down_revision: Union[str, None] = "012_body_preview_column"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_sessions_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('sync_progress', json_build_object(
+                'id', NEW.id,
+                'status', NEW.status,
+                'emails_synced', NEW.emails_synced,
+                'emails_processed', NEW.emails_processed,
+                'started_at', NEW.started_at,
+                'completed_at', NEW.completed_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS sync_sessions_progress_notify ON sync_sessions")
+    op.execute(
+        """
+        CREATE TRIGGER sync_sessions_progress_notify
+        AFTER INSERT OR UPDATE ON sync_sessions
+        FOR EACH ROW EXECUTE FUNCTION sync_sessions_notify()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS sync_sessions_progress_notify ON sync_sessions")
+    op.execute("DROP FUNCTION IF EXISTS sync_sessions_notify()")
@@ -0,0 +1,40 @@
+"""Index the latest and active sync session lookups.
+
+Revision ID: 014_sync_sessions_indexes
+Revises: 013_sync_progress_notify
+Create Date: 2026-10-17
+
+/sync/progress, /sync/stream and the per-user status endpoints read the
+newest session with ORDER BY started_at DESC LIMIT 1. ``started_at`` is
+indexed on the model, but databases whose ``sync_sessions`` table predates
+that index never got it from ``create_all``, so create it here if it is
+missing; a backward scan of it answers the query without a sort. Active
+session lookups filter on status as well, so they get a partial index over
+in-flight sessions only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014_sync_sessions_indexes"
+down_revision: Union[str, None] = "013_sync_progress_notify"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_sync_sessions_started_at "
+        "ON sync_sessions (started_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sync_sessions_active_user_started "
+        "ON sync_sessions (user_id, started_at DESC) "
+        "WHERE status IN ('started', 'running')"
+    )
+
+
+def downgrade() -> None:
+    # ix_sync_sessions_started_at is part of the model schema; leave it in place.
+    op.execute("DROP INDEX IF EXISTS idx_sync_sessions_active_user_started")
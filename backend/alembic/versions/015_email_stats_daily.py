@@ -0,0 +1,50 @@
+"""Add email_stats_daily materialized view for per-day dashboard totals.
+
+Revision ID: 015_email_stats_daily
+Revises: 014_sync_sessions_indexes
+Create Date: 2026-10-17
+
+The overview, trends, detailed-trends and performance endpoints aggregated
+``emails`` on every request. This view keeps one row per UTC day with the
+email, flag and sentiment counts, so those endpoints sum a few hundred rows
+instead. Like email_stats_mv it is refreshed by the background sync
+service; the unique index is required for REFRESH ... CONCURRENTLY.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015_email_stats_daily"
+down_revision: Union[str, None] = "014_sync_sessions_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS email_stats_daily AS
+        SELECT
+            (date_received AT TIME ZONE 'UTC')::date AS day,
+            COUNT(*) AS email_count,
+            COUNT(*) FILTER (WHERE is_read) AS read_count,
+            COUNT(*) FILTER (WHERE NOT is_read) AS unread_count,
+            COUNT(*) FILTER (WHERE is_starred) AS starred_count,
+            COUNT(*) FILTER (WHERE is_important) AS important_count,
+            COUNT(*) FILTER (WHERE sentiment_score = 1) AS sentiment_positive,
+            COUNT(*) FILTER (WHERE sentiment_score = 0) AS sentiment_neutral,
+            COUNT(*) FILTER (WHERE sentiment_score = -1) AS sentiment_negative
+        FROM emails
+        GROUP BY 1
+        WITH DATA
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_email_stats_daily_day "
+        "ON email_stats_daily (day)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS email_stats_daily")
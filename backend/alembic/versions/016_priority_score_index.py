@@ -0,0 +1,34 @@
+"""Index emails.priority_score for priority range filters.
+
+Revision ID: 016_priority_score_index
+Revises: 015_email_stats_daily
+Create Date: 2026-10-17
+
+Search's priority_min/priority_max filters and the high-priority insight
+(priority_score >= 8) range over priority_score, which only appeared as
+the second column of idx_emails_sentiment_priority and so could not be
+range-scanned on its own. Built CONCURRENTLY, as in 008, so the mailbox
+stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "016_priority_score_index"
+down_revision: Union[str, None] = "015_email_stats_daily"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_emails_priority_score "
+            "ON emails (priority_score)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_emails_priority_score")
@@ -0,0 +1,93 @@
+"""Add trigger-maintained email_score_counts table.
+
+Revision ID: 017_email_score_counts
+Revises: 016_priority_score_index
+Create Date: 2026-10-17
+
+The sentiment, priority, categories and performance dashboards all derive
+their numbers from email counts per (category, sentiment_score,
+priority_score), which meant a GROUP BY over every row of ``emails``
+whenever the analytics cache expired. ``email_score_counts`` keeps that
+cube current, a few dozen rows, with a row-level trigger in the same way
+004 maintains sender_counts. NULL is a real bucket here (unanalysed
+emails), hence the NULLS NOT DISTINCT key, which needs PostgreSQL 15.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "017_email_score_counts"
+down_revision: Union[str, None] = "016_priority_score_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS email_score_counts (
+            id BIGSERIAL PRIMARY KEY,
+            category VARCHAR(100),
+            sentiment_score INTEGER,
+            priority_score INTEGER,
+            count BIGINT NOT NULL DEFAULT 0,
+            CONSTRAINT uq_email_score_counts_key
+                UNIQUE NULLS NOT DISTINCT (category, sentiment_score, priority_score)
+        )
+        """
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION email_score_counts_track() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND OLD.category IS NOT DISTINCT FROM NEW.category
+               AND OLD.sentiment_score IS NOT DISTINCT FROM NEW.sentiment_score
+               AND OLD.priority_score IS NOT DISTINCT FROM NEW.priority_score THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE email_score_counts SET count = count - 1
+                WHERE category IS NOT DISTINCT FROM OLD.category
+                  AND sentiment_score IS NOT DISTINCT FROM OLD.sentiment_score
+                  AND priority_score IS NOT DISTINCT FROM OLD.priority_score;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO email_score_counts (category, sentiment_score, priority_score, count)
+                VALUES (NEW.category, NEW.sentiment_score, NEW.priority_score, 1)
+                ON CONFLICT (category, sentiment_score, priority_score)
+                DO UPDATE SET count = email_score_counts.count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS emails_score_counts ON emails")
+    op.execute(
+        """
+        CREATE TRIGGER emails_score_counts
+        AFTER INSERT OR DELETE OR UPDATE OF category, sentiment_score, priority_score ON emails
+        FOR EACH ROW EXECUTE FUNCTION email_score_counts_track()
+        """
+    )
+
+    # Backfill from the existing mailbox; the table may already exist (and be
+    # empty) if create_all ran before this migration. Creating the trigger
+    # holds off concurrent writes to emails until this transaction commits.
+    op.execute("TRUNCATE email_score_counts")
+    op.execute(
+        """
+        INSERT INTO email_score_counts (category, sentiment_score, priority_score, count)
+        SELECT category, sentiment_score, priority_score, COUNT(*) FROM emails
+        GROUP BY category, sentiment_score, priority_score
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS emails_score_counts ON emails")
+    op.execute("DROP FUNCTION IF EXISTS email_score_counts_track()")
+    op.execute("DROP TABLE IF EXISTS email_score_counts")
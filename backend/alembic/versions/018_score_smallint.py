@@ -0,0 +1,67 @@
+"""Store sentiment_score and priority_score as SMALLINT.
+
+Revision ID: 018_score_smallint
+Revises: 017_email_score_counts
+Create Date: 2026-10-17
+
+Sentiment is -1..1 and priority 1..10, yet both were 4-byte INTEGERs.
+SMALLINT halves their width in every emails row and in the sentiment and
+priority indexes that the analytics group-bys read. email_score_counts
+follows suit so the trigger's comparisons stay on one type.
+
+email_stats_daily reads sentiment_score, and PostgreSQL will not change
+the type of a column a view depends on, so the view is dropped and rebuilt
+around the change. Altering the type rewrites emails and its indexes once
+under an exclusive lock.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "018_score_smallint"
+down_revision: Union[str, None] = "017_email_score_counts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_EMAIL_STATS_DAILY_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS email_stats_daily AS
+    SELECT
+        (date_received AT TIME ZONE 'UTC')::date AS day,
+        COUNT(*) AS email_count,
+        COUNT(*) FILTER (WHERE is_read) AS read_count,
+        COUNT(*) FILTER (WHERE NOT is_read) AS unread_count,
+        COUNT(*) FILTER (WHERE is_starred) AS starred_count,
+        COUNT(*) FILTER (WHERE is_important) AS important_count,
+        COUNT(*) FILTER (WHERE sentiment_score = 1) AS sentiment_positive,
+        COUNT(*) FILTER (WHERE sentiment_score = 0) AS sentiment_neutral,
+        COUNT(*) FILTER (WHERE sentiment_score = -1) AS sentiment_negative
+    FROM emails
+    GROUP BY 1
+    WITH DATA
+"""
+
+
+def _alter_score_columns(type_name: str) -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS email_stats_daily")
+    for table_name in ("emails", "email_score_counts"):
+        op.execute(
+            f"""
+            ALTER TABLE {table_name}
+                ALTER COLUMN sentiment_score TYPE {type_name},
+                ALTER COLUMN priority_score TYPE {type_name}
+            """
+        )
+    op.execute(_EMAIL_STATS_DAILY_SQL)
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_email_stats_daily_day "
+        "ON email_stats_daily (day)"
+    )
+
+
+def upgrade() -> None:
+    _alter_score_columns("SMALLINT")
+
+
+def downgrade() -> None:
+    _alter_score_columns("INTEGER")
@@ -0,0 +1,90 @@
+"""Add trigger-maintained email_label_links table.
+
+Revision ID: 019_email_label_links
+Revises: 018_score_smallint
+Create Date: 2026-10-17
+
+Per-label email counts had to expand every row's ``labels`` JSONB array.
+``email_label_links`` holds one (label, email_id) row per label on an
+email, keyed label-first, so a label's emails are an index range and the
+counts an index-only GROUP BY. A row-level trigger keeps it in step with
+``emails.labels``, which stays the source of truth; links follow their
+email out through ON DELETE CASCADE. Labels are the identifiers stored on
+the email rather than email_labels ids, since emails routinely arrive
+carrying labels that have not been synced into email_labels yet.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "019_email_label_links"
+down_revision: Union[str, None] = "018_score_smallint"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS email_label_links (
+            label VARCHAR(255) NOT NULL,
+            email_id INTEGER NOT NULL REFERENCES emails (id) ON DELETE CASCADE,
+            PRIMARY KEY (label, email_id)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_email_label_links_email_id "
+        "ON email_label_links (email_id)"
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION email_label_links_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                IF OLD.labels IS NOT DISTINCT FROM NEW.labels THEN
+                    RETURN NULL;
+                END IF;
+                DELETE FROM email_label_links WHERE email_id = OLD.id;
+            END IF;
+            IF jsonb_typeof(NEW.labels) = 'array' THEN
+                INSERT INTO email_label_links (label, email_id)
+                SELECT DISTINCT value, NEW.id FROM jsonb_array_elements_text(NEW.labels)
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS emails_label_links ON emails")
+    op.execute(
+        """
+        CREATE TRIGGER emails_label_links
+        AFTER INSERT OR UPDATE OF labels ON emails
+        FOR EACH ROW EXECUTE FUNCTION email_label_links_sync()
+        """
+    )
+
+    # Backfill from the existing mailbox; the table may already exist (and be
+    # empty) if create_all ran before this migration. Creating the trigger
+    # holds off concurrent writes to emails until this transaction commits.
+    op.execute("TRUNCATE email_label_links")
+    op.execute(
+        """
+        INSERT INTO email_label_links (label, email_id)
+        SELECT DISTINCT label.value, emails.id
+        FROM emails
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(emails.labels) = 'array' THEN emails.labels ELSE '[]'::jsonb END
+        ) AS label
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS emails_label_links ON emails")
+    op.execute("DROP FUNCTION IF EXISTS email_label_links_sync()")
+    op.execute("DROP TABLE IF EXISTS email_label_links")
@@ -0,0 +1,61 @@
+"""Maintain sync_sessions.total_duration_seconds in the database.
+
+Revision ID: 020_sync_session_duration
+Revises: 019_email_label_links
+Create Date: 2026-10-17
+
+total_duration_seconds was only ever written by SyncSession.mark_completed
+and mark_failed, which read it back after setting completed_at and so
+stored 0; the stale-session cleanup never set it at all. A BEFORE trigger
+now derives it from started_at and completed_at whenever either is
+written, so finished sessions carry their duration however they were
+closed, and existing rows are backfilled. A generated column cannot do
+this: running sessions would need now(), which is not immutable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "020_sync_session_duration"
+down_revision: Union[str, None] = "019_email_label_links"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_sessions_duration() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.completed_at IS NOT NULL AND NEW.started_at IS NOT NULL THEN
+                NEW.total_duration_seconds :=
+                    GREATEST(EXTRACT(EPOCH FROM NEW.completed_at - NEW.started_at), 0)::integer;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS sync_sessions_set_duration ON sync_sessions")
+    op.execute(
+        """
+        CREATE TRIGGER sync_sessions_set_duration
+        BEFORE INSERT OR UPDATE OF started_at, completed_at ON sync_sessions
+        FOR EACH ROW EXECUTE FUNCTION sync_sessions_duration()
+        """
+    )
+    # Sets completed_at to itself, so the trigger fills in the duration
+    op.execute(
+        """
+        UPDATE sync_sessions SET completed_at = completed_at
+        WHERE completed_at IS NOT NULL
+          AND started_at IS NOT NULL
+          AND (total_duration_seconds IS NULL OR total_duration_seconds = 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS sync_sessions_set_duration ON sync_sessions")
+    op.execute("DROP FUNCTION IF EXISTS sync_sessions_duration()")
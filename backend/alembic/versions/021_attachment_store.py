@@ -0,0 +1,106 @@
+"""Move attachment bytes out of email_attachments into the attachment store.
+
+Revision ID: 021_attachment_store
+Revises: 020_sync_session_duration
+Create Date: 2026-10-17
+
+``email_attachments.file_data`` kept every attachment inline, so the table
+was mostly TOAST and identical files were stored once per email. The bytes
+now live in the content-addressed attachment store (one file per SHA-256
+under ATTACHMENTS_DIR) and the row keeps only metadata and the path. This
+migration writes existing blobs to the store, points ``file_path`` at
+them, and drops the column; VACUUM FULL email_attachments afterwards to
+give the space back.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "021_attachment_store"
+down_revision: Union[str, None] = "020_sync_session_duration"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH_SIZE = 100
+
+# Store layout as of this revision (app.services.attachment_store), kept
+# here so the migration does not change along with the application code
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ATTACHMENTS_DIR = os.path.join(_BACKEND_DIR, os.getenv("ATTACHMENTS_DIR", "attachments"))
+
+
+def _store_attachment(data: bytes, checksum: str) -> str:
+    """Write the bytes to <dir>/<checksum[:2]>/<checksum> unless present; return the path."""
+    path = os.path.join(_ATTACHMENTS_DIR, checksum[:2], checksum)
+    if os.path.exists(path):
+        return path
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _has_file_data(conn) -> bool:
+    columns = sa.inspect(conn).get_columns("email_attachments")
+    return any(column["name"] == "file_data" for column in columns)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _has_file_data(conn):
+        return
+
+    # Stream the blobs through a server-side cursor rather than loading them all
+    result = conn.execution_options(stream_results=True, yield_per=_BATCH_SIZE).execute(
+        sa.text("SELECT id, checksum, file_data FROM email_attachments WHERE file_data IS NOT NULL")
+    )
+    update = sa.text(
+        "UPDATE email_attachments SET file_path = :file_path, checksum = :checksum WHERE id = :id"
+    )
+    for rows in result.partitions():
+        params = []
+        for attachment_id, checksum, file_data in rows:
+            data = bytes(file_data)
+            if checksum is None:
+                checksum = hashlib.sha256(data).hexdigest()
+            params.append({
+                "id": attachment_id,
+                "checksum": checksum,
+                "file_path": _store_attachment(data, checksum),
+            })
+        conn.execute(update, params)
+
+    op.execute("ALTER TABLE email_attachments DROP COLUMN IF EXISTS file_data")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    op.execute("ALTER TABLE email_attachments ADD COLUMN IF NOT EXISTS file_data BYTEA")
+
+    # Stream the rows the same way upgrade() does; each batch of files is
+    # read back and written in one executemany
+    result = conn.execution_options(stream_results=True, yield_per=_BATCH_SIZE).execute(
+        sa.text("SELECT id, file_path FROM email_attachments WHERE file_path IS NOT NULL")
+    )
+    update = sa.text("UPDATE email_attachments SET file_data = :file_data WHERE id = :id")
+    for rows in result.partitions():
+        params = []
+        for attachment_id, file_path in rows:
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as f:
+                    params.append({"id": attachment_id, "file_data": f.read()})
+        if params:
+            conn.execute(update, params)
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Date, case, cast, extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
-from ..models.database import get_db
+from ..models.database import get_async_db, get_db
+from ..models.email import Email, EmailAttachment
 from ..services.email_service import EmailService
 from pydantic import BaseModel
 from datetime import datetime, timedelta
@@ -71,45 +74,30 @@ async def get_email_trends(
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        # Get emails in date range
-        from ..models.email import Email
-        emails = db.query(Email).filter(
+        # Aggregate per day in the database instead of loading every email
+        day = cast(Email.date_received, Date)
+        daily_counts = db.query(
+            day.label('day'),
+            func.count(Email.id),
+            func.count(Email.id).filter(Email.is_read == True),
+            func.count(Email.id).filter(Email.is_starred == True),
+            func.count(Email.id).filter(Email.is_important == True)
+        ).filter(
             Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).order_by(Email.date_received).all()
-        
-        # Group by date
-        daily_stats = {}
-        for email in emails:
-            date_key = email.date_received.date().isoformat()
-            if date_key not in daily_stats:
-                daily_stats[date_key] = {
-                    "total": 0,
-                    "read": 0,
-                    "unread": 0,
-                    "starred": 0,
-                    "important": 0
-                }
-            
-            daily_stats[date_key]["total"] += 1
-            if email.is_read:
-                daily_stats[date_key]["read"] += 1
-            else:
-                daily_stats[date_key]["unread"] += 1
-            
-            if email.is_starred:
-                daily_stats[date_key]["starred"] += 1
-            
-            if email.is_important:
-                daily_stats[date_key]["important"] += 1
-        
-        # Convert to list format
-        trends = []
-        for date_key in sorted(daily_stats.keys()):
-            trends.append({
-                "date": date_key,
-                **daily_stats[date_key]
-            })
+            Email.date_received < end_date
+        ).group_by(day).order_by(day).all()
+        
+        trends = [
+            {
+                "date": day_value.isoformat(),
+                "total": total,
+                "read": read,
+                "unread": total - read,
+                "starred": starred,
+                "important": important
+            }
+            for day_value, total, read, starred, important in daily_counts
+        ]
         
         return {"trends": trends}
         
@@ -120,9 +108,6 @@ async def get_email_trends(
 async def get_category_analytics(db: Session = Depends(get_db)):
     """Get detailed category analytics"""
     try:
-        from ..models.email import Email
-        from sqlalchemy import func
-        
         # Get category distribution
         category_stats = db.query(
             Email.category,
@@ -152,23 +137,25 @@ async def get_sender_analytics(
 ):
     """Get sender analytics"""
     try:
-        from ..models.email import Email
-        from sqlalchemy import func
-        
-        # Get top senders with stats
+        # Get top senders with stats and read counts in one grouped query;
+        # blank senders are dropped before grouping so they cannot take a
+        # slot in the top `limit`
         sender_stats = db.query(
             Email.sender,
             func.count(Email.id).label('count'),
             func.avg(Email.sentiment_score).label('avg_sentiment'),
             func.avg(Email.priority_score).label('avg_priority'),
-            func.sum(func.cast(Email.is_read, func.Integer)).label('read_count')
+            func.sum(case((Email.is_read == True, 1), else_=0)).label('read_count')
+        ).filter(
+            Email.sender.isnot(None),
+            func.trim(Email.sender) != ''
         ).group_by(Email.sender).order_by(
             func.count(Email.id).desc()
         ).limit(limit).all()
         
         senders = []
         for sender, count, avg_sentiment, avg_priority, read_count in sender_stats:
-            if sender:  # Skip None senders
+            if sender:
                 senders.append({
                     "sender": sender,
                     "count": count,
@@ -185,34 +172,24 @@ async def get_sender_analytics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sentiment")
-async def get_sentiment_analytics(db: Session = Depends(get_db)):
+async def get_sentiment_analytics(db: AsyncSession = Depends(get_async_db)):
     """Get sentiment analysis insights"""
     try:
-        from ..models.email import Email
-        from sqlalchemy import func
-        
-        # Get sentiment distribution
-        sentiment_stats = db.query(
-            Email.sentiment_score,
-            func.count(Email.id).label('count')
-        ).group_by(Email.sentiment_score).all()
+        # Get the sentiment split in one row; anything not scored positive or
+        # negative (0 or NULL) counts as neutral
+        total, positive, negative = (await db.execute(select(
+            func.count(Email.id),
+            func.count(Email.id).filter(Email.sentiment_score == 1),
+            func.count(Email.id).filter(Email.sentiment_score == -1)
+        ))).one()
         
         sentiment_data = {
-            "positive": 0,
-            "neutral": 0,
-            "negative": 0,
-            "total": 0
+            "positive": positive,
+            "neutral": total - positive - negative,
+            "negative": negative,
+            "total": total
         }
         
-        for sentiment, count in sentiment_stats:
-            sentiment_data["total"] += count
-            if sentiment == 1:
-                sentiment_data["positive"] = count
-            elif sentiment == -1:
-                sentiment_data["negative"] = count
-            else:
-                sentiment_data["neutral"] = count
-        
         # Calculate percentages
         if sentiment_data["total"] > 0:
             sentiment_data["positive_percent"] = (sentiment_data["positive"] / sentiment_data["total"]) * 100
@@ -229,39 +206,34 @@ async def get_sentiment_analytics(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/priority")
-async def get_priority_analytics(db: Session = Depends(get_db)):
+async def get_priority_analytics(db: AsyncSession = Depends(get_async_db)):
     """Get priority analysis insights"""
     try:
-        from ..models.email import Email
-        from sqlalchemy import func
-        
-        # Get priority distribution
-        priority_stats = db.query(
+        # Get the priority distribution with each score's bucket assigned in
+        # SQL; unscored emails count as low priority
+        bucket = case(
+            (Email.priority_score >= 8, 'high_priority'),
+            (Email.priority_score >= 4, 'medium_priority'),
+            else_='low_priority'
+        )
+        priority_stats = (await db.execute(select(
             Email.priority_score,
+            bucket,
             func.count(Email.id).label('count')
-        ).group_by(Email.priority_score).order_by(Email.priority_score).all()
+        ).group_by(Email.priority_score).order_by(Email.priority_score.asc().nulls_last()))).all()
         
         priority_data = {
             "high_priority": 0,  # 8-10
             "medium_priority": 0,  # 4-7
             "low_priority": 0,  # 1-3
-            "total": 0,
-            "distribution": []
+            "total": sum(count for _, _, count in priority_stats),
+            "distribution": [
+                {"priority": priority, "count": count}
+                for priority, _, count in priority_stats
+            ]
         }
-        
-        for priority, count in priority_stats:
-            priority_data["total"] += count
-            priority_data["distribution"].append({
-                "priority": priority,
-                "count": count
-            })
-            
-            if priority >= 8:
-                priority_data["high_priority"] += count
-            elif priority >= 4:
-                priority_data["medium_priority"] += count
-            else:
-                priority_data["low_priority"] += count
+        for _, bucket_name, count in priority_stats:
+            priority_data[bucket_name] += count
         
         # Calculate percentages
         if priority_data["total"] > 0:
@@ -285,38 +257,26 @@ async def get_activity_analytics(
 ):
     """Get email activity patterns"""
     try:
-        from ..models.email import Email
-        from sqlalchemy import func, extract
-        
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        # Get emails in date range
-        emails = db.query(Email).filter(
+        # Count emails per (hour, day of week) in the database; at most 168
+        # rows come back instead of every email in the range
+        hour = extract('hour', Email.date_received)
+        dow = extract('dow', Email.date_received)
+        activity_counts = db.query(hour, dow, func.count(Email.id)).filter(
             Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).all()
-        
-        # Analyze by hour of day
-        hourly_activity = {}
-        for i in range(24):
-            hourly_activity[i] = 0
-        
-        for email in emails:
-            if email.date_received:
-                hour = email.date_received.hour
-                hourly_activity[hour] += 1
+            Email.date_received < end_date
+        ).group_by(hour, dow).all()
         
-        # Analyze by day of week
-        daily_activity = {}
-        for i in range(7):
-            daily_activity[i] = 0
-        
-        for email in emails:
-            if email.date_received:
-                day = email.date_received.weekday()
-                daily_activity[day] += 1
+        # Analyze by hour of day and day of week (Postgres dow counts from
+        # Sunday = 0; keys here follow weekday(), Monday = 0)
+        hourly_activity = {i: 0 for i in range(24)}
+        daily_activity = {i: 0 for i in range(7)}
+        for hour_value, dow_value, count in activity_counts:
+            hourly_activity[int(hour_value)] += count
+            daily_activity[(int(dow_value) + 6) % 7] += count
         
         # Get most active hours
         most_active_hours = sorted(hourly_activity.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -338,31 +298,26 @@ async def get_activity_analytics(
 async def get_performance_metrics(db: Session = Depends(get_db)):
     """Get system performance metrics"""
     try:
-        from ..models.email import Email, EmailAttachment
-        from sqlalchemy import func
-        
-        # Get basic counts
-        total_emails = db.query(Email).count()
-        total_attachments = db.query(EmailAttachment).count()
-        
-        # Get storage usage
-        attachment_sizes = db.query(
-            func.sum(EmailAttachment.size).label('total_size')
-        ).first()
-        
-        total_size_bytes = attachment_sizes[0] or 0
+        # Get email counts, processing stats and average email size in one
+        # scan; a missing body counts as 0 rather than turning the whole
+        # row's size into NULL
+        total_emails, processed_emails, avg_email_size = db.query(
+            func.count(Email.id),
+            func.count(Email.id).filter(Email.sentiment_score.isnot(None)),
+            func.avg(
+                func.coalesce(func.length(Email.body_plain), 0) +
+                func.coalesce(func.length(Email.body_html), 0)
+            )
+        ).one()
+        avg_email_size = avg_email_size or 0
+        
+        # Get attachment count and storage usage
+        total_attachments, total_size_bytes = db.query(
+            func.count(EmailAttachment.id),
+            func.coalesce(func.sum(EmailAttachment.size), 0)
+        ).one()
         total_size_mb = total_size_bytes / (1024 * 1024)
         
-        # Get average email size
-        avg_email_size = db.query(
-            func.avg(func.length(Email.body_plain) + func.length(Email.body_html or ''))
-        ).scalar() or 0
-        
-        # Get processing stats
-        processed_emails = db.query(Email).filter(
-            Email.sentiment_score.isnot(None)
-        ).count()
-        
         processing_rate = (processed_emails / total_emails * 100) if total_emails > 0 else 0
         
         return {
@@ -382,22 +337,35 @@ async def get_performance_metrics(db: Session = Depends(get_db)):
 async def get_email_insights(db: Session = Depends(get_db)):
     """Get AI-generated insights about email patterns"""
     try:
-        from ..models.email import Email
-        from sqlalchemy import func
-        
-        # Get recent emails for analysis
-        recent_emails = db.query(Email).order_by(
+        # Aggregate over the 1000 most recent emails in SQL; only the counts
+        # the rules read come back
+        recent = select(
+            Email.is_read,
+            Email.sentiment_score,
+            Email.priority_score
+        ).order_by(
             Email.date_received.desc()
-        ).limit(1000).all()
+        ).limit(1000).subquery()
+        
+        recent_total, unread_count, positive_count, negative_count, high_priority_count = db.execute(
+            select(
+                func.count(),
+                func.count().filter(recent.c.is_read.isnot(True)),
+                func.count().filter(recent.c.sentiment_score == 1),
+                func.count().filter(recent.c.sentiment_score == -1),
+                func.count().filter(recent.c.priority_score >= 8)
+            ).select_from(recent)
+        ).one()
         
         insights = []
         
         # Analyze email volume trends
-        if len(recent_emails) > 10:
-            recent_count = len([e for e in recent_emails[:100]])
-            older_count = len([e for e in recent_emails[100:200]])
+        if recent_total > 10:
+            # Newest 100 emails against the 100 before them
+            recent_count = min(recent_total, 100)
+            older_count = min(max(recent_total - 100, 0), 100)
             
-            if recent_count > older_count * 1.5:
+            if older_count and recent_count > older_count * 1.5:
                 insights.append({
                     "type": "volume_increase",
                     "title": "Email Volume Increase",
@@ -406,20 +374,16 @@ async def get_email_insights(db: Session = Depends(get_db)):
                 })
         
         # Analyze unread email patterns
-        unread_emails = [e for e in recent_emails if not e.is_read]
-        if len(unread_emails) > len(recent_emails) * 0.3:
+        if unread_count > recent_total * 0.3:
             insights.append({
                 "type": "high_unread",
                 "title": "High Unread Email Rate",
-                "description": f"{len(unread_emails)} out of {len(recent_emails)} recent emails are unread",
+                "description": f"{unread_count} out of {recent_total} recent emails are unread",
                 "severity": "warning"
             })
         
         # Analyze sentiment trends
-        positive_emails = [e for e in recent_emails if e.sentiment_score == 1]
-        negative_emails = [e for e in recent_emails if e.sentiment_score == -1]
-        
-        if len(negative_emails) > len(positive_emails):
+        if negative_count > positive_count:
             insights.append({
                 "type": "negative_trend",
                 "title": "Negative Sentiment Trend",
@@ -428,12 +392,11 @@ async def get_email_insights(db: Session = Depends(get_db)):
             })
         
         # Analyze priority distribution
-        high_priority = [e for e in recent_emails if e.priority_score and e.priority_score >= 8]
-        if len(high_priority) > len(recent_emails) * 0.2:
+        if high_priority_count > recent_total * 0.2:
             insights.append({
                 "type": "high_priority",
                 "title": "High Priority Email Volume",
-                "description": f"{len(high_priority)} high priority emails detected",
+                "description": f"{high_priority_count} high priority emails detected",
                 "severity": "info"
             })
         
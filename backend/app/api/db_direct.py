@@ -1,32 +1,152 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
-from ..models.database import SessionLocal, FrontendSessionLocal
+from sqlalchemy.orm import Session
+from ..models.database import get_db, get_frontend_db
 from ..models.email import Email
+from ..services.cache_service import get_email_count_cached, get_email_count_estimate
+from ..services.search_service import BODY_SEARCH_PREFIX, decode_cursor, encode_cursor, is_bare_words
+from typing import Optional
 import logging
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Handlers here are plain functions: they only make blocking database and
+# file calls, so FastAPI runs them in its threadpool instead of on the event loop
 router = APIRouter(tags=["db_direct"])
 
+# The hot statements are built once at import instead of per request; the
+# variants a handler picks between are each their own constant
+
+_EMAIL_COLUMNS = "id, subject, sender, date_received, is_read, is_starred, body_preview"
+
+# Keyset page: seek past the cursor instead of skipping rows
+_KEYSET_PAGE_SQL = f"""
+    SELECT {_EMAIL_COLUMNS}
+    FROM emails
+    WHERE (date_received, id) < (:after_ts, :after_id)
+    ORDER BY date_received DESC, id DESC
+    LIMIT :page_size + 1
+"""
+
+# Offset page
+_OFFSET_PAGE_SQL = f"""
+    SELECT {_EMAIL_COLUMNS}
+    FROM emails
+    ORDER BY date_received DESC, id DESC
+    LIMIT :page_size + 1 OFFSET :offset
+"""
+
+
+def _email_page_json_sql(page_sql: str):
+    """
+    Wrap a page query (page_size + 1 rows) so Postgres builds the email list
+    as one JSON document, alongside has_more and the last row's keyset.
+    """
+    return text(f"""
+        SELECT coalesce(json_agg(json_build_object(
+                   'id', id,
+                   'subject', coalesce(subject, 'No Subject'),
+                   'sender', coalesce(sender, 'Unknown'),
+                   'date_received', date_received,
+                   'is_read', is_read,
+                   'is_starred', is_starred,
+                   'body_plain', body_preview
+               ) ORDER BY rn) FILTER (WHERE rn <= :page_size), '[]')::text AS emails,
+               count(*) > :page_size AS has_more,
+               max(date_received) FILTER (WHERE rn = :page_size) AS last_date_received,
+               max(id) FILTER (WHERE rn = :page_size) AS last_id
+        FROM (
+            SELECT *, row_number() OVER (ORDER BY date_received DESC, id DESC) AS rn
+            FROM ({page_sql}) AS fetched
+        ) AS page
+    """)
+
+
+_DIRECT_EMAILS_KEYSET_SQL = _email_page_json_sql(_KEYSET_PAGE_SQL)
+_DIRECT_EMAILS_OFFSET_SQL = _email_page_json_sql(_OFFSET_PAGE_SQL)
+
+
+def _direct_search_sql(*body_matches: str):
+    """
+    Search page for /db/direct-search. Each predicate gets its own branch so
+    it is planned against its own index; UNION drops emails matched by more
+    than one branch. One row past the page tells whether another follows.
+    """
+    body_branches = "".join(
+        f"""
+            UNION
+            SELECT id FROM emails WHERE {body_match}"""
+        for body_match in body_matches
+    )
+    return text(f"""
+        WITH matches AS (
+            SELECT id FROM emails WHERE subject ILIKE :search_term
+            UNION
+            SELECT id FROM emails WHERE sender ILIKE :search_term{body_branches}
+        )
+        SELECT {_EMAIL_COLUMNS}
+        FROM matches
+        JOIN emails USING (id)
+        ORDER BY date_received DESC, id DESC
+        LIMIT :page_size + 1 OFFSET :offset
+    """)
+
+
+# The body always matches as a substring within its first 4 KB (trigram
+# index), so partial words match; terms made only of whole words also match
+# as a phrase anywhere in the body through the full-text index. Same rules
+# as search_service.email_search_filter.
+_BODY_PREFIX_MATCH = f"LEFT(body_plain, {BODY_SEARCH_PREFIX}) ILIKE :search_term"
+_DIRECT_SEARCH_FTS_SQL = _direct_search_sql(
+    _BODY_PREFIX_MATCH,
+    "to_tsvector('simple', coalesce(body_plain, '')) @@ phraseto_tsquery('simple', :q)"
+)
+_DIRECT_SEARCH_ILIKE_SQL = _direct_search_sql(_BODY_PREFIX_MATCH)
+
+_RAW_EMAILS_KEYSET_SQL = text(_KEYSET_PAGE_SQL)
+_RAW_EMAILS_OFFSET_SQL = text(_OFFSET_PAGE_SQL)
+
+
+def _email_dicts(rows):
+    """
+    Response dicts for email rows fetched with .mappings(): SQLAlchemy builds
+    each dict, and only the fields needing a default are touched. Datetimes
+    are left for ORJSONResponse to serialize.
+    """
+    emails = []
+    for row in rows:
+        email = dict(row)
+        email["subject"] = email["subject"] or "No Subject"
+        email["sender"] = email["sender"] or "Unknown"
+        email["body_plain"] = email.pop("body_preview")
+        emails.append(email)
+    return emails
+
 
 @router.get("/db/direct-count")
-async def get_direct_email_count():
+def get_direct_email_count(
+    exact: bool = Query(False, description="Report the shared exact COUNT(*) instead of the planner estimate"),
+    db: Session = Depends(get_frontend_db)
+):
     """Get email count directly from database using raw SQL (bypasses all API processing)"""
     try:
-        # Use raw SQL query like the Docker command with frontend session
-        db = FrontendSessionLocal()
-        try:
-            result = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
-            return {
-                "total_emails": result,
-                "timestamp": datetime.now().isoformat(),
-                "method": "direct_sql_frontend"
-            }
-        finally:
-            db.close()
+        # Use raw SQL query like the Docker command with frontend session;
+        # the exact total is the shared cached COUNT(*)
+        if exact:
+            (result, _), estimated = get_email_count_cached(db), False
+        else:
+            result, estimated = get_email_count_estimate(db)
+        return {
+            "total_emails": result,
+            "estimated": estimated,
+            "timestamp": datetime.now().isoformat(),
+            "method": "direct_sql_frontend"
+        }
     except Exception as e:
         logger.error(f"Error in direct count: {e}")
         return {
@@ -36,51 +156,53 @@ async def get_direct_email_count():
         }
 
 @router.get("/db/direct-emails")
-async def get_direct_emails(
+def get_direct_emails(
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1, le=50)
+    page_size: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    after_ts: Optional[datetime] = Query(None, description="date_received of the last email on the previous page"),
+    after_id: Optional[int] = Query(None, description="id of the last email on the previous page"),
+    db: Session = Depends(get_frontend_db)
 ):
     """Get emails directly from database using raw SQL (bypasses all API processing)"""
-    try:
-        db = FrontendSessionLocal()
-        try:
-            # Get total count
-            total_count = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
+    if cursor is not None:
+        after_ts, after_id = decode_cursor(cursor)
+    keyset = after_ts is not None and after_id is not None
 
-            # Get paginated emails with minimal processing
+    try:
+        # The email list arrives as one JSON document, passed through as
+        # text rather than decoded row by row; the total is only reported
+        # on offset pages
+        if keyset:
+            total_count = None
+            statement = _DIRECT_EMAILS_KEYSET_SQL
+            params = {"after_ts": after_ts, "after_id": after_id, "page_size": page_size}
+        else:
+            total_count, _ = get_email_count_cached(db)
             offset = (page - 1) * page_size
-            emails = db.execute(text("""
-                SELECT id, subject, sender, date_received, is_read, is_starred,
-                       LEFT(body_plain, 200) as body_preview
-                FROM emails
-                ORDER BY date_received DESC
-                LIMIT :page_size OFFSET :offset
-            """), {"page_size": page_size, "offset": offset}).fetchall()
-
-            # Convert to simple dict format
-            email_list = []
-            for email in emails:
-                email_list.append({
-                    "id": email.id,
-                    "subject": email.subject or "No Subject",
-                    "sender": email.sender or "Unknown",
-                    "date_received": email.date_received.isoformat() if email.date_received else None,
-                    "is_read": email.is_read,
-                    "is_starred": email.is_starred,
-                    "body_plain": email.body_preview
-                })
+            statement = _DIRECT_EMAILS_OFFSET_SQL
+            params = {"page_size": page_size, "offset": offset}
 
-            return {
-                "emails": email_list,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size,
-                "method": "direct_sql_frontend"
-            }
+        result = db.execute(statement, params).one()
+
+        next_cursor = None
+        if result.has_more and result.last_date_received is not None:
+            next_cursor = encode_cursor(result.last_date_received, result.last_id)
+
+        metadata = json.dumps({
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total_count + page_size - 1) // page_size if total_count is not None else None,
+            "has_more": result.has_more,
+            "next_cursor": next_cursor,
+            "method": "direct_sql_frontend"
+        })
+        return Response(
+            content='{"emails": ' + result.emails + ', ' + metadata[1:],
+            media_type="application/json"
+        )
 
-        finally:
-            db.close()
     except Exception as e:
         logger.error(f"Error in direct emails: {e}")
         return {
@@ -92,91 +214,60 @@ async def get_direct_emails(
             "error": str(e)
         }
 
-@router.get("/db/direct-search")
-async def get_direct_search(
+@router.get("/db/direct-search", response_class=ORJSONResponse)
+def get_direct_search(
     q: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=50)
+    page_size: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_frontend_db)
 ):
     """Search emails directly from database using raw SQL (bypasses all API processing)"""
     try:
-        db = FrontendSessionLocal()
-        try:
-            # Use ILIKE for case-insensitive search
-            search_term = f"%{q}%"
+        # Use ILIKE for case-insensitive search on subject/sender (trigram
+        # indexes); the body match depends on the shape of the term
+        search_term = f"%{q}%"
+        statement = _DIRECT_SEARCH_FTS_SQL if is_bare_words(q) else _DIRECT_SEARCH_ILIKE_SQL
 
-            # Get total count
-            total_count = db.execute(text("""
-                SELECT COUNT(*) FROM emails
-                WHERE subject ILIKE :search_term
-                   OR sender ILIKE :search_term
-                   OR body_plain ILIKE :search_term
-            """), {"search_term": search_term}).scalar()
-
-            # Get paginated results
-            offset = (page - 1) * page_size
-            emails = db.execute(text("""
-                SELECT id, subject, sender, date_received, is_read, is_starred,
-                       LEFT(body_plain, 200) as body_preview
-                FROM emails
-                WHERE subject ILIKE :search_term
-                   OR sender ILIKE :search_term
-                   OR body_plain ILIKE :search_term
-                ORDER BY date_received DESC
-                LIMIT :page_size OFFSET :offset
-            """), {"search_term": search_term, "page_size": page_size, "offset": offset}).fetchall()
-
-            # Convert to simple dict format
-            email_list = []
-            for email in emails:
-                email_list.append({
-                    "id": email.id,
-                    "subject": email.subject or "No Subject",
-                    "sender": email.sender or "Unknown",
-                    "date_received": email.date_received.isoformat() if email.date_received else None,
-                    "is_read": email.is_read,
-                    "is_starred": email.is_starred,
-                    "body_plain": email.body_preview
-                })
+        # Get paginated results. No total: counting would evaluate every
+        # predicate over all matches again.
+        offset = (page - 1) * page_size
+        emails = db.execute(
+            statement,
+            {"search_term": search_term, "q": q, "page_size": page_size, "offset": offset}
+        ).mappings().all()
+        has_more = len(emails) > page_size
+        email_list = _email_dicts(emails[:page_size])
 
-            return {
-                "emails": email_list,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size,
-                "search_term": q,
-                "method": "direct_sql_frontend"
-            }
+        return ORJSONResponse({
+            "emails": email_list,
+            "page": page,
+            "page_size": page_size,
+            "has_more": has_more,
+            "search_term": q,
+            "method": "direct_sql_frontend"
+        })
 
-        finally:
-            db.close()
     except Exception as e:
         logger.error(f"Error in direct search: {e}")
         return {
             "emails": [],
-            "total_count": 0,
             "page": page,
             "page_size": page_size,
-            "total_pages": 0,
+            "has_more": False,
             "search_term": q,
             "error": str(e)
         }
 
 @router.get("/db/raw-count")
-async def get_raw_email_count():
+def get_raw_email_count(db: Session = Depends(get_db)):
     """Get email count using raw SQL via SessionLocal"""
     try:
-        db = SessionLocal()
-        try:
-            result = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
-            return {
-                "total_emails": result,
-                "timestamp": datetime.now().isoformat(),
-                "method": "raw_sql"
-            }
-        finally:
-            db.close()
+        result, counted_at = get_email_count_cached(db)
+        return {
+            "total_emails": result,
+            "timestamp": datetime.fromtimestamp(counted_at).isoformat(),
+            "method": "raw_sql"
+        }
     except Exception as e:
         logger.error(f"Error in raw count: {e}")
         return {
@@ -185,51 +276,55 @@ async def get_raw_email_count():
             "timestamp": datetime.now().isoformat()
         }
 
-@router.get("/db/raw-emails")
-async def get_raw_emails(
+@router.get("/db/raw-emails", response_class=ORJSONResponse)
+def get_raw_emails(
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1, le=50)
+    page_size: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db)
 ):
     """Get emails using raw SQL via SessionLocal"""
+    after = decode_cursor(cursor) if cursor is not None else None
+
     try:
-        db = SessionLocal()
-        try:
+        # One row past the page tells us whether another page follows
+        if after is not None:
+            # Keyset page: seek past the cursor; no total, which would
+            # cost the full scan the cursor avoids
+            rows = db.execute(
+                _RAW_EMAILS_KEYSET_SQL,
+                {"after_ts": after[0], "after_id": after[1], "page_size": page_size}
+            ).mappings().all()
+            total_count = None
+        else:
             # Get total count
-            total_count = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
+            total_count, _ = get_email_count_cached(db)
 
             # Get paginated emails
             offset = (page - 1) * page_size
-            rows = db.execute(text("""
-                SELECT id, subject, sender, date_received, is_read, is_starred,
-                       LEFT(body_plain, 200) as body_preview
-                FROM emails
-                ORDER BY date_received DESC
-                LIMIT :page_size OFFSET :offset
-            """), {"page_size": page_size, "offset": offset}).fetchall()
-
-            email_list = []
-            for row in rows:
-                email_list.append({
-                    "id": row.id,
-                    "subject": row.subject or "No Subject",
-                    "sender": row.sender or "Unknown",
-                    "date_received": row.date_received.isoformat() if row.date_received else None,
-                    "is_read": row.is_read,
-                    "is_starred": row.is_starred,
-                    "body_plain": row.body_preview
-                })
+            rows = db.execute(
+                _RAW_EMAILS_OFFSET_SQL, {"page_size": page_size, "offset": offset}
+            ).mappings().all()
 
-            return {
-                "emails": email_list,
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size,
-                "method": "raw_sql"
-            }
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = None
+        if has_more and rows[-1]["date_received"] is not None:
+            next_cursor = encode_cursor(rows[-1]["date_received"], rows[-1]["id"])
+
+        email_list = _email_dicts(rows)
+
+        return ORJSONResponse({
+            "emails": email_list,
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total_count + page_size - 1) // page_size if total_count is not None else None,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+            "method": "raw_sql"
+        })
 
-        finally:
-            db.close()
     except Exception as e:
         logger.error(f"Error in raw emails: {e}")
         return {
@@ -242,19 +337,15 @@ async def get_raw_emails(
         }
 
 @router.get("/db/frontend-count")
-async def get_frontend_email_count():
+def get_frontend_email_count(db: Session = Depends(get_frontend_db)):
     """Get email count using frontend database user (separate from sync user)"""
     try:
-        db = FrontendSessionLocal()
-        try:
-            result = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
-            return {
-                "total_emails": result,
-                "timestamp": datetime.now().isoformat(),
-                "method": "frontend_user"
-            }
-        finally:
-            db.close()
+        result, counted_at = get_email_count_cached(db)
+        return {
+            "total_emails": result,
+            "timestamp": datetime.fromtimestamp(counted_at).isoformat(),
+            "method": "frontend_user"
+        }
     except Exception as e:
         logger.error(f"Error in frontend count: {e}")
         return {
@@ -263,28 +354,40 @@ async def get_frontend_email_count():
             "timestamp": datetime.now().isoformat()
         }
 
+# Parsed contents of the count cache file, reused until the sync job
+# rewrites the file (its mtime changes)
+_file_count_cache = {
+    "mtime_ns": None,
+    "data": None
+}
+
 @router.get("/cache/file-count")
-async def get_file_cache_count():
+def get_file_cache_count(response: Response, db: Session = Depends(get_db)):
     """Get email count from file cache (bypasses database entirely)"""
     try:
         cache_file = Path("/app/cache/email_count.json")
 
-        if cache_file.exists():
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                return {
-                    "total_emails": data.get("total_emails", 0),
-                    "timestamp": data.get("timestamp", datetime.now().isoformat()),
-                    "method": "file_cache"
-                }
+        try:
+            mtime_ns = os.stat(cache_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+
+        if mtime_ns is not None:
+            if _file_count_cache["mtime_ns"] != mtime_ns:
+                with open(cache_file, 'r') as f:
+                    _file_count_cache["data"] = json.load(f)
+                _file_count_cache["mtime_ns"] = mtime_ns
+            data = _file_count_cache["data"]
+            response.headers["Cache-Control"] = "max-age=5"
+            return {
+                "total_emails": data.get("total_emails", 0),
+                "timestamp": data.get("timestamp", datetime.now().isoformat()),
+                "method": "file_cache"
+            }
         else:
             # If cache doesn't exist, try to create it from database
             try:
-                db = SessionLocal()
-                try:
-                    result = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
-                finally:
-                    db.close()
+                result, _ = get_email_count_cached(db)
 
                 # Create cache directory if it doesn't exist
                 cache_file.parent.mkdir(exist_ok=True)
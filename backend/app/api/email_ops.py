@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..models.database import get_db
 from ..models.email import Email, EmailLabel
+from ..services.attachment_store import release_attachments
+from ..services.cache_service import invalidate_analytics_cache, invalidate_email_count_cache
+from ..services.search_service import decode_cursor, encode_cursor
 from pydantic import BaseModel
 import logging
 import json
@@ -336,6 +341,7 @@ async def mark_test_email_as_read(email_id: int, db: Session = Depends(get_db)):
         if email:
             email.is_read = True
             db.commit()
+            invalidate_analytics_cache()
             return {"message": "Email marked as read"}
         else:
             raise HTTPException(status_code=404, detail="Email not found")
@@ -351,6 +357,7 @@ async def mark_test_email_as_unread(email_id: int, db: Session = Depends(get_db)
         if email:
             email.is_read = False
             db.commit()
+            invalidate_analytics_cache()
             return {"message": "Email marked as unread"}
         else:
             raise HTTPException(status_code=404, detail="Email not found")
@@ -366,6 +373,7 @@ async def toggle_test_email_star(email_id: int, db: Session = Depends(get_db)):
         if email:
             email.is_starred = not email.is_starred
             db.commit()
+            invalidate_analytics_cache()
             return {"message": f"Email {'starred' if email.is_starred else 'unstarred'}"}
         else:
             raise HTTPException(status_code=404, detail="Email not found")
@@ -379,8 +387,13 @@ async def delete_test_email(email_id: int, db: Session = Depends(get_db)):
     try:
         email = db.query(Email).filter(Email.id == email_id).first()
         if email:
+            checksums = [a.checksum for a in email.attachments if a.file_path]
             db.delete(email)
             db.commit()
+            # Same cleanup as EmailService.delete_email: shared files stay
+            release_attachments(db, checksums)
+            invalidate_analytics_cache()
+            invalidate_email_count_cache()
             return {"message": "Email deleted"}
         else:
             raise HTTPException(status_code=404, detail="Email not found")
@@ -388,41 +401,82 @@ async def delete_test_email(email_id: int, db: Session = Depends(get_db)):
         logger.error(f"Error deleting email: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/emails/fast")
-async def get_fast_emails(
+@router.get("/emails/fast", response_class=ORJSONResponse)
+def get_fast_emails(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get emails quickly for frontend use during sync operations"""
+    after = decode_cursor(cursor) if cursor is not None else None
+
     try:
-        # Simple count query
-        total_count = db.query(Email).count()
+        # Previews come from the generated body_preview column; comparing byte
+        # lengths (read from the TOAST header) tells whether it was truncated.
+        # One extra row is read to tell whether another page follows
+        if after is not None:
+            # Keyset page: seek past the cursor instead of skipping rows; the
+            # total is only reported on offset pages
+            emails = db.execute(text("""
+                SELECT id, subject, sender, date_received, is_read, is_starred,
+                       body_preview,
+                       octet_length(body_plain) > octet_length(body_preview) AS body_truncated
+                FROM emails
+                WHERE (date_received, id) < (:after_ts, :after_id)
+                ORDER BY date_received DESC, id DESC
+                LIMIT :page_size + 1
+            """), {"after_ts": after[0], "after_id": after[1], "page_size": page_size}).mappings().all()
+            total_count = None
+        else:
+            # Page and total in one pass
+            offset = (page - 1) * page_size
+            emails = db.execute(text("""
+                SELECT id, subject, sender, date_received, is_read, is_starred,
+                       body_preview,
+                       octet_length(body_plain) > octet_length(body_preview) AS body_truncated,
+                       count(*) OVER () AS total_count
+                FROM emails
+                ORDER BY date_received DESC, id DESC
+                LIMIT :page_size + 1 OFFSET :offset
+            """), {"page_size": page_size, "offset": offset}).mappings().all()
+
+            if emails:
+                total_count = emails[0]["total_count"]
+            elif offset:
+                # Past the last page the window has no rows to report on
+                total_count = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
+            else:
+                total_count = 0
 
-        # Simple pagination without complex joins
-        offset = (page - 1) * page_size
-        emails = db.query(Email).order_by(Email.date_received.desc()).offset(offset).limit(page_size).all()
+        has_more = len(emails) > page_size
+        emails = emails[:page_size]
+        next_cursor = None
+        if has_more and emails[-1]["date_received"] is not None:
+            next_cursor = encode_cursor(emails[-1]["date_received"], emails[-1]["id"])
 
-        # Convert to simple dict format
+        # Convert to simple dict format; SQLAlchemy builds the row dicts and
+        # only the fields needing a default are touched. Datetimes are left
+        # for ORJSONResponse to serialize.
         email_list = []
-        for email in emails:
-            email_list.append({
-                "id": email.id,
-                "subject": email.subject or "No Subject",
-                "sender": email.sender or "Unknown",
-                "date_received": email.date_received.isoformat() if email.date_received else None,
-                "is_read": email.is_read,
-                "is_starred": email.is_starred,
-                "body_plain": email.body_plain[:200] + "..." if email.body_plain and len(email.body_plain) > 200 else email.body_plain
-            })
-
-        return {
+        for row in emails:
+            email = dict(row)
+            email.pop("total_count", None)
+            email["subject"] = email["subject"] or "No Subject"
+            email["sender"] = email["sender"] or "Unknown"
+            preview = email.pop("body_preview")
+            email["body_plain"] = preview + "..." if email.pop("body_truncated") else preview
+            email_list.append(email)
+
+        return ORJSONResponse({
             "emails": email_list,
             "total_count": total_count,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total_count + page_size - 1) // page_size
-        }
+            "total_pages": (total_count + page_size - 1) // page_size if total_count is not None else None,
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        })
 
     except Exception as e:
         logger.error(f"Error getting fast emails: {e}")
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
-from ..models.database import get_db
+from ..models.database import get_db, trigger_installed
 from ..models.user import User
 from ..services.auth_service import get_current_user
-from ..models.email import EmailLabel, Email
+from ..models.email import EmailLabel, EmailLabelLink, Email
 from pydantic import BaseModel
 import logging
 
@@ -30,13 +31,31 @@ async def get_labels(
         # Get all labels
         labels = db.query(EmailLabel).all()
         
-        # For each label, count emails that have this label
+        # Count emails per label from the trigger-maintained link table
+        # (019_email_label_links). The migration and create_all backfill it
+        # together with the trigger, so it is complete whenever the trigger
+        # exists; otherwise it may be stale and one pass over the labels
+        # arrays is used instead
+        if trigger_installed(db, "emails_label_links"):
+            label_counts = dict(db.query(
+                EmailLabelLink.label,
+                func.count()
+            ).group_by(EmailLabelLink.label).all())
+        else:
+            email_labels = db.query(
+                Email.id.label('email_id'),
+                func.jsonb_array_elements_text(Email.labels).label('label_name')
+            ).filter(
+                func.jsonb_typeof(Email.labels) == 'array'
+            ).subquery()
+            label_counts = dict(db.query(
+                email_labels.c.label_name,
+                func.count(func.distinct(email_labels.c.email_id))
+            ).group_by(email_labels.c.label_name).all())
+        
         label_responses = []
         for label in labels:
-            # Count emails with this label
-            email_count = db.query(Email).filter(
-                Email.labels.contains([label.name])
-            ).count()
+            email_count = label_counts.get(label.name, 0)
             
             label_responses.append(LabelResponse(
                 id=label.id,
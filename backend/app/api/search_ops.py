@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
 from ..models.database import get_db
 from ..models.email import Email
+from ..services.search_service import decode_cursor, email_search_filter, encode_cursor
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,54 +13,89 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["search_ops"])
 
 
-@router.get("/search/fast")
-async def fast_search(
+@router.get("/search/fast", response_class=ORJSONResponse)
+def fast_search(
     q: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Fast search for frontend use during sync operations"""
+    after = decode_cursor(cursor) if cursor is not None else None
+
     try:
-        # Simple search using ILIKE
-        search_term = f"%{q}%"
+        # Same matching as /db/direct-search: substrings in subject, sender
+        # and the first 4 KB of the body, plus whole-word phrases anywhere
+        # in the body (see search_service.email_search_filter)
+        search_filter = email_search_filter(q)
+
+        columns = [
+            Email.id, Email.subject, Email.sender, Email.date_received,
+            Email.is_read, Email.is_starred,
+            # Generated preview; comparing byte lengths (read from the TOAST
+            # header) tells whether it was truncated
+            Email.body_preview,
+            (func.octet_length(Email.body_plain) > func.octet_length(Email.body_preview)).label("body_truncated")
+        ]
+        ordering = (Email.date_received.desc(), Email.id.desc())
+
+        if after is not None:
+            # Keyset page: seek past the cursor instead of skipping rows; the
+            # total is only reported on offset pages
+            emails = db.query(*columns).filter(
+                search_filter,
+                tuple_(Email.date_received, Email.id) < tuple_(*after)
+            ).order_by(*ordering).limit(page_size + 1).all()
+            total_count = None
+        else:
+            # Get paginated results, counting all matches in the same scan
+            offset = (page - 1) * page_size
+            emails = db.query(
+                *columns, func.count().over().label("total_count")
+            ).filter(
+                search_filter
+            ).order_by(*ordering).offset(offset).limit(page_size + 1).all()
 
-        # Count total matches
-        total_count = db.query(Email).filter(
-            Email.subject.ilike(search_term) |
-            Email.sender.ilike(search_term) |
-            Email.body_plain.ilike(search_term)
-        ).count()
+            if emails:
+                total_count = emails[0].total_count
+            elif offset:
+                # Past the last page the window has no rows to report on
+                total_count = db.query(Email).filter(search_filter).count()
+            else:
+                total_count = 0
 
-        # Get paginated results
-        offset = (page - 1) * page_size
-        emails = db.query(Email).filter(
-            Email.subject.ilike(search_term) |
-            Email.sender.ilike(search_term) |
-            Email.body_plain.ilike(search_term)
-        ).order_by(Email.date_received.desc()).offset(offset).limit(page_size).all()
+        # One extra row was read to tell whether another page follows
+        has_more = len(emails) > page_size
+        emails = emails[:page_size]
+        next_cursor = None
+        if has_more and emails[-1].date_received is not None:
+            next_cursor = encode_cursor(emails[-1].date_received, emails[-1].id)
 
-        # Convert to simple dict format
+        # Convert to simple dict format; datetimes are left for
+        # ORJSONResponse to serialize
         email_list = []
         for email in emails:
             email_list.append({
                 "id": email.id,
                 "subject": email.subject or "No Subject",
                 "sender": email.sender or "Unknown",
-                "date_received": email.date_received.isoformat() if email.date_received else None,
+                "date_received": email.date_received,
                 "is_read": email.is_read,
                 "is_starred": email.is_starred,
-                "body_plain": email.body_plain[:200] + "..." if email.body_plain and len(email.body_plain) > 200 else email.body_plain
+                "body_plain": email.body_preview + "..." if email.body_truncated else email.body_preview
             })
 
-        return {
+        return ORJSONResponse({
             "emails": email_list,
             "total_count": total_count,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total_count + page_size - 1) // page_size,
+            "total_pages": (total_count + page_size - 1) // page_size if total_count is not None else None,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "search_term": q
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error in fast search: {e}")
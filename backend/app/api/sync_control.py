@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
-from ..models.database import get_db, get_frontend_db, SessionLocal, FrontendSessionLocal
+from ..models.database import AsyncSessionLocal, get_db, get_frontend_db, SessionLocal, FrontendSessionLocal
 from ..models.user import User
 from ..models.email import Email, EmailLabel
 from ..services.auth_service import get_test_user
+from ..services.sync_progress_listener import sync_progress_listener
+from ..services.cache_service import (
+    get_email_count_cached, get_email_count_estimate, invalidate_email_count_cache, peek_email_count
+)
 from pydantic import BaseModel
+import anyio
+import asyncio
 import logging
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
 import os
+import time
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from sqlalchemy import text
+from sqlalchemy import func, text
 from pathlib import Path
 import psutil
 
@@ -22,43 +30,61 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["sync_control"])
 
-# Global cache for email count to avoid database locks during sync
-_email_count_cache = {
-    "count": 0,
-    "last_updated": None,
-    "cache_duration": 300  # 5 minutes
-}
-
-def update_email_count_cache(count):
-    """Update the email count cache"""
-    global _email_count_cache
-    _email_count_cache["count"] = count
-    _email_count_cache["last_updated"] = datetime.now()
+# Prime psutil's CPU counters so the first non-blocking cpu_percent() call
+# reports usage since import rather than 0.0
+psutil.cpu_percent(interval=None)
+
+# Process-local cache of Gmail credentials: user_id -> (Credentials, monotonic expiry)
+_credentials_cache = {}
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+CREDENTIALS_CACHE_MAX_TTL = 3300  # 55 minutes
+
+def get_gmail_credentials(user, db):
+    """Get Gmail credentials for a user, refreshing the token only when it is about to expire.
+
+    Returns a (credentials, token_status) tuple where token_status is one of
+    "cached", "valid" or "refreshed".
+    """
+    cached = _credentials_cache.get(user.id)
+    if cached and cached[1] > time.monotonic():
+        return cached[0], "cached"
+
+    # google-auth compares expiry against naive UTC datetimes
+    expiry = user.gmail_token_expiry
+    if expiry is not None and expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+
+    creds = Credentials(
+        token=user.gmail_access_token,
+        refresh_token=user.gmail_refresh_token,
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id=os.getenv("GMAIL_CLIENT_ID"),
+        client_secret=os.getenv("GMAIL_CLIENT_SECRET"),
+        scopes=['https://www.googleapis.com/auth/gmail.readonly'],
+        expiry=expiry
+    )
+
+    remaining = (expiry - datetime.utcnow()).total_seconds() if expiry else 0
+    if user.gmail_access_token and remaining > TOKEN_REFRESH_MARGIN_SECONDS:
+        token_status = "valid"
+    else:
+        creds.refresh(Request())
+
+        # Update user tokens
+        user.gmail_access_token = creds.token
+        user.gmail_refresh_token = creds.refresh_token
+        user.gmail_token_expiry = creds.expiry
+        db.commit()
 
-def get_cached_email_count():
-    """Get email count from cache if valid, otherwise from database"""
-    global _email_count_cache
+        remaining = (creds.expiry - datetime.utcnow()).total_seconds() if creds.expiry else 0
+        token_status = "refreshed"
 
-    # Check if cache is still valid
-    if (_email_count_cache["last_updated"] and
-        (datetime.now() - _email_count_cache["last_updated"]).total_seconds() < _email_count_cache["cache_duration"]):
-        return _email_count_cache["count"]
+    # Stop handing out the cached token before it enters the refresh margin
+    ttl = min(remaining - TOKEN_REFRESH_MARGIN_SECONDS, CREDENTIALS_CACHE_MAX_TTL)
+    if ttl > 0:
+        _credentials_cache[user.id] = (creds, time.monotonic() + ttl)
 
-    # Cache expired or doesn't exist, try to update it
-    try:
-        # Use a very short timeout for database query
-        from sqlalchemy import text
-        db = SessionLocal()
-        try:
-            result = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
-            update_email_count_cache(result)
-            return result
-        finally:
-            db.close()
-    except Exception as e:
-        logger.error(f"Error updating email count cache: {e}")
-        # Return cached value even if expired, or 0 if no cache
-        return _email_count_cache["count"] if _email_count_cache["count"] > 0 else 0
+    return creds, token_status
 
 @router.get("/sync/status")
 async def get_test_sync_status(db: Session = Depends(get_frontend_db)):
@@ -75,10 +101,7 @@ async def get_test_sync_status(db: Session = Depends(get_frontend_db)):
             }
 
         # Get basic sync statistics (fast estimate to avoid slow COUNT(*) on large table)
-        total_emails_row = db.execute(text(
-            "SELECT reltuples::bigint AS count FROM pg_class WHERE relname = 'emails'"
-        )).fetchone()
-        total_emails = int(total_emails_row[0]) if total_emails_row else 0
+        total_emails, _ = get_email_count_estimate(db)
         last_sync = user.last_sync.isoformat() if user.last_sync else None
 
         # Determine real-time sync status from sync_sessions
@@ -273,8 +296,6 @@ async def start_quick_sync(
 ):
     """Start a quick sync for recent emails (non-blocking, no auth required)"""
     try:
-        import asyncio
-        import anyio
 
         # Get the first user from database
         user = db.query(User).first()
@@ -324,8 +345,6 @@ async def start_full_sync(
 ):
     """Start a full sync without date filtering (non-blocking, no auth required)"""
     try:
-        import asyncio
-        import anyio
 
         # Get the first user from database
         user = db.query(User).first()
@@ -376,10 +395,7 @@ async def start_sync_from_date(
 ):
     """Start a sync from a specific date (format: YYYY/MM/DD) (no auth required)"""
     try:
-        import asyncio
-        import anyio
         from ..services.sync_session_service import SyncSessionService
-        from ..models.database import SessionLocal
 
         # Get the first user from database
         user = db.query(User).first()
@@ -475,17 +491,15 @@ async def get_emails_count(db: Session = Depends(get_db)):
     """Get emails count by year for analysis"""
     try:
         # Get emails count by year
-        from sqlalchemy import extract, func
-
         yearly_counts = db.query(
-            extract('year', Email.date_received).label('year'),
+            Email.received_year.label('year'),
             func.count(Email.id).label('count')
         ).filter(
-            Email.date_received.isnot(None)
+            Email.received_year.isnot(None)
         ).group_by(
-            extract('year', Email.date_received)
+            Email.received_year
         ).order_by(
-            extract('year', Email.date_received)
+            Email.received_year
         ).all()
 
         # Get total count
@@ -523,11 +537,11 @@ async def test_gmail_query(db: Session = Depends(get_db)):
                 "status": "no_users"
             }
 
-        from ..services.gmail_service import GmailService
-        gmail_service = GmailService()
+        from ..services.gmail_service import get_gmail_service
+        gmail_service = get_gmail_service(user)
 
         # Test authentication
-        if not gmail_service.authenticate_user(user):
+        if gmail_service is None:
             return {
                 "error": "Failed to authenticate with Gmail API",
                 "status": "auth_failed"
@@ -602,7 +616,7 @@ async def test_gmail_query(db: Session = Depends(get_db)):
             "user_id": user.id,
             "user_email": user.email,
             "gmail_api_results": results,
-            "database_emails": db.query(Email).count(),
+            "database_emails": get_email_count_estimate(db)[0],
             "status": "success"
         }
 
@@ -625,11 +639,11 @@ async def test_alternative_queries(db: Session = Depends(get_db)):
                 "status": "no_users"
             }
 
-        from ..services.gmail_service import GmailService
-        gmail_service = GmailService()
+        from ..services.gmail_service import get_gmail_service
+        gmail_service = get_gmail_service(user)
 
         # Test authentication
-        if not gmail_service.authenticate_user(user):
+        if gmail_service is None:
             return {
                 "error": "Failed to authenticate with Gmail API",
                 "status": "auth_failed"
@@ -741,7 +755,7 @@ async def test_alternative_queries(db: Session = Depends(get_db)):
             "user_id": user.id,
             "user_email": user.email,
             "alternative_queries": results,
-            "database_emails": db.query(Email).count(),
+            "database_emails": get_email_count_estimate(db)[0],
             "status": "success"
         }
 
@@ -764,33 +778,17 @@ async def check_gmail_quotas(db: Session = Depends(get_db)):
                 "status": "no_users"
             }
 
-        from ..services.gmail_service import GmailService
-        gmail_service = GmailService()
+        from ..services.gmail_service import get_gmail_service
+        gmail_service = None
 
         results = {}
 
-        # Test 1: Try to refresh authentication
+        # Test 1: Make sure we hold a usable token (refreshed only if close to expiry)
         try:
-            # Force refresh the token
-            creds = Credentials(
-                token=user.gmail_access_token,
-                refresh_token=user.gmail_refresh_token,
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=os.getenv("GMAIL_CLIENT_ID"),
-                client_secret=os.getenv("GMAIL_CLIENT_SECRET"),
-                scopes=['https://www.googleapis.com/auth/gmail.readonly']
-            )
-
-            # Force refresh
-            creds.refresh(Request())
-
-            # Update user tokens
-            user.gmail_access_token = creds.token
-            user.gmail_refresh_token = creds.refresh_token
-            user.gmail_token_expiry = creds.expiry
-            db.commit()
-
-            results["token_refresh"] = "success"
+            creds, token_status = get_gmail_credentials(user, db)
+
+            results["token_refresh"] = "success" if token_status == "refreshed" else "skipped"
+            results["token_status"] = token_status
             results["new_token_expiry"] = creds.expiry.isoformat() if creds.expiry else None
 
         except Exception as e:
@@ -798,75 +796,87 @@ async def check_gmail_quotas(db: Session = Depends(get_db)):
 
         # Test 2: Try authentication with refreshed tokens
         try:
-            if gmail_service.authenticate_user(user):
+            gmail_service = get_gmail_service(user)
+            if gmail_service is not None:
                 results["authentication"] = "success"
+            else:
+                results["authentication"] = "failed"
+        except Exception as e:
+            results["authentication_error"] = str(e)
 
-                # Test 3: Try to get user profile
-                profile = gmail_service.service.users().getProfile(userId='me').execute()
+        if gmail_service is not None:
+            # Tests 3-5: the profile and list probes are independent, so send
+            # them as one batch HTTP request instead of four round trips
+            batch_responses = {}
+
+            def collect_response(request_id, response, exception):
+                batch_responses[request_id] = (response, exception)
+
+            messages_api = gmail_service.service.users().messages()
+            batch = gmail_service.service.new_batch_http_request(callback=collect_response)
+            batch.add(gmail_service.service.users().getProfile(userId='me'), request_id="profile")
+            batch.add(messages_api.list(userId='me', maxResults=1), request_id="no_query")
+            batch.add(messages_api.list(userId='me', maxResults=1000), request_id="large_query")
+            batch.add(messages_api.list(userId='me', labelIds=['INBOX'], maxResults=100), request_id="inbox")
+
+            try:
+                batch.execute()
+            except Exception as e:
+                results["batch_error"] = str(e)
+
+            def batch_result(request_id):
+                response, exception = batch_responses.get(request_id, (None, None))
+                if exception is not None:
+                    results[f"{request_id}_error"] = str(exception)
+                    return None
+                return response
+
+            profile = batch_result("profile")
+            if profile is not None:
                 results["profile"] = profile
 
-                # Test 4: Try different query approaches
-                # Test with no query at all
-                messages = gmail_service.service.users().messages().list(
-                    userId='me',
-                    maxResults=1
-                ).execute()
-                results["no_query_count"] = messages.get('resultSizeEstimate', 0)
+            first_page = batch_result("no_query")
+            if first_page is not None:
+                results["no_query_count"] = first_page.get('resultSizeEstimate', 0)
 
-                # Test with larger maxResults
-                messages = gmail_service.service.users().messages().list(
-                    userId='me',
-                    maxResults=1000
-                ).execute()
+            messages = batch_result("large_query")
+            if messages is not None:
                 results["large_query"] = {
                     "count": len(messages.get('messages', [])),
                     "has_next_page": bool(messages.get('nextPageToken')),
                     "result_size_estimate": messages.get('resultSizeEstimate', 0)
                 }
 
-                # Test with specific label
-                messages = gmail_service.service.users().messages().list(
-                    userId='me',
-                    labelIds=['INBOX'],
-                    maxResults=100
-                ).execute()
+            messages = batch_result("inbox")
+            if messages is not None:
                 results["inbox_count"] = messages.get('resultSizeEstimate', 0)
 
-            else:
-                results["authentication"] = "failed"
-
-        except Exception as e:
-            results["authentication_error"] = str(e)
-
-        # Test 5: Check if there are any API errors
-        try:
-            # Try to get a specific message to see if there are permission issues
-            messages = gmail_service.service.users().messages().list(
-                userId='me',
-                maxResults=1
-            ).execute()
-
-            if messages.get('messages'):
-                message_id = messages['messages'][0]['id']
-                message = gmail_service.service.users().messages().get(
-                    userId='me',
-                    id=message_id,
-                    format='metadata',
-                    metadataHeaders=['Date', 'Subject', 'From']
-                ).execute()
-                results["message_access"] = "success"
-                results["sample_message"] = message
-            else:
-                results["message_access"] = "no_messages"
-
-        except Exception as e:
-            results["message_access_error"] = str(e)
+            # Test 5: Fetch one message to check for permission issues; this
+            # depends on the first list probe, so it follows the batch
+            try:
+                if first_page is None:
+                    results["message_access"] = "unknown"
+                elif first_page.get('messages'):
+                    message_id = first_page['messages'][0]['id']
+                    message = messages_api.get(
+                        userId='me',
+                        id=message_id,
+                        format='metadata',
+                        metadataHeaders=['Date', 'Subject', 'From']
+                    ).execute()
+                    results["message_access"] = "success"
+                    results["sample_message"] = message
+                else:
+                    results["message_access"] = "no_messages"
+
+            except Exception as e:
+                results["message_access_error"] = str(e)
 
         return {
             "user_id": user.id,
             "user_email": user.email,
             "quota_check_results": results,
-            "database_emails": db.query(Email).count(),
+            "database_emails": get_email_count_estimate(db)[0],
             "status": "success"
         }
 
@@ -899,29 +909,33 @@ async def cleanup_stale_sync_sessions():
             "timestamp": datetime.now().isoformat()
         }
 
+_LATEST_SYNC_SESSION_SQL = text("""
+    SELECT id, status, emails_synced, emails_processed, started_at, completed_at
+    FROM sync_sessions
+    ORDER BY started_at DESC
+    LIMIT 1
+""")
+
+# Plain def: every call below blocks, so FastAPI runs it in the threadpool
+# instead of stalling the event loop for other pollers
 @router.get("/sync/progress")
-async def get_sync_progress():
+def get_sync_progress():
     """Get sync progress for testing (no auth required)"""
     try:
         from ..services.background_sync_service import background_sync_service
-        from datetime import datetime, timedelta
 
         # Get background sync status
         sync_status = background_sync_service.get_sync_status()
 
-        # Get current database email count
+        # Get current database email count (shared cached total, so a poll
+        # normally costs the single sync_sessions lookup)
         try:
             db = SessionLocal()
             try:
-                current_email_count = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
+                current_email_count, _ = get_email_count_cached(db)
 
                 # Get latest sync session
-                row = db.execute(text("""
-                    SELECT id, status, emails_synced, emails_processed, started_at, completed_at
-                    FROM sync_sessions
-                    ORDER BY started_at DESC
-                    LIMIT 1
-                """)).fetchone()
+                row = db.execute(_LATEST_SYNC_SESSION_SQL).fetchone()
                 session_result = tuple(row) if row else None
             finally:
                 db.close()
@@ -976,33 +990,130 @@ async def get_sync_progress():
             "timestamp": datetime.now().isoformat()
         }
 
+SYNC_STREAM_KEEPALIVE_SECONDS = 15
+
+# Same fields as the trigger's payload, for the event sent on connect
+_LATEST_SYNC_SESSION_JSON_SQL = text("""
+    SELECT json_build_object(
+        'id', id,
+        'status', status,
+        'emails_synced', emails_synced,
+        'emails_processed', emails_processed,
+        'started_at', started_at,
+        'completed_at', completed_at
+    )::text
+    FROM sync_sessions
+    ORDER BY started_at DESC
+    LIMIT 1
+""")
+
+@router.get("/sync/stream")
+async def stream_sync_progress():
+    """Stream sync session changes as server-sent events instead of being polled.
+
+    Sends the latest session on connect, then every change the sync_sessions
+    trigger publishes; the database does work only when a session changes.
+    All streams share the one LISTEN connection of sync_progress_listener.
+    """
+    try:
+        # Normally already up from startup; reconnects if it was dropped
+        await sync_progress_listener.start()
+    except Exception as e:
+        logger.error(f"Error opening sync progress listener: {e}")
+        raise HTTPException(status_code=503, detail="Sync progress stream unavailable")
+
+    async def events():
+        # Cancelled when the client disconnects
+        queue = sync_progress_listener.subscribe()
+        try:
+            async with AsyncSessionLocal() as db:
+                latest = await db.scalar(_LATEST_SYNC_SESSION_JSON_SQL)
+            if latest is not None:
+                yield f"event: sync_progress\ndata: {latest}\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), SYNC_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if not sync_progress_listener.is_running:
+                        try:
+                            await sync_progress_listener.start()
+                        except Exception as e:
+                            logger.warning(f"Sync progress listener still unavailable: {e}")
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: sync_progress\ndata: {payload}\n\n"
+        finally:
+            sync_progress_listener.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _tail_lines(path, max_lines, block_size=65536):
+    """Last max_lines lines of a text file, reading backwards from the end in blocks"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # One more newline than lines wanted, so the first line kept is complete
+        while position > 0 and data.count(b"\n") <= max_lines:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+    return data.decode("utf-8", errors="replace").splitlines()[-max_lines:]
+
+# Last real-time status, shared by all pollers for REAL_TIME_STATUS_TTL seconds
+REAL_TIME_STATUS_TTL = 1.0
+_real_time_status_cache = {
+    "value": None,
+    "expires_at": 0.0
+}
+_real_time_status_lock = asyncio.Lock()
+
+# Latest email timestamp and the time the newest email was stored, in one
+# round trip; both MAX()es are answered from the date_received/created_at indexes
+_REAL_TIME_DB_STATS_SQL = text("""
+    SELECT (SELECT MAX(date_received) FROM emails),
+           (SELECT MAX(created_at) FROM emails)
+""")
+
 @router.get("/sync/real-time-status")
-async def get_real_time_sync_status():
+async def get_real_time_sync_status(response: Response):
     """Get comprehensive real-time sync status with progress, timing, and logs"""
+    response.headers["Cache-Control"] = f"max-age={int(REAL_TIME_STATUS_TTL)}"
+
+    if _real_time_status_cache["expires_at"] > time.monotonic():
+        return _real_time_status_cache["value"]
+
+    # Concurrent pollers wait for the one recomputing the status; the build
+    # itself runs in a worker thread, so waiting never blocks the event loop
+    async with _real_time_status_lock:
+        if _real_time_status_cache["expires_at"] > time.monotonic():
+            return _real_time_status_cache["value"]
+
+        status = await asyncio.to_thread(_build_real_time_sync_status)
+        if status.get("status") == "success":
+            _real_time_status_cache["value"] = status
+            _real_time_status_cache["expires_at"] = time.monotonic() + REAL_TIME_STATUS_TTL
+        return status
+
+def _build_real_time_sync_status():
+    """Real-time status payload; its database, disk and log reads block, so it runs in a worker thread"""
     try:
         from ..services.background_sync_service import background_sync_service
-        from datetime import datetime, timedelta
-        import psutil
-        import os
 
         # Get background sync status
         sync_status = background_sync_service.get_sync_status()
-        db_stats = background_sync_service.get_database_stats()
 
-        # Get current database email count
+        # Get current database email count and latest email timestamps
         try:
             db = SessionLocal()
             try:
-                current_email_count = db.execute(text("SELECT COUNT(*) FROM emails")).scalar()
-
-                # Get latest email timestamp
-                latest_email_date = db.execute(text("SELECT MAX(date_received) FROM emails")).scalar()
-
-                # Get sync start time from background service
-                last_sync_row = db.execute(text(
-                    "SELECT created_at FROM emails ORDER BY created_at DESC LIMIT 1"
-                )).fetchone()
-                last_sync_time = last_sync_row[0] if last_sync_row else None
+                current_email_count, _ = get_email_count_cached(db)
+                latest_email_date, last_sync_time = db.execute(_REAL_TIME_DB_STATS_SQL).one()
             finally:
                 db.close()
         except Exception as db_error:
@@ -1062,7 +1173,8 @@ async def get_real_time_sync_status():
 
         # Get system information
         system_info = {
-            "cpu_percent": psutil.cpu_percent(interval=1),
+            # Usage since the previous call (primed at import), no blocking sample
+            "cpu_percent": psutil.cpu_percent(interval=None),
             "memory_percent": psutil.virtual_memory().percent,
             "disk_usage": psutil.disk_usage('/').percent if os.path.exists('/') else 0
         }
@@ -1072,14 +1184,11 @@ async def get_real_time_sync_status():
             log_file = "/app/background_sync.log"
             recent_logs = []
             if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    lines = f.readlines()
-                    # Get last 50 lines
-                    recent_lines = lines[-50:] if len(lines) > 50 else lines
-                    for line in recent_lines:
-                        line = line.strip()
-                        if line and ('sync' in line.lower() or 'email' in line.lower() or 'error' in line.lower()):
-                            recent_logs.append(line)
+                # Get last 50 lines
+                for line in _tail_lines(log_file, 50):
+                    line = line.strip()
+                    if line and ('sync' in line.lower() or 'email' in line.lower() or 'error' in line.lower()):
+                        recent_logs.append(line)
         except Exception as log_error:
             logger.error(f"Error reading sync logs: {log_error}")
             recent_logs = []
@@ -1172,12 +1281,38 @@ async def get_sync_status_control(
             "status": "failed"
         }
 
+# Error payload of the polled status endpoints; details go to the log only
+_STATUS_ERROR_RESPONSE = {"status": "error", "error": "internal"}
+# After a failure, a status endpoint answers with the error payload for this
+# long without touching the database, so pollers cannot pile onto a busy DB
+STATUS_ERROR_BACKOFF_SECONDS = 1.0
+_status_last_failure = {}
+
+def _status_error_response(**extra):
+    response = dict(_STATUS_ERROR_RESPONSE, timestamp=datetime.now().isoformat())
+    response.update(extra)
+    return response
+
+def _status_backing_off(endpoint):
+    last_failure = _status_last_failure.get(endpoint)
+    return last_failure is not None and time.monotonic() - last_failure < STATUS_ERROR_BACKOFF_SECONDS
+
 @router.get("/sync/fast-status")
-async def get_fast_sync_status(db: Session = Depends(get_db)):
+def get_fast_sync_status(
+    exact: bool = Query(False, description="Report the shared exact COUNT(*) instead of the planner estimate"),
+    db: Session = Depends(get_db)
+):
     """Get fast sync status for frontend use during sync operations"""
+    if _status_backing_off("fast-status"):
+        return _status_error_response()
+
     try:
-        # Get basic info without complex queries
-        total_emails = db.query(Email).count()
+        # Get basic info without complex queries; even an exact total is
+        # the shared cached count, so pollers cannot stack COUNT(*) scans
+        if exact:
+            total_emails, _ = get_email_count_cached(db)
+        else:
+            total_emails, _ = get_email_count_estimate(db)
 
         # Get the first user (simple query)
         user = db.query(User).first()
@@ -1190,28 +1325,24 @@ async def get_fast_sync_status(db: Session = Depends(get_db)):
             "timestamp": datetime.now().isoformat()
         }
 
-    except Exception as e:
-        logger.error(f"Error getting fast sync status: {e}")
-        return {
-            "error": str(e),
-            "status": "error",
-            "timestamp": datetime.now().isoformat()
-        }
+    except Exception:
+        _status_last_failure["fast-status"] = time.monotonic()
+        logger.exception("Error getting fast sync status")
+        return _status_error_response()
 
 @router.get("/sync/cached-status")
-async def get_cached_sync_status():
+def get_cached_sync_status(db: Session = Depends(get_db)):
     """Get sync status using cached email count to avoid database locks"""
+    if _status_backing_off("cached-status"):
+        return _status_error_response(total_emails=peek_email_count())
+
     try:
-        # Get cached email count
-        total_emails = get_cached_email_count()
+        # Shared exact count, recounted at most once per cache TTL
+        total_emails, counted_at = get_email_count_cached(db)
 
         # Get basic user info (this should be fast)
-        db = SessionLocal()
-        try:
-            user = db.query(User).first()
-            last_sync = user.last_sync.isoformat() if user and user.last_sync else None
-        finally:
-            db.close()
+        last_sync_at = db.query(User.last_sync).limit(1).scalar()
+        last_sync = last_sync_at.isoformat() if last_sync_at else None
 
         return {
             "total_emails": total_emails,
@@ -1219,19 +1350,15 @@ async def get_cached_sync_status():
             "status": "ready",
             "timestamp": datetime.now().isoformat(),
             "cache_info": {
-                "cached": _email_count_cache["last_updated"] is not None,
-                "cache_age": (datetime.now() - _email_count_cache["last_updated"]).total_seconds() if _email_count_cache["last_updated"] else None
+                "cached": True,
+                "cache_age": time.time() - counted_at
             }
         }
 
-    except Exception as e:
-        logger.error(f"Error getting cached sync status: {e}")
-        return {
-            "error": str(e),
-            "status": "error",
-            "timestamp": datetime.now().isoformat(),
-            "total_emails": _email_count_cache["count"] if _email_count_cache["count"] > 0 else 0
-        }
+    except Exception:
+        _status_last_failure["cached-status"] = time.monotonic()
+        logger.exception("Error getting cached sync status")
+        return _status_error_response(total_emails=peek_email_count())
 
 @router.post("/sync/update-cache")
 async def update_email_count_cache_endpoint():
@@ -1239,8 +1366,8 @@ async def update_email_count_cache_endpoint():
     try:
         db = SessionLocal()
         try:
-            count = db.query(Email).count()
-            update_email_count_cache(count)
+            invalidate_email_count_cache()
+            count, _ = get_email_count_cached(db)
             return {
                 "success": True,
                 "count": count,
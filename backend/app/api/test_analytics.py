@@ -1,63 +1,99 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import BigInteger, Date, case, cast, column, extract, func, lambda_stmt, select, table, text
 from sqlalchemy.orm import Session
-from ..models.database import get_db
-from ..models.email import Email
+from ..models.database import get_db, trigger_installed
+from ..models.email import Email, EmailScoreCount, SenderCount
+from ..services.cache_service import analytics_cache, cached_response
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Callable, List, Optional
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["test_analytics"])
+# Dashboard payloads (breakdowns, trends) are large; serialize them with orjson
+router = APIRouter(tags=["test_analytics"], default_response_class=ORJSONResponse)
+
+# Worker threads for independent read-only analytics queries. Kept well below
+# the main engine's pool so concurrent dashboards cannot starve the sync.
+_query_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="analytics-query")
+
+
+async def _gather_queries(db: Session, *queries):
+    """Run independent queries concurrently and return their results in order.
+
+    Each callable receives its own Session bound to the same engine as ``db``;
+    a Session must never be shared between threads.
+    """
+    bind = db.get_bind()
+
+    def run(query):
+        with Session(bind=bind) as session:
+            return query(session)
+
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(_query_executor, run, query) for query in queries)
+    )
 
 
 @router.get("/analytics/overview")
+@cached_response(analytics_cache)
 async def get_test_analytics_overview(
     days: int = 30,
+    cached: bool = Query(True, description="Read totals from email_stats_daily when it is available"),
     db: Session = Depends(get_db)
 ):
     """Get test analytics overview (no authentication required)"""
     try:
-        from sqlalchemy import func
-        from datetime import datetime, timedelta
-
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        # Get emails in date range
-        emails_in_period = db.query(Email).filter(
-            Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).count()
-
-        # Get total emails
-        total_emails = db.query(Email).count()
-
-        # Get read/unread counts
-        read_emails = db.query(Email).filter(Email.is_read == True).count()
-        unread_emails = db.query(Email).filter(Email.is_read == False).count()
-
-        # Get starred/important counts
-        starred_emails = db.query(Email).filter(Email.is_starred == True).count()
-        important_emails = db.query(Email).filter(Email.is_important == True).count()
+        # Get total, in-period, read/unread and starred/important counts in one
+        # pass, over the per-day view refreshed by the background sync when it
+        # is available (the period is then rounded to whole days)
+        use_view = cached and await asyncio.to_thread(_stats_view_populated, db, "email_stats_daily")
+        overview_counts = _daily_overview_counts if use_view else _overview_counts
+
+        def q_counts(s):
+            return overview_counts(s, start_date, end_date)
+
+        def q_top_senders(s):
+            # Precomputed totals, falling back to a full GROUP BY
+            sender_stats = _precomputed_top_senders(s, 10)
+            if sender_stats is None:
+                sender_stats = s.query(
+                    Email.sender,
+                    func.count(Email.id).label('count')
+                ).group_by(Email.sender).order_by(
+                    func.count(Email.id).desc()
+                ).limit(10).all()
+            return sender_stats
+
+        # None of these depend on each other, so run them concurrently
+        counts, (category_stats, sentiment_stats, _), sender_stats = await _gather_queries(
+            db, q_counts, _score_breakdowns, q_top_senders
+        )
+        (
+            total_emails,
+            emails_in_period,
+            read_emails,
+            unread_emails,
+            starred_emails,
+            important_emails
+        ) = counts
 
         # Get category distribution
-        category_stats = db.query(
-            Email.category,
-            func.count(Email.id).label('count')
-        ).group_by(Email.category).all()
-
         category_distribution = {}
         for category, count in category_stats:
             cat_name = category or "uncategorized"
             category_distribution[cat_name] = count
 
         # Get sentiment distribution
-        sentiment_stats = db.query(
-            Email.sentiment_score,
-            func.count(Email.id).label('count')
-        ).group_by(Email.sentiment_score).all()
-
         sentiment_distribution = {"positive": 0, "neutral": 0, "negative": 0}
         for sentiment, count in sentiment_stats:
             if sentiment == 1:
@@ -65,16 +101,9 @@ async def get_test_analytics_overview(
             elif sentiment == -1:
                 sentiment_distribution["negative"] = count
             else:
-                sentiment_distribution["neutral"] = count
+                sentiment_distribution["neutral"] += count
 
         # Get top senders
-        sender_stats = db.query(
-            Email.sender,
-            func.count(Email.id).label('count')
-        ).group_by(Email.sender).order_by(
-            func.count(Email.id).desc()
-        ).limit(10).all()
-
         top_senders = []
         for sender, count in sender_stats:
             if sender:  # Skip None senders
@@ -93,7 +122,8 @@ async def get_test_analytics_overview(
             "important_emails": important_emails,
             "category_distribution": category_distribution,
             "sentiment_distribution": sentiment_distribution,
-            "top_senders": top_senders
+            "top_senders": top_senders,
+            "cached": use_view
         }
 
     except Exception as e:
@@ -104,83 +134,248 @@ async def get_test_analytics_overview(
         }
 
 
+def _overview_counts(db: Session, start_date: datetime, end_date: datetime):
+    """Total, in-period ([start_date, end_date)), read, unread, starred and
+    important email counts from a single scan, as conditional aggregates.
+    Shared by the overview and statistics endpoints.
+
+    Built as a lambda statement so SQLAlchemy caches the compiled SQL and only
+    rebinds the two dates on each call.
+    """
+    stmt = lambda_stmt(lambda: select(
+        func.count(),
+        func.count().filter(Email.date_received >= start_date, Email.date_received < end_date),
+        func.count().filter(Email.is_read == True),
+        func.count().filter(Email.is_read == False),
+        func.count().filter(Email.is_starred == True),
+        func.count().filter(Email.is_important == True)
+    ).select_from(Email))
+    return db.execute(stmt).one()
+
+
+def _analytics_snapshot(db: Session):
+    """Email counts grouped by (category, sentiment_score, priority_score).
+
+    The performance, sentiment, priority and categories endpoints all derive
+    their numbers from this small cube, read from the trigger-maintained
+    email_score_counts table so a dashboard load no longer scans emails.
+    Cached alongside the analytics responses.
+    """
+    rows = analytics_cache.get(("_analytics_snapshot",))
+    if rows is not None:
+        return rows
+
+    # Trigger-maintained totals (017_email_score_counts), falling back to a
+    # full GROUP BY until the table has been populated or when its trigger is
+    # missing (a stale create_all table); Core selects, as only plain tuples
+    # are needed
+    rows = None
+    if trigger_installed(db, "emails_score_counts"):
+        rows = db.execute(select(
+            EmailScoreCount.category,
+            EmailScoreCount.sentiment_score,
+            EmailScoreCount.priority_score,
+            EmailScoreCount.count
+        ).where(EmailScoreCount.count > 0)).all()
+    if not rows:
+        rows = db.execute(select(
+            Email.category,
+            Email.sentiment_score,
+            Email.priority_score,
+            func.count(Email.id)
+        ).group_by(
+            Email.category,
+            Email.sentiment_score,
+            Email.priority_score
+        )).all()
+
+    analytics_cache.set(("_analytics_snapshot",), rows)
+    return rows
+
+
+def _score_breakdowns(db: Session):
+    """(category, count), (sentiment_score, count) and (priority_score, count)
+    lists summed out of _analytics_snapshot; categories by count descending,
+    priorities ascending with NULL last."""
+    categories, sentiments, priorities = {}, {}, {}
+    for category, sentiment, priority, count in _analytics_snapshot(db):
+        categories[category] = categories.get(category, 0) + count
+        sentiments[sentiment] = sentiments.get(sentiment, 0) + count
+        priorities[priority] = priorities.get(priority, 0) + count
+
+    return (
+        sorted(categories.items(), key=lambda row: row[1], reverse=True),
+        list(sentiments.items()),
+        sorted(priorities.items(), key=lambda row: (row[0] is None, row[0] or 0))
+    )
+
+
+def _precomputed_top_senders(db: Session, limit: int):
+    """Top senders from sender_counts, or None if its trigger is missing or it is empty."""
+    # Without the trigger (a create_all schema predating it) the table is stale
+    if not trigger_installed(db, "emails_sender_counts"):
+        return None
+    rows = db.query(SenderCount.sender, SenderCount.count).filter(
+        SenderCount.count > 0
+    ).order_by(SenderCount.count.desc()).limit(limit).all()
+    return rows or None
+
+
+def _stats_view_populated(db: Session, view: str = "email_stats_mv") -> bool:
+    """Whether the given materialized view exists and holds data."""
+    return bool(db.execute(
+        text("SELECT relispopulated FROM pg_class WHERE oid = to_regclass(:view)"),
+        {"view": view}
+    ).scalar())
+
+
+# Per-UTC-day totals (015_email_stats_daily), refreshed by the background sync
+_email_stats_daily = table(
+    "email_stats_daily",
+    column("day"),
+    column("email_count"),
+    column("read_count"),
+    column("unread_count"),
+    column("starred_count"),
+    column("important_count")
+)
+
+
+def _daily_sum(name: str):
+    """SUM of an email_stats_daily count column, kept an integer."""
+    return cast(func.coalesce(func.sum(_email_stats_daily.c[name]), 0), BigInteger)
+
+
+def _daily_overview_counts(db: Session, start_date: datetime, end_date: datetime):
+    """_overview_counts read from email_stats_daily; the period is rounded to whole days."""
+    daily = _email_stats_daily.c
+    return db.execute(select(
+        _daily_sum("email_count"),
+        cast(func.coalesce(func.sum(daily.email_count).filter(
+            daily.day >= start_date.date(), daily.day <= end_date.date()
+        ), 0), BigInteger),
+        _daily_sum("read_count"),
+        _daily_sum("unread_count"),
+        _daily_sum("starred_count"),
+        _daily_sum("important_count")
+    )).one()
+
+
 @router.get("/analytics/statistics")
-async def get_test_statistics(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+async def get_test_statistics(
+    cached: bool = Query(True, description="Read breakdowns from email_stats_mv when it is available"),
+    db: Session = Depends(get_db)
+):
     """Get comprehensive test statistics (no authentication required)"""
     try:
-        from sqlalchemy import func
-        from datetime import datetime, timedelta
-
-        # Basic counts
-        total_emails = db.query(Email).count()
-        read_emails = db.query(Email).filter(Email.is_read == True).count()
-        unread_emails = db.query(Email).filter(Email.is_read == False).count()
-        starred_emails = db.query(Email).filter(Email.is_starred == True).count()
-        important_emails = db.query(Email).filter(Email.is_important == True).count()
-
-        # Date range analysis
-        oldest_email = db.query(Email.date_received).order_by(Email.date_received.asc()).first()
-        newest_email = db.query(Email.date_received).order_by(Email.date_received.desc()).first()
-
-        # Yearly breakdown
-        yearly_counts = db.query(
-            func.extract('year', Email.date_received).label('year'),
-            func.count(Email.id).label('count')
-        ).filter(
-            Email.date_received.isnot(None)
-        ).group_by(
-            func.extract('year', Email.date_received)
-        ).order_by(
-            func.extract('year', Email.date_received)
-        ).all()
-
-        # Monthly breakdown (last 12 months)
+        # Monthly breakdown window (last 12 months)
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365)
 
-        monthly_counts = db.query(
-            func.extract('year', Email.date_received).label('year'),
-            func.extract('month', Email.date_received).label('month'),
-            func.count(Email.id).label('count')
-        ).filter(
-            Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).group_by(
-            func.extract('year', Email.date_received),
-            func.extract('month', Email.date_received)
-        ).order_by(
-            func.extract('year', Email.date_received),
-            func.extract('month', Email.date_received)
-        ).all()
-
-        # Sender analysis
-        unique_senders = db.query(func.count(func.distinct(Email.sender))).scalar()
-        top_senders = db.query(
-            Email.sender,
-            func.count(Email.id).label('count')
-        ).group_by(Email.sender).order_by(
-            func.count(Email.id).desc()
-        ).limit(20).all()
-
-        # Category analysis
-        categories = db.query(
-            Email.category,
-            func.count(Email.id).label('count')
-        ).group_by(Email.category).order_by(
-            func.count(Email.id).desc()
-        ).all()
-
-        # Sentiment analysis
-        sentiment_breakdown = db.query(
-            Email.sentiment_score,
-            func.count(Email.id).label('count')
-        ).group_by(Email.sentiment_score).all()
-
-        # Priority analysis
-        priority_breakdown = db.query(
-            Email.priority_score,
-            func.count(Email.id).label('count')
-        ).group_by(Email.priority_score).order_by(Email.priority_score).all()
+        def q_counts(s):
+            # The overview's single-scan counts, without its in-period column
+            total, _, read, unread, starred, important = _overview_counts(s, start_date, end_date)
+            return total, read, unread, starred, important
+
+        def q_date_range(s):
+            return s.query(
+                func.min(Email.date_received),
+                func.max(Email.date_received)
+            ).one()
+
+        def q_yearly_counts(s):
+            return s.query(
+                Email.received_year.label('year'),
+                func.count(Email.id).label('count')
+            ).filter(
+                Email.received_year.isnot(None)
+            ).group_by(
+                Email.received_year
+            ).order_by(
+                Email.received_year
+            ).all()
+
+        def q_monthly_counts(s):
+            return s.query(
+                Email.received_year.label('year'),
+                Email.received_month.label('month'),
+                func.count(Email.id).label('count')
+            ).filter(
+                Email.date_received >= start_date,
+                Email.date_received < end_date
+            ).group_by(
+                Email.received_year,
+                Email.received_month
+            ).order_by(
+                Email.received_year,
+                Email.received_month
+            ).all()
+
+        def q_unique_senders(s):
+            return s.query(func.count(func.distinct(Email.sender))).scalar()
+
+        def q_top_senders(s):
+            return s.query(
+                Email.sender,
+                func.count(Email.id).label('count')
+            ).group_by(Email.sender).order_by(
+                func.count(Email.id).desc()
+            ).limit(20).all()
+
+        # Totals and the yearly/monthly/sender breakdowns from the materialized
+        # view refreshed by the background sync (top senders from
+        # sender_counts); the monthly window is rounded to whole months.
+        def q_counts_mv(s):
+            return s.execute(text(
+                "SELECT COALESCE(SUM(email_count), 0)::bigint, "
+                "COALESCE(SUM(read_count), 0)::bigint, "
+                "COALESCE(SUM(unread_count), 0)::bigint, "
+                "COALESCE(SUM(starred_count), 0)::bigint, "
+                "COALESCE(SUM(important_count), 0)::bigint "
+                "FROM email_stats_mv"
+            )).one()
+
+        def q_yearly_counts_mv(s):
+            return s.execute(text(
+                "SELECT year, SUM(email_count)::bigint FROM email_stats_mv "
+                "WHERE year IS NOT NULL GROUP BY year ORDER BY year"
+            )).all()
+
+        def q_monthly_counts_mv(s):
+            return s.execute(text(
+                "SELECT year, month, SUM(email_count)::bigint FROM email_stats_mv "
+                "WHERE year * 12 + month BETWEEN :start_month AND :end_month "
+                "GROUP BY year, month ORDER BY year, month"
+            ), {
+                "start_month": start_date.year * 12 + start_date.month,
+                "end_month": end_date.year * 12 + end_date.month
+            }).all()
+
+        def q_unique_senders_mv(s):
+            return s.execute(text("SELECT COUNT(DISTINCT sender) FROM email_stats_mv")).scalar()
+
+        def q_top_senders_mv(s):
+            return _precomputed_top_senders(s, 20) or q_top_senders(s)
+
+        use_view = cached and await asyncio.to_thread(_stats_view_populated, db)
+        if use_view:
+            queries = (
+                q_counts_mv, q_date_range, q_yearly_counts_mv, q_monthly_counts_mv,
+                q_unique_senders_mv, q_top_senders_mv, _score_breakdowns
+            )
+        else:
+            queries = (
+                q_counts, q_date_range, q_yearly_counts, q_monthly_counts,
+                q_unique_senders, q_top_senders, _score_breakdowns
+            )
+
+        # None of these depend on each other, so run them concurrently
+        (
+            counts, (oldest_email, newest_email), yearly_counts, monthly_counts,
+            unique_senders, top_senders, (categories, sentiment_breakdown, priority_breakdown)
+        ) = await _gather_queries(db, *queries)
+        total_emails, read_emails, unread_emails, starred_emails, important_emails = counts
 
         return {
             "total_emails": total_emails,
@@ -190,8 +385,8 @@ async def get_test_statistics(db: Session = Depends(get_db)):
             "important_emails": important_emails,
             "read_rate": (read_emails / total_emails * 100) if total_emails > 0 else 0,
             "date_range": {
-                "oldest_email": oldest_email[0].isoformat() if oldest_email and oldest_email[0] else None,
-                "newest_email": newest_email[0].isoformat() if newest_email and newest_email[0] else None
+                "oldest_email": oldest_email.isoformat() if oldest_email else None,
+                "newest_email": newest_email.isoformat() if newest_email else None
             },
             "yearly_breakdown": [
                 {"year": int(year), "count": count}
@@ -219,7 +414,8 @@ async def get_test_statistics(db: Session = Depends(get_db)):
             "priority_breakdown": [
                 {"priority": priority, "count": count}
                 for priority, count in priority_breakdown
-            ]
+            ],
+            "cached": use_view
         }
 
     except Exception as e:
@@ -231,59 +427,59 @@ async def get_test_statistics(db: Session = Depends(get_db)):
 
 
 @router.get("/analytics/trends")
-async def get_test_trends(
+@cached_response(analytics_cache)
+def get_test_trends(
     days: int = 30,
+    cached: bool = Query(True, description="Read daily totals from email_stats_daily when it is available"),
     db: Session = Depends(get_db)
 ):
     """Get email trends over time (no authentication required)"""
     try:
-        from datetime import datetime, timedelta
-
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        # Get emails in date range
-        emails = db.query(Email).filter(
-            Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).order_by(Email.date_received).all()
-
-        # Group by date
-        daily_stats = {}
-        for email in emails:
-            if email.date_received:
-                date_key = email.date_received.date().isoformat()
-                if date_key not in daily_stats:
-                    daily_stats[date_key] = {
-                        "total": 0,
-                        "read": 0,
-                        "unread": 0,
-                        "starred": 0,
-                        "important": 0
-                    }
-
-                daily_stats[date_key]["total"] += 1
-                if email.is_read:
-                    daily_stats[date_key]["read"] += 1
-                else:
-                    daily_stats[date_key]["unread"] += 1
-
-                if email.is_starred:
-                    daily_stats[date_key]["starred"] += 1
-
-                if email.is_important:
-                    daily_stats[date_key]["important"] += 1
-
-        # Convert to list format
-        trends = []
-        for date_key in sorted(daily_stats.keys()):
-            trends.append({
-                "date": date_key,
-                **daily_stats[date_key]
-            })
+        use_view = cached and _stats_view_populated(db, "email_stats_daily")
+        if use_view:
+            # One precomputed row per day; the range is rounded to whole days
+            daily = _email_stats_daily.c
+            daily_counts = db.query(
+                daily.day,
+                daily.email_count,
+                daily.read_count,
+                daily.starred_count,
+                daily.important_count
+            ).filter(
+                daily.day >= start_date.date(),
+                daily.day <= end_date.date()
+            ).order_by(daily.day).all()
+        else:
+            # Aggregate per day in the database instead of loading every email
+            day = cast(Email.date_received, Date)
+            daily_counts = db.query(
+                day.label('day'),
+                func.count(Email.id),
+                func.count(Email.id).filter(Email.is_read == True),
+                func.count(Email.id).filter(Email.is_starred == True),
+                func.count(Email.id).filter(Email.is_important == True)
+            ).filter(
+                Email.date_received >= start_date,
+                Email.date_received < end_date
+            ).group_by(day).order_by(day).all()
+
+        trends = [
+            {
+                "date": day_value.isoformat(),
+                "total": total,
+                "read": read,
+                "unread": total - read,
+                "starred": starred,
+                "important": important
+            }
+            for day_value, total, read, starred, important in daily_counts
+        ]
 
-        return {"trends": trends}
+        return {"trends": trends, "cached": use_view}
 
     except Exception as e:
         logger.error(f"Error getting test trends: {e}")
@@ -294,44 +490,34 @@ async def get_test_trends(
 
 
 @router.get("/analytics/activity")
-async def get_test_activity(
+@cached_response(analytics_cache)
+def get_test_activity(
     days: int = 7,
     db: Session = Depends(get_db)
 ):
     """Get email activity patterns (no authentication required)"""
     try:
-        from datetime import datetime, timedelta
-
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        # Get emails in date range
-        emails = db.query(Email).filter(
+        # Count emails per (hour, day of week) in the database; at most 168
+        # rows come back instead of every timestamp in the range
+        hour = extract('hour', Email.date_received)
+        dow = extract('dow', Email.date_received)
+        activity_counts = db.query(hour, dow, func.count(Email.id)).filter(
             Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).all()
-
-        # Analyze by hour of day
-        hourly_activity = {}
-        for i in range(24):
-            hourly_activity[i] = 0
-
-        for email in emails:
-            if email.date_received:
-                hour = email.date_received.hour
-                hourly_activity[hour] += 1
-
-        # Analyze by day of week
-        daily_activity = {}
-        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        for i in range(7):
-            daily_activity[day_names[i]] = 0
-
-        for email in emails:
-            if email.date_received:
-                day = email.date_received.weekday()
-                daily_activity[day_names[day]] += 1
+            Email.date_received < end_date
+        ).group_by(hour, dow).all()
+
+        # Analyze by hour of day and day of week (Postgres dow counts from
+        # Sunday = 0)
+        hourly_activity = {i: 0 for i in range(24)}
+        day_names = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+        daily_activity = {name: 0 for name in day_names[1:] + day_names[:1]}
+        for hour_value, dow_value, count in activity_counts:
+            hourly_activity[int(hour_value)] += count
+            daily_activity[day_names[int(dow_value)]] += count
 
         # Get most active hours
         most_active_hours = sorted(hourly_activity.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -355,50 +541,57 @@ async def get_test_activity(
 
 
 @router.get("/analytics/performance")
-async def get_test_performance(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+def get_test_performance(db: Session = Depends(get_db)):
     """Get system performance metrics (no authentication required)"""
     try:
-        from sqlalchemy import func
-
-        # Get basic counts
-        total_emails = db.query(Email).count()
-
-        # Get emails with sentiment analysis
-        processed_emails = db.query(Email).filter(
-            Email.sentiment_score.isnot(None)
-        ).count()
-
-        # Get emails with priority scores
-        priority_processed = db.query(Email).filter(
-            Email.priority_score.isnot(None)
-        ).count()
-
-        # Get emails with categories
-        categorized_emails = db.query(Email).filter(
-            Email.category.isnot(None)
-        ).count()
+        # Get basic and processed counts from the shared snapshot
+        total_emails = processed_emails = priority_processed = categorized_emails = 0
+        for category, sentiment, priority, count in _analytics_snapshot(db):
+            total_emails += count
+            if sentiment is not None:
+                processed_emails += count
+            if priority is not None:
+                priority_processed += count
+            if category is not None:
+                categorized_emails += count
 
         # Calculate processing rates
         sentiment_rate = (processed_emails / total_emails * 100) if total_emails > 0 else 0
         priority_rate = (priority_processed / total_emails * 100) if total_emails > 0 else 0
         categorization_rate = (categorized_emails / total_emails * 100) if total_emails > 0 else 0
 
-        # Get average email size (character count)
+        # Get average email size (character count); a missing body counts as 0
+        # rather than turning the whole row's size into NULL
         avg_email_size = db.query(
-            func.avg(func.length(Email.body_plain) + func.length(Email.body_html or ''))
+            func.avg(
+                func.coalesce(func.length(Email.body_plain), 0) +
+                func.coalesce(func.length(Email.body_html), 0)
+            )
         ).scalar() or 0
 
-        # Get emails by year for storage estimation
-        yearly_counts = db.query(
-            func.extract('year', Email.date_received).label('year'),
-            func.count(Email.id).label('count')
-        ).filter(
-            Email.date_received.isnot(None)
-        ).group_by(
-            func.extract('year', Email.date_received)
-        ).order_by(
-            func.extract('year', Email.date_received)
-        ).all()
+        # Get emails by year for storage estimation, summing the per-day view
+        # when the background sync has populated it
+        if _stats_view_populated(db, "email_stats_daily"):
+            daily = _email_stats_daily.c
+            year = extract('year', daily.day)
+            yearly_counts = db.query(
+                year.label('year'),
+                _daily_sum("email_count").label('count')
+            ).filter(
+                daily.day.isnot(None)
+            ).group_by(year).order_by(year).all()
+        else:
+            yearly_counts = db.query(
+                Email.received_year.label('year'),
+                func.count(Email.id).label('count')
+            ).filter(
+                Email.received_year.isnot(None)
+            ).group_by(
+                Email.received_year
+            ).order_by(
+                Email.received_year
+            ).all()
 
         return {
             "total_emails": total_emails,
@@ -427,105 +620,168 @@ async def get_test_performance(db: Session = Depends(get_db)):
         }
 
 
+@dataclass
+class _InsightStats:
+    """Aggregates over the most recent emails that the insight rules read."""
+    total: int
+    unread: int
+    important: int
+    oldest: Optional[datetime]
+    newest: Optional[datetime]
+    top_sender: Optional[str]
+    top_sender_count: int
+    peak_hour: Optional[int]
+    peak_hour_count: int
+
+
+def _pct(part: int, whole: int) -> float:
+    return part / whole * 100 if whole else 0.0
+
+
+def _volume_insight(stats: _InsightStats) -> Optional[dict]:
+    # Newest 100 vs the 100 before them
+    if stats.total <= 10:
+        return None
+    recent_count = min(stats.total, 100)
+    older_count = min(max(stats.total - 100, 0), 100)
+    if not older_count or recent_count <= older_count * 1.5:
+        return None
+    return {
+        "type": "volume_increase",
+        "title": "Email Volume Increase",
+        "description": f"Recent email volume is {round(_pct(recent_count, older_count))}% higher than previous period",
+        "severity": "info",
+        "icon": "\U0001f4c8"
+    }
+
+
+def _unread_insight(stats: _InsightStats) -> Optional[dict]:
+    unread_percentage = _pct(stats.unread, stats.total)
+    if unread_percentage <= 30:
+        return None
+    return {
+        "type": "high_unread",
+        "title": "High Unread Email Rate",
+        "description": f"{unread_percentage:.1f}% of recent emails are unread ({stats.unread} emails)",
+        "severity": "warning",
+        "icon": "\U0001f4ec"
+    }
+
+
+def _dominant_sender_insight(stats: _InsightStats) -> Optional[dict]:
+    if stats.top_sender_count <= stats.total * 0.3:
+        return None
+    return {
+        "type": "dominant_sender",
+        "title": "Dominant Sender",
+        "description": f"{stats.top_sender} accounts for {round(_pct(stats.top_sender_count, stats.total))}% of recent emails",
+        "severity": "info",
+        "icon": "\U0001f464"
+    }
+
+
+def _peak_activity_insight(stats: _InsightStats) -> Optional[dict]:
+    if stats.peak_hour is None:
+        return None
+    return {
+        "type": "peak_activity",
+        "title": "Peak Email Activity",
+        "description": f"Most emails arrive at {stats.peak_hour}:00 ({stats.peak_hour_count} emails in recent period)",
+        "severity": "info",
+        "icon": "\u23f0"
+    }
+
+
+def _important_insight(stats: _InsightStats) -> Optional[dict]:
+    if not stats.important:
+        return None
+    return {
+        "type": "important_emails",
+        "title": "Important Email Volume",
+        "description": f"{_pct(stats.important, stats.total):.1f}% of recent emails are marked as important",
+        "severity": "info",
+        "icon": "\u2b50"
+    }
+
+
+def _date_span_insight(stats: _InsightStats) -> Optional[dict]:
+    if not (stats.oldest and stats.newest):
+        return None
+    return {
+        "type": "date_span",
+        "title": "Email Time Span",
+        "description": f"Recent emails span {(stats.newest - stats.oldest).days} days ({stats.oldest.strftime('%Y-%m-%d')} to {stats.newest.strftime('%Y-%m-%d')})",
+        "severity": "info",
+        "icon": "\U0001f4c5"
+    }
+
+
+# Evaluated in order; each rule returns an insight or None
+_INSIGHT_RULES: List[Callable[[_InsightStats], Optional[dict]]] = [
+    _volume_insight,
+    _unread_insight,
+    _dominant_sender_insight,
+    _peak_activity_insight,
+    _important_insight,
+    _date_span_insight,
+]
+
+
 @router.get("/analytics/insights")
-async def get_test_insights(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+def get_test_insights(db: Session = Depends(get_db)):
     """Get AI-generated insights about email patterns (no authentication required)"""
     try:
-        from datetime import datetime, timedelta
-
-        # Get recent emails for analysis
-        recent_emails = db.query(Email).order_by(
+        # Aggregate over the 1000 most recent emails in SQL rather than
+        # hydrating them as ORM objects
+        recent = db.query(
+            Email.sender,
+            Email.date_received,
+            Email.is_read,
+            Email.is_important
+        ).order_by(
             Email.date_received.desc()
-        ).limit(1000).all()
-
-        insights = []
-
-        # Analyze email volume trends
-        if len(recent_emails) > 10:
-            recent_count = len([e for e in recent_emails[:100]])
-            older_count = len([e for e in recent_emails[100:200]])
-
-            if recent_count > older_count * 1.5:
-                insights.append({
-                    "type": "volume_increase",
-                    "title": "Email Volume Increase",
-                    "description": f"Recent email volume is {round((recent_count/older_count)*100)}% higher than previous period",
-                    "severity": "info",
-                    "icon": "\U0001f4c8"
-                })
-
-        # Analyze unread email patterns
-        unread_emails = [e for e in recent_emails if not e.is_read]
-        unread_percentage = (len(unread_emails) / len(recent_emails)) * 100
-        if unread_percentage > 30:
-            insights.append({
-                "type": "high_unread",
-                "title": "High Unread Email Rate",
-                "description": f"{unread_percentage:.1f}% of recent emails are unread ({len(unread_emails)} emails)",
-                "severity": "warning",
-                "icon": "\U0001f4ec"
-            })
-
-        # Analyze sender patterns
-        sender_counts = {}
-        for email in recent_emails:
-            sender = email.sender.split('<')[0].strip() if email.sender else "Unknown"
-            sender_counts[sender] = sender_counts.get(sender, 0) + 1
-
-        top_sender = max(sender_counts.items(), key=lambda x: x[1])
-        if top_sender[1] > len(recent_emails) * 0.3:
-            insights.append({
-                "type": "dominant_sender",
-                "title": "Dominant Sender",
-                "description": f"{top_sender[0]} accounts for {round((top_sender[1]/len(recent_emails))*100)}% of recent emails",
-                "severity": "info",
-                "icon": "\U0001f464"
-            })
-
-        # Analyze time patterns
-        hourly_counts = {}
-        for email in recent_emails:
-            if email.date_received:
-                hour = email.date_received.hour
-                hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
-
-        if hourly_counts:
-            peak_hour = max(hourly_counts.items(), key=lambda x: x[1])
-            insights.append({
-                "type": "peak_activity",
-                "title": "Peak Email Activity",
-                "description": f"Most emails arrive at {peak_hour[0]}:00 ({peak_hour[1]} emails in recent period)",
-                "severity": "info",
-                "icon": "\u23f0"
-            })
-
-        # Analyze important emails
-        important_emails = [e for e in recent_emails if e.is_important]
-        if important_emails:
-            important_percentage = (len(important_emails) / len(recent_emails)) * 100
-            insights.append({
-                "type": "important_emails",
-                "title": "Important Email Volume",
-                "description": f"{important_percentage:.1f}% of recent emails are marked as important",
-                "severity": "info",
-                "icon": "\u2b50"
-            })
-
-        # Analyze date range
-        if recent_emails:
-            oldest_recent = min(e.date_received for e in recent_emails if e.date_received)
-            newest_recent = max(e.date_received for e in recent_emails if e.date_received)
-            if oldest_recent and newest_recent:
-                days_span = (newest_recent - oldest_recent).days
-                insights.append({
-                    "type": "date_span",
-                    "title": "Email Time Span",
-                    "description": f"Recent emails span {days_span} days ({oldest_recent.strftime('%Y-%m-%d')} to {newest_recent.strftime('%Y-%m-%d')})",
-                    "severity": "info",
-                    "icon": "\U0001f4c5"
-                })
-
-        return {"insights": insights}
+        ).limit(1000).subquery()
+
+        recent_total, unread_count, important_count, oldest_recent, newest_recent = db.query(
+            func.count(),
+            func.count().filter(recent.c.is_read.isnot(True)),
+            func.count().filter(recent.c.is_important == True),
+            func.min(recent.c.date_received),
+            func.max(recent.c.date_received)
+        ).select_from(recent).one()
+
+        if recent_total == 0:
+            return {"insights": []}
+
+        # Most frequent sender (display name part of the sender)
+        sender_name = func.coalesce(func.trim(func.split_part(recent.c.sender, '<', 1)), 'Unknown')
+        top_sender = db.query(
+            sender_name,
+            func.count()
+        ).select_from(recent).group_by(sender_name).order_by(func.count().desc()).first()
+
+        # Busiest hour of the day
+        hour = extract('hour', recent.c.date_received)
+        peak_hour = db.query(
+            hour,
+            func.count()
+        ).select_from(recent).filter(
+            recent.c.date_received.isnot(None)
+        ).group_by(hour).order_by(func.count().desc()).first()
+
+        stats = _InsightStats(
+            total=recent_total,
+            unread=unread_count,
+            important=important_count,
+            oldest=oldest_recent,
+            newest=newest_recent,
+            top_sender=top_sender[0] if top_sender else None,
+            top_sender_count=top_sender[1] if top_sender else 0,
+            peak_hour=int(peak_hour[0]) if peak_hour else None,
+            peak_hour_count=peak_hour[1] if peak_hour else 0
+        )
+        return {"insights": [insight for insight in (rule(stats) for rule in _INSIGHT_RULES) if insight]}
 
     except Exception as e:
         logger.error(f"Error getting test insights: {e}")
@@ -535,68 +791,69 @@ async def get_test_insights(db: Session = Depends(get_db)):
         }
 
 
+_DOMAIN_TYPES = {
+    "social_media": ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "facebook.com", "twitter.com"],
+    "shopping": ["amazon.com", "ebay.com", "etsy.com", "shopify.com", "walmart.com", "target.com"],
+    "finance": ["chase.com", "bankofamerica.com", "wellsfargo.com", "capitalone.com", "usbank.com"],
+    "news": ["cnn.com", "bbc.com", "nytimes.com", "washingtonpost.com", "reuters.com"],
+    "tech": ["google.com", "microsoft.com", "apple.com", "github.com", "stackoverflow.com"]
+}
+_DOMAIN_TO_CATEGORY = {d: cat for cat, domains in _DOMAIN_TYPES.items() for d in domains}
+
+
+def _domain_category(domain: str) -> str:
+    """Category of a sender domain, matching it or any parent domain
+    (mail.amazon.com counts as amazon.com)."""
+    labels = domain.split('.')
+    for i in range(len(labels) - 1):
+        category = _DOMAIN_TO_CATEGORY.get('.'.join(labels[i:]))
+        if category:
+            return category
+    return "other"
+
+
 @router.get("/analytics/domains")
-async def get_test_domain_analysis(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+def get_test_domain_analysis(db: Session = Depends(get_db)):
     """Get domain analysis for emails (no authentication required)"""
     try:
-        from sqlalchemy import func
-        import re
-
-        # Get all senders
-        senders = db.query(Email.sender).filter(Email.sender.isnot(None)).all()
+        # Extract the domain and aggregate counts/read counts per domain in one query
+        domain = func.lower(func.split_part(func.split_part(Email.sender, '@', 2), '>', 1))
+        domain_rows = db.query(
+            domain.label('domain'),
+            func.count(Email.id),
+            func.sum(case((Email.is_read == True, 1), else_=0))
+        ).filter(
+            Email.sender.isnot(None),
+            domain != ''
+        ).group_by(domain).all()
 
-        # Extract domains
         domain_counts = {}
-        domain_emails = {}
-
-        for (sender,) in senders:
-            # Extract domain from email address
-            domain_match = re.search(r'@([^>]+)', sender)
-            if domain_match:
-                domain = domain_match.group(1).lower()
-                domain_counts[domain] = domain_counts.get(domain, 0) + 1
-
-                if domain not in domain_emails:
-                    domain_emails[domain] = []
-                domain_emails[domain].append(sender)
+        domain_read_counts = {}
+        for domain_name, count, read_count in domain_rows:
+            domain_counts[domain_name] = count
+            domain_read_counts[domain_name] = read_count or 0
 
         # Get top domains
         top_domains = sorted(domain_counts.items(), key=lambda x: x[1], reverse=True)[:20]
 
         # Analyze domain types
-        domain_types = {
-            "social_media": ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "facebook.com", "twitter.com"],
-            "shopping": ["amazon.com", "ebay.com", "etsy.com", "shopify.com", "walmart.com", "target.com"],
-            "finance": ["chase.com", "bankofamerica.com", "wellsfargo.com", "capitalone.com", "usbank.com"],
-            "news": ["cnn.com", "bbc.com", "nytimes.com", "washingtonpost.com", "reuters.com"],
-            "tech": ["google.com", "microsoft.com", "apple.com", "github.com", "stackoverflow.com"]
-        }
-
         domain_categories = {}
-        for domain, count in domain_counts.items():
-            category = "other"
-            for cat, domains in domain_types.items():
-                if any(d in domain for d in domains):
-                    category = cat
-                    break
+        for domain_name, count in domain_counts.items():
+            category = _domain_category(domain_name)
             domain_categories[category] = domain_categories.get(category, 0) + count
 
         # Get domain statistics
+        total_domain_emails = sum(domain_counts.values())
         domain_stats = []
-        for domain, count in top_domains:
-            # Get read rate for this domain
-            domain_emails_list = domain_emails[domain]
-            read_count = db.query(Email).filter(
-                Email.sender.in_(domain_emails_list),
-                Email.is_read == True
-            ).count()
-            read_rate = (read_count / count * 100) if count > 0 else 0
+        for domain_name, count in top_domains:
+            read_rate = (domain_read_counts[domain_name] / count * 100) if count > 0 else 0
 
             domain_stats.append({
-                "domain": domain,
+                "domain": domain_name,
                 "count": count,
                 "read_rate": round(read_rate, 1),
-                "percentage": round((count / sum(domain_counts.values())) * 100, 1)
+                "percentage": round((count / total_domain_emails) * 100, 1)
             })
 
         return {
@@ -617,96 +874,75 @@ async def get_test_domain_analysis(db: Session = Depends(get_db)):
 
 
 @router.get("/analytics/trends-detailed")
-async def get_test_detailed_trends(
+@cached_response(analytics_cache)
+def get_test_detailed_trends(
     days: int = 90,
+    cached: bool = Query(True, description="Bucket email_stats_daily rows when it is available"),
     db: Session = Depends(get_db)
 ):
     """Get detailed email trends analysis (no authentication required)"""
     try:
-        from datetime import datetime, timedelta
-        from sqlalchemy import func
-
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        # Get emails in date range
-        emails = db.query(Email).filter(
-            Email.date_received >= start_date,
-            Email.date_received <= end_date
-        ).order_by(Email.date_received).all()
-
-        # Weekly trends
-        weekly_stats = {}
-        for email in emails:
-            if email.date_received:
-                week_start = email.date_received - timedelta(days=email.date_received.weekday())
-                week_key = week_start.strftime('%Y-%W')
-
-                if week_key not in weekly_stats:
-                    weekly_stats[week_key] = {
-                        "week_start": week_start,
-                        "total": 0,
-                        "read": 0,
-                        "unread": 0,
-                        "important": 0,
-                        "starred": 0
-                    }
-
-                weekly_stats[week_key]["total"] += 1
-                if email.is_read:
-                    weekly_stats[week_key]["read"] += 1
-                else:
-                    weekly_stats[week_key]["unread"] += 1
-
-                if email.is_important:
-                    weekly_stats[week_key]["important"] += 1
-
-                if email.is_starred:
-                    weekly_stats[week_key]["starred"] += 1
-
-        # Convert to list and sort
+        use_view = cached and _stats_view_populated(db, "email_stats_daily")
+        if use_view:
+            # Sum precomputed days; the range is rounded to whole days
+            daily = _email_stats_daily.c
+            bucketed = daily.day
+            aggregates = (
+                _daily_sum("email_count"),
+                _daily_sum("read_count"),
+                _daily_sum("important_count"),
+                _daily_sum("starred_count")
+            )
+            window = (daily.day >= start_date.date(), daily.day <= end_date.date())
+        else:
+            bucketed = Email.date_received
+            aggregates = (
+                func.count(Email.id),
+                func.count(Email.id).filter(Email.is_read == True),
+                func.count(Email.id).filter(Email.is_important == True),
+                func.count(Email.id).filter(Email.is_starred == True)
+            )
+            window = (Email.date_received >= start_date, Email.date_received < end_date)
+
+        def period_counts(unit, *key_formats):
+            """Per-period totals and flag counts, bucketed by date_trunc in the database.
+
+            Each of ``key_formats`` adds a to_char() label of the period start,
+            so the keys are formatted once per bucket in SQL.
+            """
+            period = func.date_trunc(unit, bucketed)
+            return db.query(
+                *(func.to_char(period, key_format) for key_format in key_formats),
+                *aggregates
+            ).filter(*window).group_by(period).order_by(period).all()
+
+        # Weekly trends (ISO weeks, starting on Monday)
         weekly_trends = []
-        for week_key, stats in sorted(weekly_stats.items()):
+        for week, week_start, total, read, important, starred in period_counts('week', 'IYYY-IW', 'YYYY-MM-DD'):
             weekly_trends.append({
-                "week": week_key,
-                "week_start": stats["week_start"].strftime('%Y-%m-%d'),
-                **stats
+                "week": week,
+                "week_start": week_start,
+                "total": total,
+                "read": read,
+                "unread": total - read,
+                "important": important,
+                "starred": starred
             })
 
         # Monthly trends
-        monthly_stats = {}
-        for email in emails:
-            if email.date_received:
-                month_key = email.date_received.strftime('%Y-%m')
-
-                if month_key not in monthly_stats:
-                    monthly_stats[month_key] = {
-                        "total": 0,
-                        "read": 0,
-                        "unread": 0,
-                        "important": 0,
-                        "starred": 0
-                    }
-
-                monthly_stats[month_key]["total"] += 1
-                if email.is_read:
-                    monthly_stats[month_key]["read"] += 1
-                else:
-                    monthly_stats[month_key]["unread"] += 1
-
-                if email.is_important:
-                    monthly_stats[month_key]["important"] += 1
-
-                if email.is_starred:
-                    monthly_stats[month_key]["starred"] += 1
-
-        # Convert to list and sort
         monthly_trends = []
-        for month_key, stats in sorted(monthly_stats.items()):
+        for month, total, read, important, starred in period_counts('month', 'YYYY-MM'):
             monthly_trends.append({
-                "month": month_key,
-                **stats
+                "month": month,
+                "total": total,
+                "read": read,
+                "unread": total - read,
+                "important": important,
+                "starred": starred
             })
 
         # Calculate growth rates
@@ -726,13 +962,14 @@ async def get_test_detailed_trends(
 
         return {
             "period_days": days,
-            "total_emails_in_period": len(emails),
+            "total_emails_in_period": sum(week["total"] for week in weekly_trends),
             "weekly_trends": weekly_trends,
             "monthly_trends": monthly_trends,
             "growth_rates": {
                 "weekly_growth": round(weekly_growth, 1),
                 "monthly_growth": round(monthly_growth, 1)
-            }
+            },
+            "cached": use_view
         }
 
     except Exception as e:
@@ -744,26 +981,30 @@ async def get_test_detailed_trends(
 
 
 @router.get("/analytics/categories")
-async def get_test_categories(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+def get_test_categories(db: Session = Depends(get_db)):
     """Get email categories analytics (no authentication required)"""
     try:
-        from sqlalchemy import func
-
-        # Get category distribution
-        category_stats = db.query(
-            Email.category,
-            func.count(Email.id).label('count'),
-            func.avg(Email.sentiment_score).label('avg_sentiment'),
-            func.avg(Email.priority_score).label('avg_priority')
-        ).group_by(Email.category).all()
+        # Per category: [count, sentiment sum, sentiment count, priority sum, priority count];
+        # averages skip NULL scores the same way AVG() does
+        category_stats = {}
+        for category, sentiment, priority, count in _analytics_snapshot(db):
+            stats = category_stats.setdefault(category, [0, 0, 0, 0, 0])
+            stats[0] += count
+            if sentiment is not None:
+                stats[1] += sentiment * count
+                stats[2] += count
+            if priority is not None:
+                stats[3] += priority * count
+                stats[4] += count
 
         categories = []
-        for cat, count, avg_sentiment, avg_priority in category_stats:
+        for cat, (count, sentiment_sum, sentiment_count, priority_sum, priority_count) in category_stats.items():
             categories.append({
                 "category": cat or "uncategorized",
                 "count": count,
-                "avg_sentiment": float(avg_sentiment) if avg_sentiment else 0,
-                "avg_priority": float(avg_priority) if avg_priority else 0
+                "avg_sentiment": sentiment_sum / sentiment_count if sentiment_count else 0,
+                "avg_priority": priority_sum / priority_count if priority_count else 0
             })
 
         return {"categories": categories}
@@ -777,31 +1018,28 @@ async def get_test_categories(db: Session = Depends(get_db)):
 
 
 @router.get("/analytics/senders")
-async def get_test_senders(
+@cached_response(analytics_cache)
+def get_test_senders(
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """Get sender analytics (no authentication required)"""
     try:
-        from sqlalchemy import func
-
-        # Get top senders with basic stats
+        # Get top senders with their read counts in one grouped query
         sender_stats = db.query(
             Email.sender,
-            func.count(Email.id).label('count')
+            func.count(Email.id).label('count'),
+            func.sum(case((Email.is_read == True, 1), else_=0)).label('read_count')
+        ).filter(
+            Email.sender.isnot(None),
+            func.trim(Email.sender) != ''
         ).group_by(Email.sender).order_by(
             func.count(Email.id).desc()
         ).limit(limit).all()
 
         senders = []
-        for sender, count in sender_stats:
-            if sender and sender.strip():  # Skip None and empty senders
-                # Get read count for this sender
-                read_count = db.query(Email).filter(
-                    Email.sender == sender,
-                    Email.is_read == True
-                ).count()
-
+        for sender, count, read_count in sender_stats:
+            if sender.strip():  # Skip senders that are only whitespace
                 senders.append({
                     "sender": sender,
                     "count": count,
@@ -823,32 +1061,22 @@ async def get_test_senders(
 
 
 @router.get("/analytics/sentiment")
-async def get_test_sentiment(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+def get_test_sentiment(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get sentiment analysis insights (no authentication required)"""
     try:
-        from sqlalchemy import func
-
-        # Get sentiment distribution
-        sentiment_stats = db.query(
-            Email.sentiment_score,
-            func.count(Email.id).label('count')
-        ).group_by(Email.sentiment_score).all()
-
+        # Get the sentiment split from the shared snapshot; anything not
+        # scored positive or negative (0 or NULL) counts as neutral
         sentiment_data = {
             "positive": 0,
             "neutral": 0,
             "negative": 0,
             "total": 0
         }
-
-        for sentiment, count in sentiment_stats:
+        sentiment_keys = {1: "positive", -1: "negative"}
+        for category, sentiment, priority, count in _analytics_snapshot(db):
             sentiment_data["total"] += count
-            if sentiment == 1:
-                sentiment_data["positive"] = count
-            elif sentiment == -1:
-                sentiment_data["negative"] = count
-            else:
-                sentiment_data["neutral"] = count
+            sentiment_data[sentiment_keys.get(sentiment, "neutral")] += count
 
         # Calculate percentages
         if sentiment_data["total"] > 0:
@@ -871,43 +1099,28 @@ async def get_test_sentiment(db: Session = Depends(get_db)):
 
 
 @router.get("/analytics/priority")
-async def get_test_priority(db: Session = Depends(get_db)):
+@cached_response(analytics_cache)
+def get_test_priority(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get priority analysis insights (no authentication required)"""
     try:
-        from sqlalchemy import func
-
-        # Get priority distribution
-        priority_stats = db.query(
-            Email.priority_score,
-            func.count(Email.id).label('count')
-        ).group_by(Email.priority_score).order_by(Email.priority_score).all()
+        # Get priority distribution from the shared snapshot, ordered by score with NULL last
+        priority_counts = {}
+        for category, sentiment, priority, count in _analytics_snapshot(db):
+            priority_counts[priority] = priority_counts.get(priority, 0) + count
+        priority_stats = sorted(priority_counts.items(), key=lambda item: (item[0] is None, item[0] or 0))
 
         priority_data = {
-            "high_priority": 0,  # 8-10
-            "medium_priority": 0,  # 4-7
-            "low_priority": 0,  # 1-3
-            "total": 0,
-            "distribution": []
+            "high_priority": sum(count for priority, count in priority_stats if priority is not None and priority >= 8),
+            "medium_priority": sum(count for priority, count in priority_stats if priority is not None and 4 <= priority < 8),
+            # 1-3, plus emails without priority scores
+            "low_priority": sum(count for priority, count in priority_stats if priority is None or priority < 4),
+            "total": sum(priority_counts.values()),
+            "distribution": [
+                {"priority": priority, "count": count}
+                for priority, count in priority_stats
+            ]
         }
 
-        for priority, count in priority_stats:
-            priority_data["total"] += count
-            priority_data["distribution"].append({
-                "priority": priority,
-                "count": count
-            })
-
-            if priority is not None:
-                if priority >= 8:
-                    priority_data["high_priority"] += count
-                elif priority >= 4:
-                    priority_data["medium_priority"] += count
-                else:
-                    priority_data["low_priority"] += count
-            else:
-                # Handle emails without priority scores
-                priority_data["low_priority"] += count
-
         # Calculate percentages
         if priority_data["total"] > 0:
             priority_data["high_priority_percent"] = (priority_data["high_priority"] / priority_data["total"]) * 100
@@ -1,5 +1,5 @@
 from .database import Base, engine, get_db
-from .email import Email, EmailAttachment, EmailLabel
+from .email import Email, EmailAttachment, EmailLabel, EmailLabelLink, SenderCount, EmailScoreCount
 from .user import User, UserSession
 from .sync_session import SyncSession
 
@@ -10,6 +10,9 @@ __all__ = [
     "Email",
     "EmailAttachment", 
     "EmailLabel",
+    "EmailLabelLink",
+    "SenderCount",
+    "EmailScoreCount",
     "User",
     "UserSession",
     "SyncSession"
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
@@ -29,6 +31,7 @@ engine = create_engine(
     pool_pre_ping=True,  # Verify connections before use
     pool_recycle=1800,  # Recycle connections after 30 minutes (reduced from 1 hour)
     pool_timeout=30,  # Timeout for getting connection from pool
+    pool_use_lifo=True,  # Reuse the most recently returned connection; idle extras age out via pool_recycle
     echo=False,  # Set to True for SQL debugging
     # PostgreSQL-specific optimizations
     connect_args={
@@ -46,6 +49,7 @@ frontend_engine = create_engine(
     pool_pre_ping=True,  # Verify connections before use
     pool_recycle=900,  # Recycle connections after 15 minutes
     pool_timeout=10,  # Shorter timeout for frontend
+    pool_use_lifo=True,  # Reuse the most recently returned connection
     echo=False,
     # Frontend-specific optimizations with shorter timeouts
     connect_args={
@@ -54,6 +58,27 @@ frontend_engine = create_engine(
     }
 )
 
+# Async engine for read-only endpoints that should not hold an event-loop
+# thread while a query runs. asyncpg uses the binary protocol and prepares
+# and caches statements per connection by itself.
+async_engine = create_async_engine(
+    make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=900,
+    pool_timeout=10,
+    pool_use_lifo=True,
+    echo=False,
+    connect_args={
+        "server_settings": {
+            "application_name": "gmail_backup_async",
+            "timezone": "utc",
+            "statement_timeout": "30000"  # 30 seconds, as for the frontend engine
+        }
+    }
+)
+
 # Create SessionLocal class with optimized settings
 SessionLocal = sessionmaker(
     autocommit=False, 
@@ -70,6 +95,14 @@ FrontendSessionLocal = sessionmaker(
     expire_on_commit=False  # Keep objects loaded after commit
 )
 
+# Create AsyncSessionLocal class for async endpoints
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class
 Base = declarative_base()
 
@@ -101,6 +134,48 @@ def get_frontend_db():
         except Exception as e:
             logger.warning(f"Non-fatal error while closing FRONTEND DB session: {e}")
 
+# Dependency to get an AsyncSession on the asyncpg engine
+async def get_async_db():
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        try:
+            await db.close()
+        except Exception as e:
+            logger.warning(f"Non-fatal error while closing ASYNC DB session: {e}")
+
+# Trigger-maintained tables (sender_counts, ...) get their triggers from
+# Alembic migrations. Schemas built by Base.metadata.create_all instead
+# (main.py, the tests) install the same triggers through this hook, right
+# after the table itself is created, and backfill it in the same transaction.
+def install_after_create(table, *statements):
+    """Run raw DDL/SQL whenever Base.metadata.create_all creates ``table``."""
+    def install(target, connection, tables=(), **kw):
+        if table in tables:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+
+    event.listen(Base.metadata, "after_create", install)
+
+_installed_triggers = set()
+
+def trigger_installed(db, name: str) -> bool:
+    """
+    Whether the named trigger exists. A trigger-maintained table is only
+    trusted while its trigger is in place; triggers found are remembered
+    for the life of the process.
+    """
+    if name in _installed_triggers:
+        return True
+    found = db.execute(
+        text("SELECT 1 FROM pg_trigger WHERE tgname = :name AND NOT tgisinternal"),
+        {"name": name}
+    ).first() is not None
+    if found:
+        _installed_triggers.add(name)
+    return found
+
 # Function to create all tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
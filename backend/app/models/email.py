@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, event, literal_column, text, Column, Integer, BigInteger, SmallInteger, String, Text, DateTime, Boolean, ForeignKey, Index, Computed, UniqueConstraint
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import JSONB, BYTEA
-from .database import Base
+from sqlalchemy.dialects.postgresql import JSONB
+from .database import Base, install_after_create
 import json
 
 class Email(Base):
@@ -28,6 +28,19 @@ class Email(Base):
     date_sent = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    # Generated UTC year/month of date_received, used to group analytics breakdowns
+    # through an index rather than EXTRACT over every row
+    received_year = deferred(Column(SmallInteger, Computed(
+        "CAST(EXTRACT(YEAR FROM date_received AT TIME ZONE 'UTC') AS SMALLINT)", persisted=True
+    )))
+    received_month = deferred(Column(SmallInteger, Computed(
+        "CAST(EXTRACT(MONTH FROM date_received AT TIME ZONE 'UTC') AS SMALLINT)", persisted=True
+    )))
+
+    # Generated first 200 characters of body_plain, so listings can show a
+    # preview without detoasting whole bodies
+    body_preview = deferred(Column(String(200), Computed("LEFT(body_plain, 200)", persisted=True)))
     
     # Flags
     is_read = Column(Boolean, default=False)
@@ -40,9 +53,9 @@ class Email(Base):
     labels = Column(JSONB)  # List of Gmail labels - use JSONB for better performance
     
     # AI analysis results
-    sentiment_score = Column(Integer)  # -1 to 1
+    sentiment_score = Column(SmallInteger)  # -1 to 1
     category = Column(String(100))  # work, personal, spam, etc.
-    priority_score = Column(Integer)  # 1-10
+    priority_score = Column(SmallInteger)  # 1-10
     summary = Column(Text)
     
     # Relationships
@@ -63,13 +76,12 @@ class EmailAttachment(Base):
     size = Column(Integer)  # Size in bytes
     content_id = Column(String(255))  # For inline attachments
     
-    # Storage - Store as BLOB in database for better performance
-    file_data = Column(BYTEA)  # PostgreSQL BLOB field for file content
-    file_path = Column(String(1000))  # Keep for backward compatibility
+    # Storage - bytes live in the content-addressed attachment store, keyed by checksum
+    file_path = Column(String(1000))  # Path in the attachment store
     is_inline = Column(Boolean, default=False)
     
     # Additional metadata for better search
-    checksum = Column(String(64))  # SHA256 hash for deduplication
+    checksum = Column(String(64))  # SHA256 hash; also the attachment store key
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -92,18 +104,200 @@ class EmailLabel(Base):
     def __repr__(self):
         return f"<EmailLabel(id={self.id}, name='{self.name}')>"
 
+class EmailLabelLink(Base):
+    """One row per label on an email, kept in step with ``Email.labels`` by a trigger."""
+    __tablename__ = "email_label_links"
+
+    label = Column(String(255), primary_key=True)
+    email_id = Column(Integer, ForeignKey("emails.id", ondelete="CASCADE"), primary_key=True)
+
+    def __repr__(self):
+        return f"<EmailLabelLink(label='{self.label}', email_id={self.email_id})>"
+
+class SenderCount(Base):
+    """Per-sender email totals, kept current by a trigger on ``emails``."""
+    __tablename__ = "sender_counts"
+
+    sender = Column(String(500), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SenderCount(sender='{self.sender}', count={self.count})>"
+
+class EmailScoreCount(Base):
+    """Email totals per (category, sentiment_score, priority_score), kept current by a trigger on ``emails``."""
+    __tablename__ = "email_score_counts"
+    __table_args__ = (
+        UniqueConstraint(
+            'category', 'sentiment_score', 'priority_score',
+            name='uq_email_score_counts_key',
+            postgresql_nulls_not_distinct=True
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    category = Column(String(100))
+    sentiment_score = Column(SmallInteger)
+    priority_score = Column(SmallInteger)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<EmailScoreCount(category='{self.category}', sentiment_score={self.sentiment_score}, "
+            f"priority_score={self.priority_score}, count={self.count})>"
+        )
+
 # Create indexes for better search performance
 Index('idx_emails_sender_date', Email.sender, Email.date_received)
 Index('idx_emails_subject', Email.subject)
+# Trigram indexes for ILIKE '%q%' search on subject and sender (006_search_indexes);
+# create_all needs the extension in place before it builds them
+event.listen(Email.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+Index('idx_emails_subject_trgm', Email.subject, postgresql_using='gin',
+      postgresql_ops={'subject': 'gin_trgm_ops'})
+Index('idx_emails_sender_trgm', Email.sender, postgresql_using='gin',
+      postgresql_ops={'sender': 'gin_trgm_ops'})
+# Body search (search_service.email_search_filter): trigram substring match
+# over the first 4096 characters (009_body_trgm_index) and whole-word
+# phrases over the full body (006_search_indexes); same expressions as the
+# filter, so the planner can use them
+Index('idx_emails_body_trgm', func.left(Email.body_plain, literal_column('4096')).label('body_prefix'),
+      postgresql_using='gin', postgresql_ops={'body_prefix': 'gin_trgm_ops'})
+Index('idx_emails_body_fts', func.to_tsvector(text("'simple'"), func.coalesce(Email.body_plain, text("''"))),
+      postgresql_using='gin')
 Index('idx_emails_labels', Email.labels, postgresql_using='gin')  # GIN index for JSONB
 Index('idx_emails_category', Email.category)
 Index('idx_emails_sentiment', Email.sentiment_score)
 Index('idx_emails_gmail_id', Email.gmail_id)
 Index('idx_emails_thread_id', Email.thread_id)
 Index('idx_emails_date_received', Email.date_received)
+# Keyset pagination; covers the listing columns so pages can be read from the index
+Index('idx_emails_date_id_cover', Email.date_received.desc(), Email.id.desc(),
+      postgresql_include=['subject', 'sender', 'is_read', 'is_starred'])
+Index('idx_emails_created_at', Email.created_at)
+Index('ix_emails_year_month', Email.received_year, Email.received_month)
+Index('idx_emails_sender_is_read', Email.sender, Email.is_read)
+Index('idx_emails_sentiment_priority', Email.sentiment_score, Email.priority_score)
+Index('idx_emails_priority_score', Email.priority_score)
+Index('idx_emails_unread_date', Email.date_received.desc(), postgresql_where=(Email.is_read == False))
 
 # Additional indexes for attachments
 Index('idx_attachments_email_id', EmailAttachment.email_id)
 Index('idx_attachments_filename', EmailAttachment.filename)
 Index('idx_attachments_content_type', EmailAttachment.content_type)
 Index('idx_attachments_checksum', EmailAttachment.checksum)
+
+# Links by email, for the cascade from deleted emails
+Index('idx_email_label_links_email_id', EmailLabelLink.email_id)
+
+# Top-K lookups over precomputed sender totals
+Index('idx_sender_counts_count', SenderCount.count.desc())
+
+# Same trigger and backfill as 004_sender_counts, for schemas built by create_all
+install_after_create(
+    SenderCount.__table__,
+    """
+    CREATE OR REPLACE FUNCTION sender_counts_track() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.sender IS NOT NULL THEN
+            UPDATE sender_counts SET count = count - 1 WHERE sender = OLD.sender;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.sender IS NOT NULL THEN
+            INSERT INTO sender_counts (sender, count) VALUES (NEW.sender, 1)
+            ON CONFLICT (sender) DO UPDATE SET count = sender_counts.count + 1;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS emails_sender_counts ON emails",
+    """
+    CREATE TRIGGER emails_sender_counts
+    AFTER INSERT OR DELETE OR UPDATE OF sender ON emails
+    FOR EACH ROW EXECUTE FUNCTION sender_counts_track()
+    """,
+    """
+    INSERT INTO sender_counts (sender, count)
+    SELECT sender, COUNT(*) FROM emails
+    WHERE sender IS NOT NULL
+    GROUP BY sender
+    """
+)
+
+# Same trigger and backfill as 017_email_score_counts, for schemas built by create_all
+install_after_create(
+    EmailScoreCount.__table__,
+    """
+    CREATE OR REPLACE FUNCTION email_score_counts_track() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE'
+           AND OLD.category IS NOT DISTINCT FROM NEW.category
+           AND OLD.sentiment_score IS NOT DISTINCT FROM NEW.sentiment_score
+           AND OLD.priority_score IS NOT DISTINCT FROM NEW.priority_score THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE email_score_counts SET count = count - 1
+            WHERE category IS NOT DISTINCT FROM OLD.category
+              AND sentiment_score IS NOT DISTINCT FROM OLD.sentiment_score
+              AND priority_score IS NOT DISTINCT FROM OLD.priority_score;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO email_score_counts (category, sentiment_score, priority_score, count)
+            VALUES (NEW.category, NEW.sentiment_score, NEW.priority_score, 1)
+            ON CONFLICT (category, sentiment_score, priority_score)
+            DO UPDATE SET count = email_score_counts.count + 1;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS emails_score_counts ON emails",
+    """
+    CREATE TRIGGER emails_score_counts
+    AFTER INSERT OR DELETE OR UPDATE OF category, sentiment_score, priority_score ON emails
+    FOR EACH ROW EXECUTE FUNCTION email_score_counts_track()
+    """,
+    """
+    INSERT INTO email_score_counts (category, sentiment_score, priority_score, count)
+    SELECT category, sentiment_score, priority_score, COUNT(*) FROM emails
+    GROUP BY category, sentiment_score, priority_score
+    """
+)
+
+# Same trigger and backfill as 019_email_label_links, for schemas built by create_all
+install_after_create(
+    EmailLabelLink.__table__,
+    """
+    CREATE OR REPLACE FUNCTION email_label_links_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF OLD.labels IS NOT DISTINCT FROM NEW.labels THEN
+                RETURN NULL;
+            END IF;
+            DELETE FROM email_label_links WHERE email_id = OLD.id;
+        END IF;
+        IF jsonb_typeof(NEW.labels) = 'array' THEN
+            INSERT INTO email_label_links (label, email_id)
+            SELECT DISTINCT value, NEW.id FROM jsonb_array_elements_text(NEW.labels)
+            ON CONFLICT DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS emails_label_links ON emails",
+    """
+    CREATE TRIGGER emails_label_links
+    AFTER INSERT OR UPDATE OF labels ON emails
+    FOR EACH ROW EXECUTE FUNCTION email_label_links_sync()
+    """,
+    """
+    INSERT INTO email_label_links (label, email_id)
+    SELECT DISTINCT label.value, emails.id
+    FROM emails
+    CROSS JOIN LATERAL jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(emails.labels) = 'array' THEN emails.labels ELSE '[]'::jsonb END
+    ) AS label
+    """
+)
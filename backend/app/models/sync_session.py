@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
-from .database import Base
+from .database import Base, install_after_create
+
+_UTC = timezone.utc
 
 class SyncSession(Base):
     __tablename__ = "sync_sessions"
@@ -36,7 +40,7 @@ class SyncSession(Base):
     # Performance metrics
     total_api_calls = Column(Integer, default=0)  # Total Gmail API calls made
     avg_batch_time_ms = Column(Integer)  # Average time per batch in milliseconds
-    total_duration_seconds = Column(Integer)  # Total sync duration when completed
+    total_duration_seconds = Column(Integer)  # Total sync duration when completed; also set by a trigger on completed_at
     
     # Error tracking
     error_count = Column(Integer, default=0)  # Number of errors encountered
@@ -66,10 +70,13 @@ class SyncSession(Base):
     def duration_seconds(self) -> int:
         """Get current or final duration of the sync session"""
         if self.completed_at:
-            return self.total_duration_seconds or 0
+            if self.total_duration_seconds is not None:
+                return self.total_duration_seconds
+            if self.started_at:
+                return max(int((self.completed_at - self.started_at).total_seconds()), 0)
+            return 0
         elif self.started_at:
-            from datetime import datetime, timezone
-            return int((datetime.now(timezone.utc) - self.started_at).total_seconds())
+            return int((datetime.now(_UTC) - self.started_at).total_seconds())
         return 0
     
     @property
@@ -82,9 +89,8 @@ class SyncSession(Base):
     
     def mark_completed(self, final_stats: dict = None):
         """Mark sync session as completed and update final stats"""
-        from datetime import datetime, timezone
         self.status = 'completed'
-        self.completed_at = datetime.now(timezone.utc)
+        self.completed_at = datetime.now(_UTC)
         self.total_duration_seconds = self.duration_seconds
         
         if final_stats:
@@ -94,24 +100,76 @@ class SyncSession(Base):
     
     def mark_failed(self, error_message: str = None):
         """Mark sync session as failed"""
-        from datetime import datetime, timezone
+        now = datetime.now(_UTC)
         self.status = 'failed'
-        self.completed_at = datetime.now(timezone.utc)
+        self.completed_at = now
         self.total_duration_seconds = self.duration_seconds
         
         if error_message:
             self.last_error_message = error_message
-            self.last_error_at = datetime.now(timezone.utc)
+            self.last_error_at = now
             self.error_count += 1
     
     def update_progress(self, **kwargs):
         """Update progress counters"""
-        from datetime import datetime, timezone
-        
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
         
-        self.last_activity_at = datetime.now(timezone.utc)
+        self.last_activity_at = datetime.now(_UTC)
         if self.status == 'started':
             self.status = 'running'
+
+# A user's active session, newest first; only in-flight sessions are indexed,
+# so the index stays a handful of rows however long the history grows
+Index('idx_sync_sessions_active_user_started', SyncSession.user_id, SyncSession.started_at.desc(),
+      postgresql_where=SyncSession.status.in_(['started', 'running']))
+
+# Same notify trigger as 013_sync_progress_notify, for schemas built by
+# create_all; /sync/stream forwards what it publishes
+install_after_create(
+    SyncSession.__table__,
+    """
+    CREATE OR REPLACE FUNCTION sync_sessions_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('sync_progress', json_build_object(
+            'id', NEW.id,
+            'status', NEW.status,
+            'emails_synced', NEW.emails_synced,
+            'emails_processed', NEW.emails_processed,
+            'started_at', NEW.started_at,
+            'completed_at', NEW.completed_at
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS sync_sessions_progress_notify ON sync_sessions",
+    """
+    CREATE TRIGGER sync_sessions_progress_notify
+    AFTER INSERT OR UPDATE ON sync_sessions
+    FOR EACH ROW EXECUTE FUNCTION sync_sessions_notify()
+    """
+)
+
+# Same duration trigger as 020_sync_session_duration, for schemas built by create_all
+install_after_create(
+    SyncSession.__table__,
+    """
+    CREATE OR REPLACE FUNCTION sync_sessions_duration() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.completed_at IS NOT NULL AND NEW.started_at IS NOT NULL THEN
+            NEW.total_duration_seconds :=
+                GREATEST(EXTRACT(EPOCH FROM NEW.completed_at - NEW.started_at), 0)::integer;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS sync_sessions_set_duration ON sync_sessions",
+    """
+    CREATE TRIGGER sync_sessions_set_duration
+    BEFORE INSERT OR UPDATE OF started_at, completed_at ON sync_sessions
+    FOR EACH ROW EXECUTE FUNCTION sync_sessions_duration()
+    """
+)
@@ -6,6 +6,14 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Text cleanup and entity patterns, applied to every analyzed email
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\!\?\-\:]')
+_EMAIL_ADDRESS_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_DATE_RE = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b')
+
 # Lazy imports for heavy ML dependencies
 torch = None
 pipeline = None
@@ -125,11 +133,11 @@ class AIService:
     def _clean_text(self, text: str) -> str:
         """Clean and preprocess text"""
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        text = _HTML_TAG_RE.sub('', text)
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\-\:]', '', text)
+        text = _SPECIAL_CHARS_RE.sub('', text)
         return text.strip()
     
     def _analyze_sentiment(self, text: str) -> int:
@@ -512,16 +520,14 @@ class AIService:
             }
         
         # Simple entity extraction using regex patterns
-        import re
-        
         # Extract email addresses
-        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+        emails = _EMAIL_ADDRESS_RE.findall(text)
         
         # Extract URLs
-        urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', text)
+        urls = _URL_RE.findall(text)
         
         # Extract dates (simple pattern)
-        dates = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', text)
+        dates = _DATE_RE.findall(text)
         
         # Extract potential names (words starting with capital letters)
         words = text.split()
@@ -0,0 +1,136 @@
+"""
+Content-addressed storage for attachment bytes.
+
+Attachments are written once per SHA-256 checksum under ATTACHMENTS_DIR
+(``<dir>/<first two hex chars>/<checksum>``), so identical files received
+in different emails share a single copy. Only the path is kept in
+``email_attachments``.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from ..models.email import EmailAttachment
+
+logger = logging.getLogger(__name__)
+
+# A relative ATTACHMENTS_DIR is taken from the backend directory rather than
+# the working directory, so the API, the sync workers and Alembic all agree
+# on it (/app/attachments in the Docker image)
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ATTACHMENTS_DIR = os.path.join(_BACKEND_DIR, os.getenv("ATTACHMENTS_DIR", "attachments"))
+
+
+def attachment_path(checksum: str) -> str:
+    """Storage path for the attachment with the given SHA-256 checksum."""
+    return os.path.join(ATTACHMENTS_DIR, checksum[:2], checksum)
+
+
+def store_attachment(data: bytes, checksum: Optional[str] = None) -> str:
+    """
+    Write attachment bytes to the store unless an identical file is already
+    there, and return its path. The file is written to a temporary name and
+    renamed into place, so readers never see a partial attachment.
+    """
+    if checksum is None:
+        checksum = hashlib.sha256(data).hexdigest()
+    path = attachment_path(checksum)
+    if os.path.exists(path):
+        return path
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def remove_attachment(path: str):
+    """Delete a stored attachment file; missing files are ignored."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not delete attachment file {path}: {e}")
+
+
+def _referenced_checksums(db: Session, checksums: Iterable[str]) -> Set[str]:
+    return {
+        checksum for (checksum,) in db.query(EmailAttachment.checksum)
+        .filter(EmailAttachment.checksum.in_(list(checksums)))
+        .distinct()
+    }
+
+
+def release_attachments(db: Session, checksums: Iterable[str]):
+    """
+    Delete the stored files for these checksums that no ``email_attachments``
+    row references any more. Call it after committing the change that
+    dropped (or never inserted) the rows.
+
+    A file is first moved aside and the rows are checked again before it is
+    deleted, so an email that committed a row for the same checksum in the
+    meantime keeps its file (see restore_attachments for the other side).
+    """
+    checksums = {checksum for checksum in checksums if checksum}
+    if not checksums:
+        return
+    unused = checksums - _referenced_checksums(db, checksums)
+
+    released = {}
+    for checksum in unused:
+        path = attachment_path(checksum)
+        released_path = os.path.join(os.path.dirname(path), f".release-{uuid.uuid4().hex}")
+        try:
+            os.replace(path, released_path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Could not release attachment file {path}: {e}")
+            continue
+        released[checksum] = (path, released_path)
+    if not released:
+        return
+
+    try:
+        in_use = _referenced_checksums(db, released)
+    except BaseException:
+        for path, released_path in released.values():
+            os.replace(released_path, path)
+        raise
+    for checksum, (path, released_path) in released.items():
+        if checksum in in_use:
+            os.replace(released_path, path)
+        else:
+            remove_attachment(released_path)
+
+
+def restore_attachments(attachments: Iterable[Dict[str, Any]], download: Callable[[Dict[str, Any]], bytes]):
+    """
+    Store again the files of just-committed attachments that are missing.
+
+    store_attachment() skips files that are already stored, and a concurrent
+    release_attachments() for the same checksum may delete that file before
+    the new row is committed. Call this after the commit; ``download``
+    fetches the bytes of one attachment again.
+    """
+    for attachment_data in attachments:
+        path = attachment_data.get('file_path')
+        if not path or os.path.exists(path):
+            continue
+        logger.warning(f"Attachment file {path} was released before its row was committed, storing it again")
+        store_attachment(download(attachment_data), attachment_data.get('checksum'))
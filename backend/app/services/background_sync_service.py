@@ -8,9 +8,13 @@ from sqlalchemy import func, text
 from ..models.database import SessionLocal
 from ..models.user import User
 from ..models.email import Email
+from .cache_service import invalidate_analytics_cache
 
 logger = logging.getLogger(__name__)
 
+# Materialized views backing the analytics endpoints, refreshed after sync cycles
+ANALYTICS_MATERIALIZED_VIEWS = ("email_stats_mv", "email_stats_daily")
+
 class BackgroundSyncService:
     """
     Background service for continuous email synchronization
@@ -22,6 +26,8 @@ class BackgroundSyncService:
         self.last_sync_time = None
         self.sync_in_progress = False  # Lock to prevent overlapping syncs
         self._sync_service = None  # Cached OptimizedSyncService instance
+        self.analytics_refresh_interval = 900  # Refresh analytics views at most every 15 minutes
+        self.last_analytics_refresh = 0.0
         self.sync_stats = {
             "total_syncs": 0,
             "total_emails_synced": 0,
@@ -166,6 +172,9 @@ class BackgroundSyncService:
             except Exception as analyze_err:
                 logger.warning(f"ANALYZE emails failed: {analyze_err}")
 
+            if time.time() - self.last_analytics_refresh >= self.analytics_refresh_interval:
+                await asyncio.to_thread(self.refresh_analytics_views)
+
         except Exception as e:
             self.sync_stats["errors"] += 1
             logger.error(f"Error in sync cycle: {e}")
@@ -176,6 +185,34 @@ class BackgroundSyncService:
             if db:
                 db.close()
     
+    def refresh_analytics_views(self):
+        """
+        Refresh the materialized views read by the analytics endpoints.
+        Views that have not been created yet (migration not applied) are skipped.
+        """
+        db = SessionLocal()
+        try:
+            for view in ANALYTICS_MATERIALIZED_VIEWS:
+                populated = db.execute(
+                    text("SELECT relispopulated FROM pg_class WHERE oid = to_regclass(:view)"),
+                    {"view": view}
+                ).scalar()
+                if populated is None:
+                    continue
+                try:
+                    # CONCURRENTLY keeps the view readable but needs existing data
+                    concurrently = "CONCURRENTLY " if populated else ""
+                    db.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}{view}"))
+                    db.commit()
+                    logger.info(f"Refreshed materialized view {view}")
+                    invalidate_analytics_cache()
+                except Exception as refresh_err:
+                    db.rollback()
+                    logger.warning(f"Refreshing materialized view {view} failed: {refresh_err}")
+            self.last_analytics_refresh = time.time()
+        finally:
+            db.close()
+
     def get_sync_status(self) -> Dict[str, Any]:
         """
         Get current background sync status
@@ -209,9 +246,11 @@ class BackgroundSyncService:
             
             # Get emails by year
             yearly_stats = db.query(
-                func.extract('year', Email.date_received).label('year'),
+                Email.received_year.label('year'),
                 func.count(Email.id).label('count')
-            ).group_by('year').order_by('year').all()
+            ).filter(
+                Email.received_year.isnot(None)
+            ).group_by(Email.received_year).order_by(Email.received_year).all()
             
             # Get recent activity
             recent_emails = db.query(Email).order_by(Email.date_received.desc()).limit(10).all()
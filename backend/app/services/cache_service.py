@@ -0,0 +1,181 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import orjson
+from fastapi import Response
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with a per-entry time-to-live.
+    Least recently used entries are evicted once maxsize is reached.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# Responses of the /analytics/* dashboard endpoints, dropped whenever a sync completes
+analytics_cache = TTLCache(maxsize=64, ttl=30)
+
+
+def invalidate_analytics_cache():
+    """Drop cached analytics results so the next request sees freshly synced emails."""
+    analytics_cache.clear()
+    logger.debug("Analytics cache cleared")
+
+
+# The email total behind the paginated listing endpoints (the single key
+# "emails"), dropped whenever a sync completes
+email_count_cache = TTLCache(maxsize=1, ttl=30)
+_email_count_lock = threading.Lock()
+_COUNT_EMAILS_SQL = text("SELECT COUNT(*) FROM emails")
+_ESTIMATE_EMAILS_SQL = text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'emails'")
+
+
+def invalidate_email_count_cache():
+    """Drop cached email totals so pagination reflects freshly synced emails."""
+    email_count_cache.clear()
+    logger.debug("Email count cache cleared")
+
+
+def get_email_count_cached(db) -> Tuple[int, float]:
+    """
+    Exact email total and the time.time() it was counted. Every endpoint
+    reporting the total shares one COUNT(*) per TTL window; concurrent
+    misses wait for the request already counting.
+    """
+    entry = email_count_cache.get("emails")
+    if entry is not None:
+        return entry
+    with _email_count_lock:
+        entry = email_count_cache.get("emails")
+        if entry is None:
+            entry = (db.execute(_COUNT_EMAILS_SQL).scalar(), time.time())
+            email_count_cache.set("emails", entry)
+        return entry
+
+
+def peek_email_count() -> Optional[int]:
+    """Cached exact email total, or None when nothing is cached; never queries."""
+    entry = email_count_cache.get("emails")
+    return entry[0] if entry is not None else None
+
+
+def get_email_count_estimate(db) -> Tuple[int, bool]:
+    """
+    Email total for status displays and whether it is an estimate. Reads the
+    planner's pg_class.reltuples (a catalog lookup, refreshed by the ANALYZE
+    after each sync cycle) and falls back to get_email_count_cached until the
+    table has been analyzed.
+    """
+    count = db.execute(_ESTIMATE_EMAILS_SQL).scalar()
+    if count is not None and count > 0:
+        return count, True
+    return get_email_count_cached(db)[0], False
+
+
+def _etag(result: Any) -> str:
+    """Weak ETag over a response payload's JSON encoding."""
+    digest = hashlib.blake2b(
+        orjson.dumps(result, default=str, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def cached_response(cache: TTLCache, exclude: tuple = ("db", "request", "response")) -> Callable:
+    """
+    Cache an endpoint's result keyed by the endpoint name and its query
+    parameters. Error payloads ({"status": "error"}) are not cached, and
+    passing cached=False bypasses the cache entirely. A plain ``def``
+    endpoint is run in a worker thread, as FastAPI would run it, so its
+    blocking queries stay off the event loop.
+
+    Endpoints that also take ``request: Request`` and ``response: Response``
+    get an ETag and a Cache-Control max-age matching the cache TTL, and a
+    304 when the client's If-None-Match already holds the current payload.
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            call = func
+        else:
+            async def call(*args, **kwargs):
+                return await asyncio.to_thread(func, *args, **kwargs)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if kwargs.get("cached") is False:
+                return await call(*args, **kwargs)
+
+            key = (func.__name__,) + tuple(
+                sorted((name, value) for name, value in kwargs.items() if name not in exclude)
+            )
+            entry = cache.get(key, _MISSING)
+            if entry is _MISSING:
+                result = await call(*args, **kwargs)
+                if isinstance(result, dict) and result.get("status") == "error":
+                    return result
+                entry = (result, _etag(result))
+                cache.set(key, entry)
+
+            result, etag = entry
+            response = kwargs.get("response")
+            if response is not None:
+                headers = {"ETag": etag, "Cache-Control": f"public, max-age={int(cache.ttl)}"}
+                request = kwargs.get("request")
+                if_none_match = request.headers.get("if-none-match", "") if request is not None else ""
+                if etag in (tag.strip() for tag in if_none_match.split(",")):
+                    return Response(status_code=304, headers=headers)
+                response.headers.update(headers)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -7,6 +7,8 @@ from ..models.user import User
 from .gmail_service import GmailService
 from .ai_service import AIService
 from .search_service import SearchService
+from .attachment_store import release_attachments
+from .cache_service import invalidate_analytics_cache, invalidate_email_count_cache
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +141,7 @@ class EmailService:
                     setattr(email, flag_name, value)
             
             db.commit()
+            invalidate_analytics_cache()
             return True
             
         except Exception as e:
@@ -153,18 +156,16 @@ class EmailService:
             if not email:
                 return False
             
-            # Delete attachments from filesystem
-            for attachment in email.attachments:
-                try:
-                    import os
-                    if os.path.exists(attachment.file_path):
-                        os.remove(attachment.file_path)
-                except Exception as e:
-                    logger.warning(f"Could not delete attachment file {attachment.file_path}: {e}")
+            checksums = [a.checksum for a in email.attachments if a.file_path]
             
             # Delete email from database
             db.delete(email)
             db.commit()
+            
+            # Stored attachments are shared by checksum; drop only files no other email references
+            release_attachments(db, checksums)
+            invalidate_analytics_cache()
+            invalidate_email_count_cache()
             return True
             
         except Exception as e:
@@ -188,7 +189,7 @@ class EmailService:
                 return None
             
             import os
-            if not os.path.exists(attachment.file_path):
+            if not attachment.file_path or not os.path.exists(attachment.file_path):
                 return None
             
             with open(attachment.file_path, 'rb') as f:
@@ -316,6 +317,7 @@ class EmailService:
             
             email.is_starred = not email.is_starred
             db.commit()
+            invalidate_analytics_cache()
             return True
             
         except Exception as e:
@@ -364,15 +366,22 @@ class EmailService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            emails = db.query(Email).filter(
+            # Stream just the flags in batches instead of loading whole emails
+            emails = db.query(Email.is_read, Email.is_starred).filter(
                 Email.date_received >= start_date,
-                Email.date_received <= end_date
-            ).all()
+                Email.date_received < end_date
+            ).yield_per(1000)
             
             # Calculate analytics
-            total_emails = len(emails)
-            unread_count = sum(1 for e in emails if not e.is_read)
-            starred_count = sum(1 for e in emails if e.is_starred)
+            total_emails = 0
+            unread_count = 0
+            starred_count = 0
+            for is_read, is_starred in emails:
+                total_emails += 1
+                if not is_read:
+                    unread_count += 1
+                if is_starred:
+                    starred_count += 1
             
             return {
                 "period_days": days,
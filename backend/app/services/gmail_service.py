@@ -14,6 +14,7 @@ from sqlalchemy import text
 from ..models.email import Email, EmailAttachment, EmailLabel
 from ..models.user import User
 from ..models.database import SessionLocal
+from .attachment_store import release_attachments, restore_attachments, store_attachment
 import logging
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -90,7 +91,8 @@ class GmailService:
                     logger.error(f"   Run: cd backend && python gmail_auth.py")
                     return False
                 
-            self.service = build('gmail', 'v1', credentials=creds)
+            # Use the discovery document bundled with googleapiclient instead of fetching it
+            self.service = build('gmail', 'v1', credentials=creds, cache_discovery=False, static_discovery=True)
             return True
             
         except Exception as e:
@@ -258,6 +260,7 @@ class GmailService:
     def _fetch_email_details_optimized(self, message_id: str) -> Optional[Email]:
         """Fetch detailed email information with optimized database operations"""
         db = SessionLocal()
+        attachments = []
         try:
             # Check if email already exists using raw SQL for better performance
             existing_email = db.query(Email).filter(Email.gmail_id == message_id).first()
@@ -306,8 +309,8 @@ class GmailService:
             # Parse date
             date_received = self._parse_date(date_str)
             
-            # Extract body and attachments with BLOB storage
-            body_plain, body_html, attachments = self._extract_content_optimized(message['payload'], message_id)
+            # Extract body and download attachments into the attachment store
+            body_plain, body_html, _ = self._extract_content_optimized(message['payload'], message_id, attachments)
             
             # Get label IDs and names
             label_ids = message.get('labelIds', [])
@@ -332,12 +335,11 @@ class GmailService:
                 is_trash='TRASH' in label_ids
             )
             
-            # Save to database
+            # Save to database, with the email and its attachments in one commit
             db.add(email_obj)
-            db.commit()
-            db.refresh(email_obj)
+            db.flush()
             
-            # Save attachments as BLOBs
+            # Save attachment metadata; the bytes are already in the attachment store
             for attachment_data in attachments:
                 attachment = EmailAttachment(
                     email_id=email_obj.id,
@@ -345,19 +347,21 @@ class GmailService:
                     content_type=attachment_data['content_type'],
                     size=attachment_data['size'],
                     content_id=attachment_data.get('content_id'),
-                    file_data=attachment_data['file_data'],  # Store as BLOB
-                    file_path=attachment_data.get('file_path'),  # Keep for backward compatibility
+                    file_path=attachment_data['file_path'],
                     is_inline=attachment_data.get('is_inline', False),
                     checksum=attachment_data.get('checksum')
                 )
                 db.add(attachment)
             
             db.commit()
+            db.refresh(email_obj)
+            self._restore_attachments(attachments)
             return email_obj
             
         except Exception as e:
             logger.error(f"Error fetching email {message_id}: {e}")
             db.rollback()
+            self._release_attachments(db, attachments)
             return None
         finally:
             db.close()
@@ -368,6 +372,7 @@ class GmailService:
             raise Exception("Failed to authenticate with Gmail")
             
         emails = []
+        stored_attachments = []
         page_token = None
         total_processed = 0
         
@@ -393,7 +398,7 @@ class GmailService:
                 logger.info(f"Processing {len(messages)} emails for label {label_id}")
                 
                 for message in messages:
-                    email_obj = self._fetch_email_details(message['id'], db)
+                    email_obj = self._fetch_email_details(message['id'], db, stored_attachments)
                     if email_obj:
                         emails.append(email_obj)
                         total_processed += 1
@@ -407,12 +412,22 @@ class GmailService:
                     
         except HttpError as error:
             logger.error(f"Error fetching emails for label {label_id}: {error}")
+            db.rollback()
+            self._release_attachments(db, stored_attachments)
             raise
             
         return emails
     
-    def _fetch_email_details(self, message_id: str, db: Session) -> Optional[Email]:
-        """Fetch detailed email information"""
+    def _fetch_email_details(self, message_id: str, db: Session,
+                             stored_attachments: Optional[List[Dict]] = None) -> Optional[Email]:
+        """
+        Fetch detailed email information. Nothing is committed; the email and
+        its attachments are added to ``db`` and their attachment data is
+        appended to ``stored_attachments`` so the caller can release the
+        stored files if its commit fails.
+        """
+        attachments = []
+        savepoint = None
         try:
             # Check if email already exists
             existing_email = db.query(Email).filter(Email.gmail_id == message_id).first()
@@ -447,7 +462,7 @@ class GmailService:
             date_received = self._parse_date(date_str)
             
             # Extract body and attachments
-            body_plain, body_html, attachments = self._extract_content(message['payload'], message_id)
+            body_plain, body_html, _ = self._extract_content(message['payload'], message_id, attachments)
             
             # Get label IDs and names
             label_ids = message.get('labelIds', [])
@@ -472,7 +487,9 @@ class GmailService:
                 is_trash='TRASH' in label_ids
             )
             
-            # Add to database (don't commit yet - will be committed in batch)
+            # Add to database (don't commit yet - will be committed in batch);
+            # the savepoint lets a failing email be undone on its own
+            savepoint = db.begin_nested()
             db.add(email_obj)
             db.flush()  # Flush to get the ID without committing
             
@@ -485,14 +502,21 @@ class GmailService:
                     size=attachment_data['size'],
                     content_id=attachment_data.get('content_id'),
                     file_path=attachment_data['file_path'],
-                    is_inline=attachment_data.get('is_inline', False)
+                    is_inline=attachment_data.get('is_inline', False),
+                    checksum=attachment_data.get('checksum')
                 )
                 db.add(attachment)
             
+            savepoint.commit()
+            if stored_attachments is not None:
+                stored_attachments.extend(attachments)
             return email_obj
             
         except Exception as e:
             logger.error(f"Error fetching email {message_id}: {e}")
+            if savepoint is not None and savepoint.is_active:
+                savepoint.rollback()
+            self._release_attachments(db, attachments)
             return None
     
     def _parse_email_list(self, email_string: str) -> List[str]:
@@ -527,11 +551,17 @@ class GmailService:
             logger.warning(f"Could not parse date '{date_string}': {e}")
             return None
     
-    def _extract_content_optimized(self, payload: Dict, message_id: str) -> tuple:
-        """Extract email content and attachments with BLOB storage"""
+    def _extract_content_optimized(self, payload: Dict, message_id: str,
+                                   attachments: Optional[List[Dict]] = None) -> tuple:
+        """
+        Extract email content and download attachments into the attachment
+        store. Attachments are appended to ``attachments`` as they are stored,
+        so the caller still sees them if a later part fails to parse.
+        """
         body_plain = ""
         body_html = ""
-        attachments = []
+        if attachments is None:
+            attachments = []
         
         def process_part(part):
             nonlocal body_plain, body_html
@@ -547,8 +577,8 @@ class GmailService:
                         part['body']['data']
                     ).decode('utf-8')
             elif part.get('filename'):
-                # Handle attachment with BLOB storage
-                attachment_data = self._download_attachment_as_blob(part, message_id)
+                # Handle attachment via the attachment store
+                attachment_data = self._download_attachment(part, message_id)
                 if attachment_data:
                     attachments.append(attachment_data)
             
@@ -560,11 +590,13 @@ class GmailService:
         process_part(payload)
         return body_plain, body_html, attachments
     
-    def _extract_content(self, payload: Dict, message_id: str) -> tuple:
-        """Extract email content and attachments"""
+    def _extract_content(self, payload: Dict, message_id: str,
+                         attachments: Optional[List[Dict]] = None) -> tuple:
+        """Extract email content and attachments, appending them to ``attachments``"""
         body_plain = ""
         body_html = ""
-        attachments = []
+        if attachments is None:
+            attachments = []
         
         def process_part(part):
             nonlocal body_plain, body_html
@@ -593,71 +625,53 @@ class GmailService:
         process_part(payload)
         return body_plain, body_html, attachments
     
-    def _download_attachment_as_blob(self, part: Dict, message_id: str) -> Optional[Dict]:
-        """Download attachment and store as BLOB in database"""
+    def _download_attachment(self, part: Dict, message_id: str) -> Optional[Dict]:
+        """Download attachment into the content-addressed attachment store"""
         try:
             attachment_id = part['body']['attachmentId']
-            attachment = self.service.users().messages().attachments().get(
-                userId='me',
-                messageId=message_id,
-                id=attachment_id
-            ).execute()
+            file_data = self._attachment_bytes({'message_id': message_id, 'attachment_id': attachment_id})
             
-            # Get file data as bytes
-            file_data = base64.urlsafe_b64decode(attachment['data'])
-            filename = part['filename']
-            
-            # Calculate checksum for deduplication
+            # Checksum keys the store, so identical files are kept once
             checksum = hashlib.sha256(file_data).hexdigest()
             
             return {
-                'filename': filename,
+                'filename': part['filename'],
                 'content_type': part['mimeType'],
                 'size': len(file_data),
                 'content_id': part.get('body', {}).get('contentId'),
-                'file_data': file_data,  # Store as BLOB
-                'file_path': f"attachments/{filename}",  # Keep for backward compatibility
+                'file_path': store_attachment(file_data, checksum),
                 'is_inline': part.get('body', {}).get('contentId') is not None,
-                'checksum': checksum
+                'checksum': checksum,
+                'message_id': message_id,
+                'attachment_id': attachment_id
             }
             
         except Exception as e:
             logger.error(f"Error downloading attachment: {e}")
             return None
     
-    def _download_attachment(self, part: Dict, message_id: str) -> Optional[Dict]:
-        """Download and save attachment to file system"""
+    def _attachment_bytes(self, attachment_data: Dict) -> bytes:
+        """Download the bytes of an attachment from Gmail"""
+        attachment = self.service.users().messages().attachments().get(
+            userId='me',
+            messageId=attachment_data['message_id'],
+            id=attachment_data['attachment_id']
+        ).execute()
+        return base64.urlsafe_b64decode(attachment['data'])
+    
+    def _restore_attachments(self, attachments: List[Dict]):
+        """Store again any committed attachment file a concurrent release removed"""
         try:
-            attachment_id = part['body']['attachmentId']
-            attachment = self.service.users().messages().attachments().get(
-                userId='me',
-                messageId=message_id,
-                id=attachment_id
-            ).execute()
-            
-            # Save attachment to file
-            file_data = base64.urlsafe_b64decode(attachment['data'])
-            filename = part['filename']
-            file_path = f"attachments/{filename}"
-            
-            # Ensure directory exists
-            os.makedirs("attachments", exist_ok=True)
-            
-            with open(file_path, 'wb') as f:
-                f.write(file_data)
-            
-            return {
-                'filename': filename,
-                'content_type': part['mimeType'],
-                'size': len(file_data),
-                'content_id': part.get('body', {}).get('contentId'),
-                'file_path': file_path,
-                'is_inline': part.get('body', {}).get('contentId') is not None
-            }
-            
+            restore_attachments(attachments, self._attachment_bytes)
         except Exception as e:
-            logger.error(f"Error downloading attachment: {e}")
-            return None
+            logger.error(f"Could not restore released attachments: {e}")
+    
+    def _release_attachments(self, db: Session, attachments: List[Dict]):
+        """Drop the stored files of attachments whose rows were not committed"""
+        try:
+            release_attachments(db, (attachment_data.get('checksum') for attachment_data in attachments))
+        except Exception as e:
+            logger.warning(f"Could not release attachments: {e}")
     
     def sync_new_emails(self, user: User, db: Session) -> int:
         """Sync only new emails since last sync"""
@@ -666,6 +680,7 @@ class GmailService:
         
         # Get last sync time
         last_sync = user.last_sync or datetime(1970, 1, 1, tzinfo=timezone.utc)
+        stored_attachments = []
         
         try:
             # Query for emails after last sync
@@ -680,18 +695,21 @@ class GmailService:
             synced_count = 0
             
             for message in messages:
-                email_obj = self._fetch_email_details(message['id'], db)
+                email_obj = self._fetch_email_details(message['id'], db, stored_attachments)
                 if email_obj:
                     synced_count += 1
             
             # Update last sync time
             user.last_sync = datetime.now(timezone.utc)
             db.commit()
+            self._restore_attachments(stored_attachments)
             
             return synced_count
             
-        except HttpError as error:
+        except Exception as error:
             logger.error(f"Error syncing new emails: {error}")
+            db.rollback()
+            self._release_attachments(db, stored_attachments)
             raise
     
     def get_email_attachments(self, user: User, email_id: str) -> List[dict]:
@@ -732,3 +750,31 @@ class GmailService:
         except HttpError as error:
             logger.error(f"Error getting total email count: {error}")
             return 0
+
+
+# Authenticated GmailService instances reused across requests: user_id -> (expires_at, service)
+_service_cache: Dict[int, tuple] = {}
+_service_cache_lock = threading.Lock()
+SERVICE_CACHE_TTL = 300  # 5 minutes
+
+
+def get_gmail_service(user: User) -> Optional[GmailService]:
+    """Get an authenticated GmailService for the user, reusing a recent instance.
+
+    Returns None if authentication fails. Cached instances keep their HTTP
+    connection alive between requests; the underlying httplib2 client is not
+    thread-safe, so callers must not share one instance across threads.
+    """
+    now = time.time()
+    with _service_cache_lock:
+        cached = _service_cache.get(user.id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    service = GmailService()
+    if not service.authenticate_user(user):
+        return None
+
+    with _service_cache_lock:
+        _service_cache[user.id] = (now + SERVICE_CACHE_TTL, service)
+    return service
@@ -1,13 +1,61 @@
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
-from typing import List, Dict, Optional, Any
+from sqlalchemy import and_, or_, func, desc, asc, literal_column
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
+import base64
+import json
 import re
 from ..models.email import Email, EmailAttachment
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Search semantics shared by /search/fast and /db/direct-search:
+# - subject and sender match the term as a substring (trigram indexes);
+# - the body matches it as a substring within its first 4 KB (trigram index
+#   over LEFT(body_plain, 4096)), so partial words still match;
+# - terms made only of whole words also match as a phrase anywhere in the
+#   body (full-text index), which covers text past the first 4 KB.
+BODY_SEARCH_PREFIX = 4096
+_BARE_WORDS = re.compile(r"\w+(?:\s+\w+)*")
+
+
+def is_bare_words(q: str) -> bool:
+    """Whether the term is only words and spaces, so the body full-text index applies."""
+    return _BARE_WORDS.fullmatch(q) is not None
+
+
+def email_search_filter(q: str):
+    """SQLAlchemy filter implementing the shared search semantics above."""
+    search_term = f"%{q}%"
+    conditions = [
+        Email.subject.ilike(search_term),
+        Email.sender.ilike(search_term),
+        # Literal length, so the expression matches the index's
+        func.left(Email.body_plain, literal_column(str(BODY_SEARCH_PREFIX))).ilike(search_term)
+    ]
+    if is_bare_words(q):
+        body_vector = func.to_tsvector(literal_column("'simple'"), func.coalesce(Email.body_plain, literal_column("''")))
+        conditions.append(body_vector.op('@@')(func.phraseto_tsquery(literal_column("'simple'"), q)))
+    return or_(*conditions)
+
+
+def encode_cursor(date_received: datetime, email_id: int) -> str:
+    """Opaque keyset cursor for the email after which the next page starts."""
+    payload = json.dumps({"date_received": date_received.isoformat(), "id": email_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor: (date_received, id). Rejects malformed cursors with 400."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["date_received"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 class SearchService:
     def __init__(self):
         pass
@@ -0,0 +1,87 @@
+"""
+Sync Progress Listener
+One shared LISTEN connection fanning sync_sessions changes out to the
+/sync/stream clients
+"""
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from ..models.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Channel the sync_sessions trigger (013_sync_progress_notify) publishes on
+SYNC_PROGRESS_CHANNEL = "sync_progress"
+# Events a slow client may fall behind by. Every payload is a full session
+# snapshot, so when its queue is full the oldest event is dropped
+CLIENT_QUEUE_SIZE = 16
+
+
+class SyncProgressListener:
+    """
+    Holds a single asyncpg connection listening on SYNC_PROGRESS_CHANNEL and
+    copies each notification into the bounded queue of every subscribed
+    client, so the number of streams does not cost database connections.
+    """
+
+    def __init__(self, database_url: str = DATABASE_URL):
+        self.database_url = database_url
+        self._conn: Optional[asyncpg.Connection] = None
+        self._queues: Set[asyncio.Queue] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self):
+        """
+        Open the listening connection unless it is already up; also used to
+        reconnect after the database dropped it
+        """
+        async with self._lock:
+            if self.is_running:
+                return
+
+            # asyncpg takes a plain libpq URL, without the SQLAlchemy driver
+            dsn = make_url(self.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+            conn = await asyncpg.connect(dsn)
+            try:
+                await conn.add_listener(SYNC_PROGRESS_CHANNEL, self._dispatch)
+            except BaseException:
+                await conn.close()
+                raise
+            self._conn = conn
+            logger.info(f"Listening for sync progress on '{SYNC_PROGRESS_CHANNEL}'")
+
+    async def stop(self):
+        """Close the listening connection; closing it also drops the listener"""
+        async with self._lock:
+            conn, self._conn = self._conn, None
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a client and return the queue its events arrive on"""
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Forget a client registered with subscribe()"""
+        self._queues.discard(queue)
+
+    def _dispatch(self, _conn, _pid, _channel, payload: str):
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+# Global instance
+sync_progress_listener = SyncProgressListener()
@@ -2,7 +2,7 @@
 Optimized sync service for Gmail backup manager
 This service provides high-performance email synchronization using:
 - PostgreSQL with connection pooling
-- BLOB storage for attachments
+- Content-addressed file storage for attachments
 - Parallel processing
 - Batch operations
 - Optimized queries
@@ -11,10 +11,11 @@ This service provides high-performance email synchronization using:
 import logging
 import time
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
+from sqlalchemy import insert, text, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from googleapiclient.errors import HttpError
@@ -23,6 +24,7 @@ from ..models.database import SessionLocal, get_db
 from ..models.email import Email, EmailAttachment, EmailLabel
 from ..models.user import User
 from ..models.sync_session import SyncSession
+from .attachment_store import release_attachments, restore_attachments, store_attachment
 from .gmail_service import GmailService
 from .sync_session_service import SyncSessionService
 
@@ -115,7 +117,7 @@ class OptimizedSyncService:
         
         try:
             # For now, let's do a simple sync without date filtering to avoid the infinite loop
-            # We'll rely on the _process_single_email method to skip existing emails
+            # We'll rely on the _process_email_batch method to skip existing emails
             logger.info("Starting sync - will skip existing emails")
             query = None
             
@@ -166,22 +168,10 @@ class OptimizedSyncService:
                 
                 logger.info(f"Processing batch of {len(messages)} emails (total synced: {emails_synced})")
                 
-                # Process emails sequentially to avoid memory issues
-                batch_synced = 0
-                batch_processed = 0
-                for message in messages:
-                    try:
-                        batch_processed += 1
-                        if self._process_single_email(user, message['id']):
-                            emails_synced += 1
-                            batch_synced += 1
-                            
-                            if emails_synced % 25 == 0:  # Log every 25 emails
-                                logger.info(f"Progress: {emails_synced} emails synced")
-                                
-                    except Exception as e:
-                        logger.error(f"Error processing email {message['id']}: {e}")
-                        continue
+                # Fetch the page's new emails, then insert them together
+                batch_processed = len(messages)
+                batch_synced, _, _ = self._process_email_batch(user, [message['id'] for message in messages])
+                emails_synced += batch_synced
                 
                 logger.info(f"Batch {batch_count} completed: {batch_synced} new emails synced out of {batch_processed} processed (total synced: {emails_synced})")
                 
@@ -370,34 +360,11 @@ class OptimizedSyncService:
                 
                 logger.info(f"Processing batch of {len(messages)} emails (total synced: {emails_synced})")
                 
-                # Process emails sequentially to avoid memory issues
-                batch_synced = 0
-                batch_processed = 0
-                for message in messages:
-                    try:
-                        batch_processed += 1
-                        emails_processed += 1
-                        if self._process_single_email(user, message['id']):
-                            emails_synced += 1
-                            batch_synced += 1
-                            
-                            if emails_synced % 25 == 0:  # Log every 25 emails
-                                logger.info(f"Progress: {emails_synced} emails synced")
-                                
-                    except Exception as e:
-                        logger.error(f"Error processing email {message['id']}: {e}")
-                        error_count += 1
-                        # Persist error info (best-effort)
-                        if sync_session:
-                            try:
-                                SyncSessionService.update_sync_progress(
-                                    sync_session.id,
-                                    error_count=error_count,
-                                    last_error_message=str(e),
-                                )
-                            except Exception:
-                                pass
-                        continue
+                # Fetch the page's new emails, then insert them together
+                emails_processed += len(messages)
+                batch_synced, batch_failed, batch_error = self._process_email_batch(user, [message['id'] for message in messages])
+                emails_synced += batch_synced
+                error_count += batch_failed
 
                 emails_skipped = max(0, emails_processed - emails_synced)
                 batches_processed += 1
@@ -412,6 +379,7 @@ class OptimizedSyncService:
                             emails_skipped=emails_skipped,
                             batches_processed=batches_processed,
                             error_count=error_count,
+                            last_error_message=batch_error,
                         )
                     except Exception as e:
                         logger.warning(f"Failed to update date-range sync progress for session {sync_session.id}: {e}")
@@ -538,20 +506,11 @@ class OptimizedSyncService:
 
                 logger.info(f"Processing batch of {len(messages)} emails (total synced: {emails_synced})")
 
-                # Process emails sequentially to avoid memory issues
-                for message in messages:
-                    try:
-                        emails_processed += 1
-                        if self._process_single_email(user, message['id']):
-                            emails_synced += 1
-
-                            if emails_synced % 25 == 0:  # Log every 25 emails
-                                logger.info(f"Progress: {emails_synced} emails synced")
-
-                    except Exception as e:
-                        logger.error(f"Error processing email {message['id']}: {e}")
-                        error_count += 1
-                        continue
+                # Fetch the page's new emails, then insert them together
+                emails_processed += len(messages)
+                batch_synced, batch_failed, batch_error = self._process_email_batch(user, [message['id'] for message in messages])
+                emails_synced += batch_synced
+                error_count += batch_failed
 
                 emails_skipped = max(0, emails_processed - emails_synced)
                 batches_processed += 1
@@ -566,6 +525,7 @@ class OptimizedSyncService:
                             emails_skipped=emails_skipped,
                             batches_processed=batches_processed,
                             error_count=error_count,
+                            last_error_message=batch_error,
                         )
                     except Exception as e:
                         logger.warning(f"Failed to update sync progress for session {sync_session.id}: {e}")
@@ -644,18 +604,9 @@ class OptimizedSyncService:
                 
                 logger.info(f"Processing batch of {len(messages)} emails (total synced: {emails_synced})")
                 
-                # Process emails sequentially to avoid memory issues
-                for message in messages:
-                    try:
-                        if self._process_single_email(user, message['id']):
-                            emails_synced += 1
-                            
-                            if emails_synced % 25 == 0:  # Log every 25 emails
-                                logger.info(f"Progress: {emails_synced} emails synced")
-                                
-                    except Exception as e:
-                        logger.error(f"Error processing email {message['id']}: {e}")
-                        continue
+                # Fetch the page's new emails, then insert them together
+                batch_synced, _, _ = self._process_email_batch(user, [message['id'] for message in messages])
+                emails_synced += batch_synced
                 
                 page_token = results.get('nextPageToken')
                 if not page_token:
@@ -676,65 +627,149 @@ class OptimizedSyncService:
         logger.info(f"Sync completed: {emails_synced} emails synced")
         return emails_synced
     
-    def _process_single_email(self, user: User, message_id: str) -> bool:
+    def _process_email_batch(self, user: User, message_ids: List[str]) -> Tuple[int, int, Optional[str]]:
         """
-        Process a single email with optimized database operations
+        Fetch and store one page of Gmail messages. Messages already stored
+        are skipped with a single lookup, and the new emails and their
+        attachments are written with one multi-row INSERT each.
+        
+        Returns:
+            (emails synced, emails that could not be fetched or stored,
+            the last error message or None)
         """
         db = SessionLocal()
         try:
-            # Check if email already exists
-            existing_email = db.query(Email).filter(Email.gmail_id == message_id).first()
-            if existing_email:
-                return False  # Already synced
+            existing = {
+                gmail_id for (gmail_id,) in
+                db.query(Email.gmail_id).filter(Email.gmail_id.in_(message_ids))
+            }
             
             # Fetch email details from Gmail
-            email_data = self._fetch_email_data(message_id, user)
-            if not email_data:
-                return False
-            
-            # Extract attachments before creating Email object
-            attachments = email_data.pop('attachments', [])
-            
-            # Clean up the data for Email model creation
-            # Remove any fields that might cause SQLAlchemy issues
-            email_model_data = {
-                'gmail_id': email_data.get('gmail_id'),
-                'thread_id': email_data.get('thread_id'),
-                'subject': email_data.get('subject', ''),
-                'sender': email_data.get('sender', ''),
-                'recipients': email_data.get('recipients', []),
-                'cc': email_data.get('cc', []),
-                'bcc': email_data.get('bcc', []),
-                'body_plain': email_data.get('body_plain', ''),
-                'body_html': email_data.get('body_html', ''),
-                'date_received': email_data.get('date_received'),
-                'labels': email_data.get('labels', []),
-                'is_read': email_data.get('is_read', False),
-                'is_starred': email_data.get('is_starred', False),
-                'is_important': email_data.get('is_important', False),
-                'is_spam': email_data.get('is_spam', False),
-                'is_trash': email_data.get('is_trash', False)
-            }
+            rows = []
+            attachments = {}
+            failed = 0
+            last_error = None
+            for message_id in message_ids:
+                if message_id in existing:
+                    continue
+                email_data = self._fetch_email_data(message_id, user)
+                if not email_data:
+                    failed += 1
+                    last_error = f"Could not fetch email {message_id}"
+                    continue
+                attachments[message_id] = email_data.pop('attachments', [])
+                rows.append(self._email_row(email_data))
             
-            # Create email record
-            email_obj = Email(**email_model_data)
-            db.add(email_obj)
-            db.flush()  # Get the ID without committing
+            if not rows:
+                return 0, failed, last_error
             
-            # Process attachments
-            if attachments:
-                self._process_attachments(db, email_obj.id, attachments)
+            try:
+                inserted = self._insert_emails(db, rows, attachments)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                inserted = None
+                logger.warning(f"Batch insert of {len(rows)} emails failed, retrying one by one: {e}")
+            
+            if inserted is None:
+                # Isolate the failing email(s) so the rest of the page is still saved
+                inserted = set()
+                for row in rows:
+                    try:
+                        inserted |= self._insert_emails(db, [row], attachments)
+                        db.commit()
+                    except Exception as e:
+                        db.rollback()
+                        failed += 1
+                        last_error = str(e)
+                        logger.error(f"Error processing email {row['gmail_id']}: {e}")
             
-            db.commit()
-            return True
+            # A concurrent release of a shared file may have removed it before
+            # the rows above were committed
+            try:
+                restore_attachments(
+                    (
+                        attachment_data
+                        for gmail_id in inserted
+                        for attachment_data in attachments.get(gmail_id, [])
+                    ),
+                    self._attachment_bytes
+                )
+            except Exception as e:
+                logger.error(f"Could not restore released attachments: {e}")
+            
+            # Attachments were stored while fetching; files of emails that were
+            # not inserted (stored meanwhile by another sync, or failed) go
+            # unless another email references them
+            try:
+                release_attachments(db, (
+                    attachment_data.get('checksum')
+                    for gmail_id, email_attachments in attachments.items() if gmail_id not in inserted
+                    for attachment_data in email_attachments
+                ))
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not release attachments of skipped emails: {e}")
+            
+            return len(inserted), failed, last_error
             
-        except Exception as e:
-            logger.error(f"Error processing email {message_id}: {e}")
-            db.rollback()
-            return False
         finally:
             db.close()
     
+    def _email_row(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Email column values from parsed message data
+        """
+        return {
+            'gmail_id': email_data.get('gmail_id'),
+            'thread_id': email_data.get('thread_id'),
+            'subject': email_data.get('subject', ''),
+            'sender': email_data.get('sender', ''),
+            'recipients': email_data.get('recipients', []),
+            'cc': email_data.get('cc', []),
+            'bcc': email_data.get('bcc', []),
+            'body_plain': email_data.get('body_plain', ''),
+            'body_html': email_data.get('body_html', ''),
+            'date_received': email_data.get('date_received'),
+            'labels': email_data.get('labels', []),
+            'is_read': email_data.get('is_read', False),
+            'is_starred': email_data.get('is_starred', False),
+            'is_important': email_data.get('is_important', False),
+            'is_spam': email_data.get('is_spam', False),
+            'is_trash': email_data.get('is_trash', False)
+        }
+    
+    def _insert_emails(self, db: Session, rows: List[Dict[str, Any]], attachments: Dict[str, List[Dict[str, Any]]]) -> Set[str]:
+        """
+        Insert email rows and their attachments, skipping emails another sync
+        stored in the meantime. Returns the Gmail IDs of the emails inserted.
+        """
+        inserted = db.execute(
+            pg_insert(Email)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Email.gmail_id])
+            .returning(Email.id, Email.gmail_id)
+        ).all()
+        
+        attachment_rows = [
+            {
+                'email_id': email_id,
+                'filename': attachment_data['filename'],
+                'content_type': attachment_data['content_type'],
+                'size': attachment_data['size'],
+                'content_id': attachment_data.get('content_id'),
+                'file_path': attachment_data['file_path'],
+                'is_inline': attachment_data.get('is_inline', False),
+                'checksum': attachment_data.get('checksum')
+            }
+            for email_id, gmail_id in inserted
+            for attachment_data in attachments.get(gmail_id, [])
+        ]
+        if attachment_rows:
+            db.execute(insert(EmailAttachment), attachment_rows)
+        
+        return {gmail_id for _, gmail_id in inserted}
+    
     def _fetch_email_data(self, message_id: str, user: Optional[User] = None) -> Optional[Dict[str, Any]]:
         """
         Fetch email data from Gmail API with retry logic and 401 re-auth
@@ -826,27 +861,9 @@ class OptimizedSyncService:
             'attachments': attachments
         }
     
-    def _process_attachments(self, db: Session, email_id: int, attachments: List[Dict[str, Any]]):
-        """
-        Process attachments and store as BLOBs
-        """
-        for attachment_data in attachments:
-            attachment = EmailAttachment(
-                email_id=email_id,
-                filename=attachment_data['filename'],
-                content_type=attachment_data['content_type'],
-                size=attachment_data['size'],
-                content_id=attachment_data.get('content_id'),
-                file_data=attachment_data['file_data'],
-                file_path=attachment_data.get('file_path'),
-                is_inline=attachment_data.get('is_inline', False),
-                checksum=attachment_data.get('checksum')
-            )
-            db.add(attachment)
-    
     def _extract_content_optimized(self, payload: Dict[str, Any], message_id: str) -> tuple:
         """
-        Extract email content and attachments with BLOB storage
+        Extract email content and download attachments into the attachment store
         """
         body_plain = ""
         body_html = ""
@@ -862,7 +879,7 @@ class OptimizedSyncService:
                 if 'data' in part['body']:
                     body_html = self._decode_base64(part['body']['data'])
             elif part.get('filename'):
-                attachment_data = self._download_attachment_as_blob(part, message_id)
+                attachment_data = self._download_attachment(part, message_id)
                 if attachment_data:
                     attachments.append(attachment_data)
             
@@ -874,40 +891,45 @@ class OptimizedSyncService:
         process_part(payload)
         return body_plain, body_html, attachments
     
-    def _download_attachment_as_blob(self, part: Dict[str, Any], message_id: str) -> Optional[Dict[str, Any]]:
+    def _download_attachment(self, part: Dict[str, Any], message_id: str) -> Optional[Dict[str, Any]]:
         """
-        Download attachment and store as BLOB
+        Download attachment into the content-addressed attachment store
         """
         try:
             attachment_id = part['body']['attachmentId']
-            attachment = self.gmail_service.service.users().messages().attachments().get(
-                userId='me',
-                messageId=message_id,
-                id=attachment_id
-            ).execute()
-            
-            file_data = self._decode_base64_bytes(attachment['data'])
-            filename = part['filename']
+            file_data = self._attachment_bytes({'message_id': message_id, 'attachment_id': attachment_id})
             
-            # Calculate checksum
+            # Checksum keys the store, so identical files are kept once
             import hashlib
             checksum = hashlib.sha256(file_data).hexdigest()
             
             return {
-                'filename': filename,
+                'filename': part['filename'],
                 'content_type': part['mimeType'],
                 'size': len(file_data),
                 'content_id': part.get('body', {}).get('contentId'),
-                'file_data': file_data,
-                'file_path': f"attachments/{filename}",
+                'file_path': store_attachment(file_data, checksum),
                 'is_inline': part.get('body', {}).get('contentId') is not None,
-                'checksum': checksum
+                'checksum': checksum,
+                'message_id': message_id,
+                'attachment_id': attachment_id
             }
             
         except Exception as e:
             logger.error(f"Error downloading attachment: {e}")
             return None
     
+    def _attachment_bytes(self, attachment_data: Dict[str, Any]) -> bytes:
+        """
+        Download the bytes of an attachment from Gmail
+        """
+        attachment = self.gmail_service.service.users().messages().attachments().get(
+            userId='me',
+            messageId=attachment_data['message_id'],
+            id=attachment_data['attachment_id']
+        ).execute()
+        return self._decode_base64_bytes(attachment['data'])
+    
     def _decode_base64(self, data: str) -> str:
         """Decode base64 data to string"""
         import base64
@@ -3,17 +3,62 @@ Sync Session Service for tracking and managing sync sessions
 """
 
 import logging
+import threading
+import time
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import case, desc, func, update
 
 from ..models.database import SessionLocal
 from ..models.sync_session import SyncSession
 from ..models.user import User
+from .cache_service import invalidate_analytics_cache, invalidate_email_count_cache
 
 logger = logging.getLogger(__name__)
 
+# Per-batch progress only drives the progress bar, so it is coalesced per
+# session and written at most once per PROGRESS_FLUSH_INTERVAL seconds; a
+# timer writes whatever arrived after the last flush once the interval is
+# up. Completing or failing a session writes whatever is still pending, a
+# failed write is put back for the next flush, and cleanup_stale_sessions
+# drops what is left for sessions that are no longer running.
+PROGRESS_FLUSH_INTERVAL = 1.0
+_pending_progress: Dict[int, Dict[str, Any]] = {}
+_last_progress_flush: Dict[int, float] = {}
+_progress_flush_timers: Dict[int, threading.Timer] = {}
+_progress_lock = threading.Lock()
+
+
+def _take_pending_progress(session_id: int) -> Dict[str, Any]:
+    """Remove and return the progress still buffered for a finished session."""
+    with _progress_lock:
+        _last_progress_flush.pop(session_id, None)
+        timer = _progress_flush_timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+        return _pending_progress.pop(session_id, {})
+
+
+def _restore_pending_progress(session_id: int, update_data: Dict[str, Any]):
+    """Put back progress whose write failed, under anything buffered since."""
+    if not update_data:
+        return
+    with _progress_lock:
+        _pending_progress[session_id] = {**update_data, **_pending_progress.get(session_id, {})}
+
+
+def _flush_pending_progress(session_id: int):
+    """Timer callback writing progress buffered since the last flush."""
+    with _progress_lock:
+        _progress_flush_timers.pop(session_id, None)
+        update_data = _pending_progress.pop(session_id, None)
+        if not update_data:
+            return
+        _last_progress_flush[session_id] = time.monotonic()
+    SyncSessionService._write_progress(session_id, update_data)
+
+
 class SyncSessionService:
     """Service for managing sync sessions and tracking sync progress"""
     
@@ -154,52 +199,88 @@ class SyncSessionService:
     ) -> bool:
         logger.info(f"update_sync_progress called for session {session_id} with emails_synced={emails_synced}")
         """
-        Update progress for a sync session
+        Update progress for a sync session. Updates are merged in memory and
+        written at most once per PROGRESS_FLUSH_INTERVAL; the first update of
+        a session is written straight away.
         
         Returns:
-            True if update successful, False otherwise
+            True if update successful (or buffered), False otherwise
         """
+        # Update provided fields
+        update_data = {}
+        if emails_processed is not None:
+            update_data['emails_processed'] = emails_processed
+        if emails_synced is not None:
+            update_data['emails_synced'] = emails_synced
+        if emails_updated is not None:
+            update_data['emails_updated'] = emails_updated
+        if emails_skipped is not None:
+            update_data['emails_skipped'] = emails_skipped
+        if batches_processed is not None:
+            update_data['batches_processed'] = batches_processed
+        if total_api_calls is not None:
+            update_data['total_api_calls'] = total_api_calls
+        if error_count is not None:
+            update_data['error_count'] = error_count
+        if last_error_message is not None:
+            update_data['last_error_message'] = last_error_message
+            update_data['last_error_at'] = datetime.now(timezone.utc)
+        
+        if not update_data:
+            return True
+        
+        now = time.monotonic()
+        with _progress_lock:
+            pending = _pending_progress.setdefault(session_id, {})
+            pending.update(update_data)
+            last_flush = _last_progress_flush.get(session_id)
+            if last_flush is not None and now - last_flush < PROGRESS_FLUSH_INTERVAL:
+                if session_id not in _progress_flush_timers:
+                    timer = threading.Timer(
+                        PROGRESS_FLUSH_INTERVAL - (now - last_flush), _flush_pending_progress, (session_id,)
+                    )
+                    timer.daemon = True
+                    _progress_flush_timers[session_id] = timer
+                    timer.start()
+                return True
+            update_data = _pending_progress.pop(session_id)
+            _last_progress_flush[session_id] = now
+        
+        return SyncSessionService._write_progress(session_id, update_data, db)
+    
+    @staticmethod
+    def _write_progress(session_id: int, update_data: Dict[str, Any], db: Session = None) -> bool:
+        """Write coalesced progress; on failure it goes back into the buffer."""
         should_close_db = False
         if db is None:
             db = SessionLocal()
             should_close_db = True
         
         try:
-            sync_session = db.query(SyncSession).filter(SyncSession.id == session_id).first()
-            if not sync_session:
-                logger.warning(f"Sync session {session_id} not found")
+            # One UPDATE, no SELECT; mirrors SyncSession.update_progress.
+            # Only running sessions take progress, so a timer flush that
+            # lands after completion cannot overwrite the final counts
+            result = db.execute(
+                update(SyncSession)
+                .where(SyncSession.id == session_id, SyncSession.status.in_(('started', 'running')))
+                .values(
+                    **update_data,
+                    last_activity_at=func.now(),
+                    status=case((SyncSession.status == 'started', 'running'), else_=SyncSession.status),
+                )
+            )
+            db.commit()
+            if result.rowcount == 0:
+                logger.warning(f"Sync session {session_id} not found or no longer running")
+                _take_pending_progress(session_id)
                 return False
             
-            # Update provided fields
-            update_data = {}
-            if emails_processed is not None:
-                update_data['emails_processed'] = emails_processed
-            if emails_synced is not None:
-                update_data['emails_synced'] = emails_synced
-            if emails_updated is not None:
-                update_data['emails_updated'] = emails_updated
-            if emails_skipped is not None:
-                update_data['emails_skipped'] = emails_skipped
-            if batches_processed is not None:
-                update_data['batches_processed'] = batches_processed
-            if total_api_calls is not None:
-                update_data['total_api_calls'] = total_api_calls
-            if error_count is not None:
-                update_data['error_count'] = error_count
-            if last_error_message is not None:
-                update_data['last_error_message'] = last_error_message
-                update_data['last_error_at'] = datetime.now(timezone.utc)
-            
-            if update_data:
-                sync_session.update_progress(**update_data)
-                db.commit()
-                
-                logger.debug(f"Updated sync session {session_id} progress: {update_data}")
-            
+            logger.debug(f"Updated sync session {session_id} progress: {update_data}")
             return True
             
         except Exception as e:
             db.rollback()
+            _restore_pending_progress(session_id, update_data)
             logger.error(f"Failed to update sync session {session_id}: {e}")
             return False
         finally:
@@ -223,20 +304,28 @@ class SyncSessionService:
             db = SessionLocal()
             should_close_db = True
         
+        pending = _take_pending_progress(session_id)
         try:
             sync_session = db.query(SyncSession).filter(SyncSession.id == session_id).first()
             if not sync_session:
                 logger.warning(f"Sync session {session_id} not found")
                 return False
             
+            if pending:
+                sync_session.update_progress(**pending)
             sync_session.mark_completed(final_stats)
             db.commit()
+
+            # Newly synced emails make cached dashboard aggregates and totals stale
+            invalidate_analytics_cache()
+            invalidate_email_count_cache()
             
             logger.info(f"Completed sync session {session_id}: {sync_session.emails_synced} emails synced")
             return True
             
         except Exception as e:
             db.rollback()
+            _restore_pending_progress(session_id, pending)
             logger.error(f"Failed to complete sync session {session_id}: {e}")
             return False
         finally:
@@ -260,12 +349,15 @@ class SyncSessionService:
             db = SessionLocal()
             should_close_db = True
         
+        pending = _take_pending_progress(session_id)
         try:
             sync_session = db.query(SyncSession).filter(SyncSession.id == session_id).first()
             if not sync_session:
                 logger.warning(f"Sync session {session_id} not found")
                 return False
             
+            if pending:
+                sync_session.update_progress(**pending)
             sync_session.mark_failed(error_message)
             db.commit()
             
@@ -274,6 +366,7 @@ class SyncSessionService:
             
         except Exception as e:
             db.rollback()
+            _restore_pending_progress(session_id, pending)
             logger.error(f"Failed to mark sync session {session_id} as failed: {e}")
             return False
         finally:
@@ -329,6 +422,7 @@ class SyncSessionService:
             db = SessionLocal()
             should_close_db = True
         
+        flushed = {}
         try:
             cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=timeout_minutes)
             
@@ -344,8 +438,12 @@ class SyncSessionService:
             
             cleaned_count = 0
             for session in stale_sessions:
+                flushed[session.id] = _take_pending_progress(session.id)
+                if flushed[session.id]:
+                    session.update_progress(**flushed[session.id])
                 session.status = 'failed'
                 session.completed_at = datetime.now(timezone.utc)
+                session.total_duration_seconds = session.duration_seconds
                 session.error_message = f"Session timed out after {timeout_minutes} minutes"
                 cleaned_count += 1
                 logger.warning(f"Cleaned up stale sync session {session.id} (started at {session.started_at})")
@@ -354,10 +452,26 @@ class SyncSessionService:
                 db.commit()
                 logger.info(f"Cleaned up {cleaned_count} stale sync sessions")
             
+            # Progress buffered for sessions that ended without completing or
+            # failing through this service (a crashed sync) is never written
+            with _progress_lock:
+                buffered_ids = list(_pending_progress)
+            if buffered_ids:
+                running_ids = {
+                    session_id for (session_id,) in db.query(SyncSession.id).filter(
+                        SyncSession.id.in_(buffered_ids),
+                        SyncSession.status.in_(['started', 'running'])
+                    )
+                }
+                for session_id in set(buffered_ids) - running_ids:
+                    _take_pending_progress(session_id)
+            
             return cleaned_count
             
         except Exception as e:
             db.rollback()
+            for session_id, pending in flushed.items():
+                _restore_pending_progress(session_id, pending)
             logger.error(f"Failed to cleanup stale sync sessions: {e}")
             return 0
         finally:
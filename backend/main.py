@@ -5,7 +5,7 @@ import os
 import logging
 import asyncio
 from datetime import datetime, timezone
-from app.models.database import engine, Base
+from app.models.database import async_engine, engine, Base
 
 # Configure logging
 logging.basicConfig(
@@ -17,6 +17,7 @@ logger = logging.getLogger(__name__)
 # Import background services
 from app.services.background_sync_service import background_sync_service
 from app.services.token_refresh_service import token_refresh_service
+from app.services.sync_progress_listener import sync_progress_listener
 
 
 @asynccontextmanager
@@ -43,6 +44,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error during startup: {e}")
 
+    # Shared LISTEN connection for /sync/stream; started on its own so a
+    # database that is not up yet only delays the stream, which reconnects
+    try:
+        await sync_progress_listener.start()
+    except Exception as e:
+        logger.error(f"Error starting sync progress listener: {e}")
+
     yield
 
     # --- Shutdown ---
@@ -59,6 +67,10 @@ async def lifespan(app: FastAPI):
             token_refresh_service.stop_token_refresh_service()
             logger.info("Token refresh service stopped")
 
+        # Close asyncpg connections while the event loop is still running
+        await sync_progress_listener.stop()
+        await async_engine.dispose()
+
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
 
@@ -4,13 +4,16 @@ import shutil
 import os
 import sys
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 # Add the parent directory to the path so we can import the app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.models.database import Base, get_db
+from app.models.database import Base, get_async_db, get_db, get_frontend_db
 from main import app
 from app.models.user import User
 from app.models.email import Email, EmailAttachment, EmailLabel
@@ -34,6 +37,16 @@ engine = create_engine(
 # Create test session
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async endpoints read the same test database through asyncpg. NullPool, since
+# each TestClient runs the app on its own event loop and asyncpg connections
+# cannot move between loops.
+async_engine = create_async_engine(
+    make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    poolclass=NullPool,
+    connect_args={"server_settings": {"timezone": "utc"}}
+)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 @pytest.fixture(scope="session")
 def db_engine():
     """Create database engine for testing."""
@@ -62,7 +75,13 @@ def client(db_session):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_frontend_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
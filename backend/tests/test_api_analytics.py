@@ -1,7 +1,19 @@
+import importlib.util
+import os
 import pytest
+from unittest.mock import patch
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
 from fastapi.testclient import TestClient
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+from app.api.test_analytics import _INSIGHT_RULES, _InsightStats, _domain_category
+from app.models.email import Email, EmailScoreCount
+from app.services.cache_service import invalidate_analytics_cache
+
+ALEMBIC_VERSIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
 
 class TestAnalyticsAPI:
     """Test suite for analytics API endpoints."""
@@ -397,3 +409,286 @@ class TestAnalyticsAPI:
         
         response = client.get("/api/v1/analytics/clusters?n_clusters=invalid")
         assert response.status_code == 422  # Validation error
+
+
+def _load_migration(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ALEMBIC_VERSIONS, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def analytics_emails(db_session):
+    """Dated, scored emails for the /api/v1/test/analytics endpoints."""
+    now = datetime.now(timezone.utc)
+    rows = [
+        ("analytics-1", "Amazon <orders@mail.amazon.com>", now - timedelta(days=1), True, False, True, "shopping", 1, 9),
+        ("analytics-2", "CNN <news@cnn.com>", now - timedelta(days=2), False, True, False, "updates", 0, 5),
+        ("analytics-3", "CNN <news@cnn.com>", now - timedelta(days=2), False, False, False, "updates", -1, 2),
+        ("analytics-4", "friend@example.org", now - timedelta(days=40), True, False, False, None, None, None),
+    ]
+    emails = [
+        Email(
+            gmail_id=gmail_id, subject=gmail_id, sender=sender, date_received=date_received,
+            is_read=is_read, is_starred=is_starred, is_important=is_important,
+            category=category, sentiment_score=sentiment, priority_score=priority
+        )
+        for gmail_id, sender, date_received, is_read, is_starred, is_important, category, sentiment, priority in rows
+    ]
+    db_session.add_all(emails)
+    db_session.commit()
+    invalidate_analytics_cache()
+    yield emails
+
+    db_session.query(Email).filter(Email.gmail_id.like("analytics-%")).delete(synchronize_session=False)
+    db_session.commit()
+    invalidate_analytics_cache()
+
+
+@pytest.fixture
+def stats_views(db_session, analytics_emails):
+    """email_stats_mv and email_stats_daily as the migrations create them, populated."""
+    connection = db_session.connection()
+    with Operations.context(MigrationContext.configure(connection)):
+        _load_migration("003_email_stats_mv").upgrade()
+    connection.execute(text(_load_migration("018_score_smallint")._EMAIL_STATS_DAILY_SQL))
+    db_session.commit()
+    invalidate_analytics_cache()
+    yield
+
+    db_session.execute(text("DROP MATERIALIZED VIEW IF EXISTS email_stats_mv"))
+    db_session.execute(text("DROP MATERIALIZED VIEW IF EXISTS email_stats_daily"))
+    db_session.commit()
+    invalidate_analytics_cache()
+
+
+def _get(client: TestClient, path: str, **params):
+    """GET an analytics endpoint with an empty analytics cache."""
+    invalidate_analytics_cache()
+    response = client.get(f"/api/v1/test/analytics/{path}", params=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data.get("status") != "error", data
+    return data
+
+
+class TestAnalyticsViews:
+    """The materialized-view paths of the test analytics endpoints agree with the live queries."""
+
+    def test_overview_view_matches_live(self, client: TestClient, db_session, stats_views):
+        """email_stats_daily and the live scan give the same overview totals."""
+        view = _get(client, "overview", days=30)
+        live = _get(client, "overview", days=30, cached=False)
+
+        assert view["cached"] is True
+        assert live["cached"] is False
+        assert live["total_emails"] == db_session.query(Email).count()
+        for key in ("total_emails", "read_emails", "unread_emails", "starred_emails",
+                    "important_emails", "category_distribution", "sentiment_distribution"):
+            assert view[key] == live[key], key
+
+    def test_statistics_view_matches_live(self, client: TestClient, stats_views):
+        """email_stats_mv and the live queries give the same statistics."""
+        view = _get(client, "statistics")
+        live = _get(client, "statistics", cached=False)
+
+        assert view["cached"] is True
+        assert live["cached"] is False
+        for key in ("total_emails", "read_emails", "unread_emails", "starred_emails", "important_emails",
+                    "yearly_breakdown", "categories", "sentiment_breakdown", "priority_breakdown"):
+            assert view[key] == live[key], key
+        assert view["sender_analysis"]["unique_senders"] == live["sender_analysis"]["unique_senders"]
+
+    @pytest.mark.parametrize("path, keys", [
+        ("trends", ("trends",)),
+        ("trends-detailed", ("weekly_trends", "monthly_trends", "total_emails_in_period")),
+    ])
+    def test_trends_view_matches_live(self, client: TestClient, stats_views, path, keys):
+        """Per-day totals summed from email_stats_daily match the live aggregation."""
+        view = _get(client, path, days=90)
+        live = _get(client, path, days=90, cached=False)
+
+        assert view["cached"] is True
+        assert live["cached"] is False
+        for key in keys:
+            assert view[key] == live[key], key
+
+    def test_performance_view_matches_live(self, client: TestClient, stats_views):
+        """The yearly distribution is the same with and without email_stats_daily."""
+        view = _get(client, "performance")
+        with patch("app.api.test_analytics._stats_view_populated", return_value=False):
+            live = _get(client, "performance")
+
+        assert view["yearly_distribution"] == live["yearly_distribution"]
+        assert view["total_emails"] == live["total_emails"]
+
+    def test_unpopulated_views_fall_back_to_live(self, client: TestClient, db_session, stats_views):
+        """Views that exist but hold no data are skipped even with cached=true."""
+        db_session.execute(text("REFRESH MATERIALIZED VIEW email_stats_mv WITH NO DATA"))
+        db_session.execute(text("REFRESH MATERIALIZED VIEW email_stats_daily WITH NO DATA"))
+        db_session.commit()
+
+        overview = _get(client, "overview", days=30)
+        statistics = _get(client, "statistics")
+
+        assert overview["cached"] is False
+        assert statistics["cached"] is False
+        assert overview["total_emails"] == statistics["total_emails"] == db_session.query(Email).count()
+
+    def test_missing_views_fall_back_to_live(self, client: TestClient, db_session, analytics_emails):
+        """Without the migrations' views every endpoint answers from the live queries."""
+        for path in ("overview", "statistics", "trends", "trends-detailed"):
+            assert _get(client, path)["cached"] is False
+        assert _get(client, "overview")["total_emails"] == db_session.query(Email).count()
+
+
+class TestAnalyticsSnapshot:
+    """Breakdowns read from email_score_counts, and its GROUP BY fallback."""
+
+    def test_score_counts_match_emails(self, db_session, analytics_emails):
+        """The trigger keeps email_score_counts equal to a GROUP BY over emails."""
+        live = {
+            (category, sentiment, priority): count
+            for category, sentiment, priority, count in db_session.query(
+                Email.category, Email.sentiment_score, Email.priority_score, func.count()
+            ).group_by(Email.category, Email.sentiment_score, Email.priority_score)
+        }
+        counted = {
+            (row.category, row.sentiment_score, row.priority_score): row.count
+            for row in db_session.query(EmailScoreCount).filter(EmailScoreCount.count > 0)
+        }
+        assert counted == live
+
+    @pytest.mark.parametrize("path", ["sentiment", "priority", "categories", "performance"])
+    def test_fallback_matches_score_counts(self, client: TestClient, analytics_emails, path):
+        """Without the trigger the snapshot is grouped from emails, with the same numbers."""
+        counted = _get(client, path)
+        with patch("app.api.test_analytics.trigger_installed", return_value=False):
+            grouped = _get(client, path)
+        assert counted == grouped
+
+    def test_sentiment_and_priority_buckets(self, client: TestClient, db_session, analytics_emails):
+        """Sentiment and priority buckets add up to every email."""
+        total = db_session.query(Email).count()
+        positive = db_session.query(Email).filter(Email.sentiment_score == 1).count()
+        high = db_session.query(Email).filter(Email.priority_score >= 8).count()
+
+        sentiment = _get(client, "sentiment")["sentiment"]
+        priority = _get(client, "priority")["priority"]
+
+        assert sentiment["total"] == priority["total"] == total
+        assert sentiment["positive"] == positive
+        assert sentiment["positive"] + sentiment["neutral"] + sentiment["negative"] == total
+        assert priority["high_priority"] == high
+        assert priority["high_priority"] + priority["medium_priority"] + priority["low_priority"] == total
+        assert sum(item["count"] for item in priority["distribution"]) == total
+
+    def test_overview_breakdowns_match_statistics(self, client: TestClient, analytics_emails):
+        """The overview distributions and the statistics breakdowns come from the same snapshot."""
+        overview = _get(client, "overview", cached=False)
+        statistics = _get(client, "statistics", cached=False)
+
+        assert overview["category_distribution"] == {
+            item["category"]: item["count"] for item in statistics["categories"]
+        }
+        assert sum(overview["sentiment_distribution"].values()) == statistics["total_emails"]
+
+
+class TestAnalyticsResponses:
+    """ETags, insight rules and domain categories of the test analytics endpoints."""
+
+    @pytest.mark.parametrize("path", ["sentiment", "priority"])
+    def test_etag_revalidation(self, client: TestClient, analytics_emails, path):
+        """A matching If-None-Match gets a 304 without a body."""
+        invalidate_analytics_cache()
+        first = client.get(f"/api/v1/test/analytics/{path}")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"].startswith("public, max-age=")
+
+        revalidated = client.get(f"/api/v1/test/analytics/{path}", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert not revalidated.content
+
+    def test_cached_false_bypasses_the_response_cache(self, client: TestClient, db_session, analytics_emails):
+        """Cached responses are reused until invalidated; cached=false always recomputes."""
+        before = _get(client, "overview", days=30)
+        db_session.add(Email(gmail_id="analytics-5", subject="analytics-5", sender="late@example.org"))
+        db_session.commit()
+
+        assert client.get("/api/v1/test/analytics/overview", params={"days": 30}).json() == before
+        fresh = client.get("/api/v1/test/analytics/overview", params={"days": 30, "cached": False}).json()
+        assert fresh["total_emails"] == before["total_emails"] + 1
+
+    def test_insights_from_recent_emails(self, client: TestClient, analytics_emails):
+        """The insights endpoint evaluates the rules over the recent emails."""
+        insights = _get(client, "insights")["insights"]
+        types = [insight["type"] for insight in insights]
+        assert "peak_activity" in types
+        assert all(insight["severity"] in ("info", "warning") for insight in insights)
+
+    def test_domain_analysis_categories(self, client: TestClient, analytics_emails):
+        """Subdomains of a known domain are counted under its category."""
+        data = _get(client, "domains")
+        domains = {item["domain"]: item for item in data["top_domains"]}
+        categories = {item["category"]: item["count"] for item in data["domain_categories"]}
+
+        assert domains["cnn.com"]["count"] >= 2
+        assert "mail.amazon.com" in domains
+        assert categories["shopping"] >= 1
+        assert categories["news"] >= 2
+
+    @pytest.mark.parametrize("domain, category", [
+        ("amazon.com", "shopping"),
+        ("mail.amazon.com", "shopping"),
+        ("a.b.github.com", "tech"),
+        ("notamazon.com", "other"),
+        ("amazon.com.example.org", "other"),
+        ("com", "other"),
+        ("", "other"),
+    ])
+    def test_domain_category(self, domain, category):
+        """A domain matches its own entry or that of any parent domain."""
+        assert _domain_category(domain) == category
+
+    @staticmethod
+    def _stats(**overrides):
+        values = dict(
+            total=100, unread=0, important=0, oldest=None, newest=None,
+            top_sender=None, top_sender_count=0, peak_hour=None, peak_hour_count=0
+        )
+        values.update(overrides)
+        return _InsightStats(**values)
+
+    def _types(self, **overrides):
+        stats = self._stats(**overrides)
+        return [insight["type"] for insight in (rule(stats) for rule in _INSIGHT_RULES) if insight]
+
+    @pytest.mark.parametrize("overrides, expected", [
+        ({}, []),
+        # Newest 100 against the 100 before them, more than 1.5x
+        ({"total": 150}, ["volume_increase"]),
+        ({"total": 166}, ["volume_increase"]),
+        ({"total": 167}, []),
+        ({"total": 10, "unread": 0}, []),
+        # More than 30% unread
+        ({"unread": 30}, []),
+        ({"unread": 31}, ["high_unread"]),
+        # One sender with more than 30% of the emails
+        ({"top_sender": "a", "top_sender_count": 30}, []),
+        ({"top_sender": "a", "top_sender_count": 31}, ["dominant_sender"]),
+        ({"peak_hour": 0, "peak_hour_count": 5}, ["peak_activity"]),
+        ({"important": 1}, ["important_emails"]),
+        ({"oldest": datetime(2024, 1, 1), "newest": datetime(2024, 1, 31)}, ["date_span"]),
+    ])
+    def test_insight_rule_thresholds(self, overrides, expected):
+        """Each rule fires only past its threshold."""
+        assert self._types(**overrides) == expected
+
+    def test_insight_rules_order(self):
+        """All firing rules are reported in _INSIGHT_RULES order."""
+        assert self._types(
+            total=150, unread=60, important=5, top_sender="a", top_sender_count=60,
+            peak_hour=9, peak_hour_count=20, oldest=datetime(2024, 1, 1), newest=datetime(2024, 2, 1)
+        ) == ["volume_increase", "high_unread", "dominant_sender", "peak_activity", "important_emails", "date_span"]
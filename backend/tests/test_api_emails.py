@@ -190,6 +190,34 @@ class TestEmailsAPI:
         response = client.get(f"/api/v1/emails/{email_id}")
         assert response.status_code == 404
     
+    def test_delete_test_email_releases_attachment_files(self, client: TestClient, db_session, sample_emails, tmp_path, monkeypatch):
+        """Deleting through /test/emails/{id} removes store files no other email references."""
+        import os
+        from app.models.email import EmailAttachment
+        from app.services import attachment_store
+
+        monkeypatch.setattr(attachment_store, "ATTACHMENTS_DIR", str(tmp_path))
+        shared = attachment_store.store_attachment(b"shared report")
+        own = attachment_store.store_attachment(b"invoice")
+        db_session.add_all([
+            EmailAttachment(email_id=sample_emails[0].id, filename="report.pdf",
+                            file_path=shared, checksum=os.path.basename(shared)),
+            EmailAttachment(email_id=sample_emails[0].id, filename="invoice.pdf",
+                            file_path=own, checksum=os.path.basename(own)),
+            EmailAttachment(email_id=sample_emails[1].id, filename="report.pdf",
+                            file_path=shared, checksum=os.path.basename(shared)),
+        ])
+        db_session.commit()
+
+        response = client.delete(f"/api/v1/test/emails/{sample_emails[0].id}")
+        assert response.status_code == 200
+        assert os.path.exists(shared)
+        assert not os.path.exists(own)
+
+        response = client.delete(f"/api/v1/test/emails/{sample_emails[1].id}")
+        assert response.status_code == 200
+        assert not os.path.exists(shared)
+    
     def test_bulk_update_emails(self, client: TestClient, sample_emails):
         """Test bulk updating emails."""
         email_ids = [sample_emails[0].id, sample_emails[1].id]
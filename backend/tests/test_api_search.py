@@ -411,3 +411,64 @@ class TestSearchAPI:
         """Test search suggestions with invalid limit."""
         response = client.get("/api/v1/search/suggestions?query=test&limit=0")
         assert response.status_code == 422  # Validation error
+
+
+class TestFastSearchAPI:
+    """Test suite for /search/fast and /db/direct-search matching."""
+
+    @pytest.mark.parametrize("path", ["/api/v1/test/search/fast", "/api/v1/test/db/direct-search"])
+    def test_partial_word_matches_body(self, client: TestClient, sample_emails, path):
+        """A word fragment found only in the body still matches (substring over the first 4 KB)."""
+        response = client.get(path, params={"q": "Weekl"})
+        assert response.status_code == 200
+
+        subjects = [email["subject"] for email in response.json()["emails"]]
+        assert "Newsletter" in subjects
+
+    @pytest.mark.parametrize("path", ["/api/v1/test/search/fast", "/api/v1/test/db/direct-search"])
+    def test_whole_word_phrase_matches_body(self, client: TestClient, sample_emails, path):
+        """Whole-word terms match the body, through the full-text branch as well."""
+        response = client.get(path, params={"q": "another test"})
+        assert response.status_code == 200
+
+        subjects = [email["subject"] for email in response.json()["emails"]]
+        assert "Test Email 2" in subjects
+        assert "Test Email 1" not in subjects
+
+    def test_cursor_pages_through_matches(self, client: TestClient, sample_emails):
+        """/search/fast returns an opaque next_cursor, as /db/direct-emails does, that continues the result list without repeats."""
+        first = client.get("/api/v1/test/search/fast", params={"q": "Test Email", "page_size": 1}).json()
+        cursor = first["next_cursor"]
+        assert isinstance(cursor, str)
+
+        second = client.get("/api/v1/test/search/fast", params={"q": "Test Email", "page_size": 1, "cursor": cursor}).json()
+        assert second["emails"]
+        assert second["emails"][0]["id"] != first["emails"][0]["id"]
+
+    def test_invalid_cursor(self, client: TestClient):
+        """A cursor that does not decode is rejected rather than ignored."""
+        response = client.get("/api/v1/test/search/fast", params={"q": "Test", "cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("path, params", [
+        ("/api/v1/test/search/fast", {"q": "Test Email"}),
+        ("/api/v1/test/emails/fast", {}),
+    ])
+    def test_last_page_has_no_cursor(self, client: TestClient, sample_emails, path, params):
+        """Pages are followed with the opaque cursor until one reports no next page."""
+        seen = []
+        cursor = None
+        for _ in range(100):
+            page_params = dict(params, page_size=1)
+            if cursor is not None:
+                page_params["cursor"] = cursor
+            data = client.get(path, params=page_params).json()
+            seen.extend(email["id"] for email in data["emails"])
+            cursor = data["next_cursor"]
+            assert data["has_more"] is (cursor is not None)
+            if cursor is None:
+                break
+            assert isinstance(cursor, str)
+
+        assert cursor is None
+        assert len(seen) == len(set(seen))
@@ -386,3 +386,55 @@ class TestSyncAPI:
                 assert isinstance(item["started_at"], str)
                 assert isinstance(item["completed_at"], str)
                 assert item["error"] is None or isinstance(item["error"], str)
+
+
+class TestEmailCountAPI:
+    """Test suite for the email total reported by the status endpoints."""
+
+    @pytest.mark.parametrize("path", ["/api/v1/test/sync/fast-status", "/api/v1/test/db/direct-count"])
+    def test_unanalyzed_table_reports_exact_count(self, client: TestClient, db_session, sample_emails, path):
+        """Before the first ANALYZE the planner estimate is -1; the shared exact count is reported instead."""
+        from sqlalchemy import text
+        from app.models.email import Email
+        from app.services.cache_service import invalidate_email_count_cache
+
+        invalidate_email_count_cache()
+        with patch("app.services.cache_service._ESTIMATE_EMAILS_SQL", text("SELECT -1::bigint")):
+            response = client.get(path)
+        invalidate_email_count_cache()
+
+        assert response.status_code == 200
+        assert response.json()["total_emails"] == db_session.query(Email).count()
+
+
+class TestRealTimeStatus:
+    """Test suite for the shared /sync/real-time-status snapshot."""
+
+    def test_concurrent_pollers_share_one_build(self):
+        """Concurrent requests wait on one build, which runs in a worker thread."""
+        import asyncio
+        import threading
+        import time
+        from fastapi import Response
+        from app.api import sync_control
+
+        builds = []
+
+        def build():
+            builds.append(threading.get_ident())
+            time.sleep(0.05)
+            return {"status": "success"}
+
+        async def run():
+            return await asyncio.gather(*(
+                sync_control.get_real_time_sync_status(Response()) for _ in range(5)
+            ))
+
+        sync_control._real_time_status_cache["expires_at"] = 0.0
+        with patch.object(sync_control, "_build_real_time_sync_status", build):
+            results = asyncio.run(run())
+        sync_control._real_time_status_cache["expires_at"] = 0.0
+
+        assert results == [{"status": "success"}] * 5
+        assert len(builds) == 1
+        assert builds[0] != threading.get_ident()
@@ -1,8 +1,9 @@
 import pytest
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models.email import Email, EmailAttachment
+from datetime import datetime, timedelta, timezone
+from app.models.email import Email, EmailAttachment, EmailLabelLink, EmailScoreCount, SenderCount
 from app.models.user import User
+from app.models.sync_session import SyncSession
 from app.models.database import Base, engine
 
 class TestEmailModel:
@@ -297,6 +298,124 @@ class TestEmailAttachmentModel:
         assert "test_document.pdf" in attachment_str
 
 
+class TestSenderCountModel:
+    """Test suite for SenderCount model."""
+
+    def test_trigger_tracks_sender_totals(self, db_session):
+        """Inserting and deleting emails keeps sender_counts in step."""
+        senders = ["sender-counts-a@example.com", "sender-counts-b@example.com"]
+        emails = [
+            Email(gmail_id=f"sender_counts_{i}", subject="Counted", sender=sender)
+            for i, sender in enumerate([senders[0], senders[1], senders[1]])
+        ]
+        db_session.add_all(emails)
+        db_session.commit()
+
+        try:
+            top = db_session.query(SenderCount).filter(
+                SenderCount.sender.in_(senders)
+            ).order_by(SenderCount.count.desc()).all()
+            assert [(row.sender, row.count) for row in top] == [(senders[1], 2), (senders[0], 1)]
+            assert senders[1] in str(top[0])
+
+            db_session.delete(emails[1])
+            db_session.commit()
+            db_session.refresh(top[0])
+            assert top[0].count == 1
+        finally:
+            # The session does not roll back between tests; leave no rows behind
+            db_session.query(Email).filter(
+                Email.gmail_id.in_([email.gmail_id for email in emails])
+            ).delete(synchronize_session=False)
+            db_session.query(SenderCount).filter(
+                SenderCount.sender.in_(senders)
+            ).delete(synchronize_session=False)
+            db_session.commit()
+
+
+class TestEmailScoreCountModel:
+    """Test suite for EmailScoreCount model."""
+
+    def test_trigger_tracks_score_totals(self, db_session):
+        """Email inserts and score updates move totals between buckets, including the unanalysed one."""
+        category = "score-counts-test"
+        emails = [
+            Email(gmail_id=f"score_counts_{i}", subject="Scored", sender="scores@example.com",
+                  category=category, sentiment_score=None, priority_score=None)
+            for i in range(3)
+        ]
+        db_session.add_all(emails)
+        db_session.commit()
+
+        def buckets():
+            db_session.expire_all()
+            return {
+                (row.sentiment_score, row.priority_score): row.count
+                for row in db_session.query(EmailScoreCount).filter(
+                    EmailScoreCount.category == category,
+                    EmailScoreCount.count > 0
+                )
+            }
+
+        try:
+            assert buckets() == {(None, None): 3}
+
+            emails[0].sentiment_score = 1
+            emails[0].priority_score = 8
+            db_session.commit()
+            assert buckets() == {(None, None): 2, (1, 8): 1}
+
+            unanalysed = db_session.query(EmailScoreCount).filter(
+                EmailScoreCount.category == category,
+                EmailScoreCount.sentiment_score.is_(None)
+            ).one()
+            assert "count=2" in str(unanalysed)
+        finally:
+            # The session does not roll back between tests; leave no rows behind
+            db_session.query(Email).filter(
+                Email.gmail_id.in_([email.gmail_id for email in emails])
+            ).delete(synchronize_session=False)
+            db_session.query(EmailScoreCount).filter(
+                EmailScoreCount.category == category
+            ).delete(synchronize_session=False)
+            db_session.commit()
+
+
+class TestEmailLabelLinkModel:
+    """Test suite for EmailLabelLink model."""
+
+    def test_trigger_links_labels(self, db_session):
+        """Links follow the email's labels array on insert, update and delete."""
+        email = Email(
+            gmail_id="label_link_email",
+            subject="Labelled",
+            sender="sender@example.com",
+            labels=["INBOX", "IMPORTANT"]
+        )
+        db_session.add(email)
+        db_session.commit()
+        email_id = email.id
+
+        def links():
+            return db_session.query(EmailLabelLink).filter(
+                EmailLabelLink.email_id == email_id
+            ).order_by(EmailLabelLink.label).all()
+
+        try:
+            assert [link.label for link in links()] == ["IMPORTANT", "INBOX"]
+            assert "INBOX" in str(links()[1])
+
+            email.labels = ["INBOX", "STARRED"]
+            db_session.commit()
+            assert [link.label for link in links()] == ["INBOX", "STARRED"]
+        finally:
+            # The session does not roll back between tests; the links cascade
+            db_session.delete(email)
+            db_session.commit()
+
+        assert links() == []
+
+
 class TestUserModel:
     """Test suite for User model."""
     
@@ -551,3 +670,23 @@ class TestDatabaseModels:
             Email.gmail_id == "rollback_test"
         ).first()
         assert email2_check is None
+
+
+class TestSyncSessionModel:
+    """Test suite for SyncSession model."""
+
+    def test_mark_completed_records_duration(self):
+        """Completing a session stores its elapsed time rather than 0."""
+        session = SyncSession(
+            user_id=1,
+            sync_type="full",
+            sync_source="test",
+            status="running",
+            started_at=datetime.now(timezone.utc) - timedelta(seconds=90)
+        )
+
+        session.mark_completed()
+
+        assert session.status == "completed"
+        assert 89 <= session.total_duration_seconds <= 92
+        assert session.duration_seconds == session.total_duration_seconds
@@ -1,13 +1,23 @@
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # Import services
+from app.models.email import Email, EmailAttachment
 from app.services.email_service import EmailService
 from app.services.gmail_service import GmailService
 from app.services.search_service import SearchService
 from app.services.ai_service import AIService
+from app.services import attachment_store
+from app.services.cache_service import (
+    TTLCache, cached_response, get_email_count_cached, get_email_count_estimate,
+    invalidate_email_count_cache, peek_email_count
+)
+from app.services.sync_session_service import SyncSessionService, _pending_progress
+from app.services.sync_service import OptimizedSyncService
+from app.services.sync_progress_listener import CLIENT_QUEUE_SIZE, SyncProgressListener
 
 class TestEmailService:
     """Test suite for EmailService."""
@@ -413,3 +423,447 @@ class TestAIService:
         assert "people" in entities
         assert "organizations" in entities
         assert "locations" in entities
+
+
+class TestCacheService:
+    """Test suite for the in-process TTL cache."""
+
+    def test_get_and_expire(self):
+        """Entries are returned until their TTL elapses."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=0)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("missing", "default") == "default"
+
+    def test_evicts_least_recently_used(self):
+        """The least recently used entry is dropped once maxsize is exceeded."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_cached_response(self):
+        """Results are reused per parameter set; errors and cached=False are not cached."""
+        import asyncio
+
+        cache = TTLCache(maxsize=8, ttl=60)
+        calls = []
+
+        @cached_response(cache)
+        async def endpoint(days: int = 30, cached: bool = True, db=None):
+            calls.append(days)
+            if days < 0:
+                return {"error": "bad", "status": "error"}
+            return {"days": days}
+
+        async def run():
+            assert await endpoint(days=7, db=object()) == {"days": 7}
+            assert await endpoint(days=7, db=object()) == {"days": 7}
+            await endpoint(days=30)
+            await endpoint(days=-1)
+            await endpoint(days=-1)
+            await endpoint(days=7, cached=False)
+
+        asyncio.run(run())
+        assert calls == [7, 30, -1, -1, 7]
+
+    def test_cached_response_etag(self):
+        """Endpoints taking request/response get an ETag and a 304 on a matching If-None-Match."""
+        import asyncio
+        from fastapi import Request, Response
+
+        cache = TTLCache(maxsize=8, ttl=30)
+
+        @cached_response(cache)
+        async def endpoint(request: Request, response: Response, db=None):
+            return {"total": 3}
+
+        def make_request(headers=()):
+            return Request({"type": "http", "method": "GET", "path": "/", "headers": list(headers)})
+
+        async def run():
+            first = Response()
+            assert await endpoint(request=make_request(), response=first) == {"total": 3}
+            etag = first.headers["etag"]
+            assert etag.startswith('W/"')
+            assert first.headers["cache-control"] == "public, max-age=30"
+
+            revalidated = await endpoint(
+                request=make_request([(b"if-none-match", etag.encode())]),
+                response=Response()
+            )
+            assert revalidated.status_code == 304
+            assert revalidated.headers["etag"] == etag
+
+        asyncio.run(run())
+
+    def test_cached_response_runs_sync_endpoints_in_a_thread(self):
+        """A plain def endpoint is cached too, and runs off the event loop thread."""
+        import asyncio
+        import threading
+
+        cache = TTLCache(maxsize=8, ttl=60)
+        threads = []
+
+        @cached_response(cache)
+        def endpoint(days: int = 30, db=None):
+            threads.append(threading.get_ident())
+            return {"days": days}
+
+        async def run():
+            assert await endpoint(days=7) == {"days": 7}
+            assert await endpoint(days=7) == {"days": 7}
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+        assert len(threads) == 1
+        assert threads[0] != loop_thread
+
+    def test_email_count_is_shared(self, db_session, sample_emails):
+        """One exact count serves every caller until invalidated."""
+        invalidate_email_count_cache()
+        assert peek_email_count() is None
+
+        count, counted_at = get_email_count_cached(db_session)
+        assert count >= len(sample_emails)
+        assert peek_email_count() == count
+        assert get_email_count_cached(db_session) == (count, counted_at)
+
+        invalidate_email_count_cache()
+        assert peek_email_count() is None
+
+    def test_email_count_estimate_falls_back_to_count(self, db_session, sample_emails):
+        """Until the table has been analyzed the estimate is the exact count."""
+        invalidate_email_count_cache()
+        db_session.execute(text("ANALYZE emails"))
+        estimate, estimated = get_email_count_estimate(db_session)
+        assert estimated
+        assert estimate > 0
+
+        # reltuples is -1 until the first ANALYZE
+        with patch("app.services.cache_service._ESTIMATE_EMAILS_SQL", text("SELECT -1::bigint")):
+            count, estimated = get_email_count_estimate(db_session)
+        assert not estimated
+        assert count == db_session.query(Email).count()
+        invalidate_email_count_cache()
+
+
+class TestAttachmentStore:
+    """Test suite for the content-addressed attachment store."""
+
+    def test_identical_attachments_share_one_file(self, tmp_path, monkeypatch):
+        """Storing the same bytes twice returns the same path and writes one file."""
+        import os
+
+        monkeypatch.setattr(attachment_store, "ATTACHMENTS_DIR", str(tmp_path))
+
+        first = attachment_store.store_attachment(b"report contents")
+        second = attachment_store.store_attachment(b"report contents")
+
+        assert first == second
+        with open(first, "rb") as f:
+            assert f.read() == b"report contents"
+        assert len(list(tmp_path.rglob("*"))) == 2  # one prefix directory, one file
+
+        attachment_store.remove_attachment(first)
+        attachment_store.remove_attachment(first)
+        assert not os.path.exists(first)
+
+    def test_release_keeps_file_committed_meanwhile(self, tmp_path, monkeypatch):
+        """A row committed between the two reference checks keeps its file."""
+        import os
+
+        monkeypatch.setattr(attachment_store, "ATTACHMENTS_DIR", str(tmp_path))
+        kept = attachment_store.store_attachment(b"shared report")
+        released = attachment_store.store_attachment(b"orphan")
+        kept_checksum = os.path.basename(kept)
+
+        # Nothing references either file at first; the shared one gains a row before the re-check
+        with patch.object(attachment_store, "_referenced_checksums", side_effect=[set(), {kept_checksum}]):
+            attachment_store.release_attachments(None, [kept_checksum, os.path.basename(released)])
+
+        assert os.path.exists(kept)
+        assert not os.path.exists(released)
+        assert not list(tmp_path.rglob(".release-*"))
+
+    def test_restore_stores_released_files_again(self, tmp_path, monkeypatch):
+        """Committed attachments whose file was released are downloaded and stored again."""
+        import os
+
+        monkeypatch.setattr(attachment_store, "ATTACHMENTS_DIR", str(tmp_path))
+        path = attachment_store.store_attachment(b"report contents")
+        present = attachment_store.store_attachment(b"invoice")
+        attachment_store.remove_attachment(path)
+        download = MagicMock(return_value=b"report contents")
+
+        attachment_store.restore_attachments([
+            {"file_path": path, "checksum": os.path.basename(path)},
+            {"file_path": present, "checksum": os.path.basename(present)},
+        ], download)
+
+        download.assert_called_once()
+        with open(path, "rb") as f:
+            assert f.read() == b"report contents"
+
+class TestOptimizedSyncService:
+    """Test suite for the batched inserts of a synced Gmail page."""
+
+    @pytest.fixture
+    def sync_service(self, db_session, tmp_path, monkeypatch):
+        """Sync service writing to the test database and a temporary attachment store."""
+        monkeypatch.setattr("app.services.sync_service.SessionLocal", sessionmaker(bind=db_session.get_bind()))
+        monkeypatch.setattr(attachment_store, "ATTACHMENTS_DIR", str(tmp_path))
+        yield OptimizedSyncService()
+
+        batch_ids = db_session.query(Email.id).filter(Email.gmail_id.like("batch-%"))
+        db_session.query(EmailAttachment).filter(
+            EmailAttachment.email_id.in_(batch_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+        batch_ids.delete(synchronize_session=False)
+        db_session.commit()
+
+    @staticmethod
+    def _email_data(gmail_id, attachment=None, **overrides):
+        data = {
+            "gmail_id": gmail_id,
+            "thread_id": gmail_id,
+            "subject": f"Batch {gmail_id}",
+            "sender": "batch@example.com",
+            "date_received": datetime.now(timezone.utc),
+            "attachments": [],
+        }
+        if attachment is not None:
+            path = attachment_store.store_attachment(attachment)
+            data["attachments"].append({
+                "filename": "report.pdf",
+                "content_type": "application/pdf",
+                "size": len(attachment),
+                "file_path": path,
+                "checksum": path.rsplit("/", 1)[-1],
+            })
+        data.update(overrides)
+        return data
+
+    def test_inserts_new_emails_with_attachments(self, sync_service, db_session):
+        """Stored emails are skipped without a fetch; the rest are inserted with their attachments."""
+        with patch.object(sync_service, "_fetch_email_data", side_effect=lambda message_id, user: self._email_data(message_id)):
+            assert sync_service._process_email_batch(None, ["batch-1"]) == (1, 0, None)
+
+        pages = {"batch-2": self._email_data("batch-2", attachment=b"quarterly report"), "batch-3": self._email_data("batch-3")}
+        with patch.object(sync_service, "_fetch_email_data", side_effect=lambda message_id, user: pages[message_id]) as fetch:
+            assert sync_service._process_email_batch(None, ["batch-1", "batch-2", "batch-3"]) == (2, 0, None)
+        assert [call.args[0] for call in fetch.call_args_list] == ["batch-2", "batch-3"]
+
+        email = db_session.query(Email).filter(Email.gmail_id == "batch-2").one()
+        assert [attachment.filename for attachment in email.attachments] == ["report.pdf"]
+
+    def test_conflicting_email_releases_its_attachment(self, sync_service, db_session):
+        """An email another sync stored meanwhile is skipped and its unreferenced file removed."""
+        import os
+
+        data = self._email_data("batch-4", attachment=b"duplicate invoice")
+
+        def fetch(message_id, user):
+            db_session.add(Email(gmail_id=message_id, subject="Stored meanwhile"))
+            db_session.commit()
+            return data
+
+        with patch.object(sync_service, "_fetch_email_data", side_effect=fetch):
+            assert sync_service._process_email_batch(None, ["batch-4"]) == (0, 0, None)
+        assert not os.path.exists(data["attachments"][0]["file_path"])
+
+    def test_failed_emails_are_counted_and_reported(self, sync_service, db_session):
+        """A row the database rejects is retried alone, counted, reported and its file released."""
+        import os
+
+        pages = {
+            "batch-5": self._email_data("batch-5", attachment=b"broken email", date_received="not a date"),
+            "batch-6": self._email_data("batch-6"),
+            "batch-7": None,
+        }
+        with patch.object(sync_service, "_fetch_email_data", side_effect=lambda message_id, user: pages[message_id]):
+            synced, failed, last_error = sync_service._process_email_batch(None, ["batch-7", "batch-5", "batch-6"])
+
+        assert (synced, failed) == (1, 2)
+        assert last_error and "batch-7" not in last_error
+        assert db_session.query(Email).filter(Email.gmail_id == "batch-6").count() == 1
+        assert not os.path.exists(pages["batch-5"]["attachments"][0]["file_path"])
+
+
+class TestSyncProgressListener:
+    """Test suite for the shared sync progress LISTEN fan-out."""
+
+    def test_fans_out_to_bounded_queues(self):
+        """Every client gets each payload; a full queue drops its oldest event."""
+        import asyncio
+
+        async def run():
+            listener = SyncProgressListener()
+            slow = listener.subscribe()
+            fast = listener.subscribe()
+
+            for i in range(CLIENT_QUEUE_SIZE + 2):
+                listener._dispatch(None, 0, "sync_progress", str(i))
+                if i == 0:
+                    assert await fast.get() == "0"
+
+            assert slow.qsize() == CLIENT_QUEUE_SIZE
+            assert slow.get_nowait() == "2"
+
+            listener.unsubscribe(slow)
+            listener.unsubscribe(slow)
+            listener._dispatch(None, 0, "sync_progress", "last")
+            assert slow.qsize() == CLIENT_QUEUE_SIZE - 1
+            assert fast.qsize() == CLIENT_QUEUE_SIZE
+
+        asyncio.run(run())
+
+    def test_session_update_reaches_subscribers(self, db_session, test_user):
+        """A committed sync_sessions UPDATE is published by the notify trigger and fanned out."""
+        import asyncio
+        import json
+
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+
+        def update_session():
+            sync_session.emails_synced = 42
+            db_session.commit()
+
+        async def run():
+            listener = SyncProgressListener(
+                db_session.get_bind().url.render_as_string(hide_password=False)
+            )
+            await listener.start()
+            queue = listener.subscribe()
+            try:
+                await asyncio.to_thread(update_session)
+                while True:
+                    payload = json.loads(await asyncio.wait_for(queue.get(), 5))
+                    if payload["id"] == sync_session.id:
+                        return payload
+            finally:
+                listener.unsubscribe(queue)
+                await listener.stop()
+
+        payload = asyncio.run(run())
+        assert payload["emails_synced"] == 42
+        assert SyncSessionService.complete_sync_session(sync_session.id, db=db_session)
+
+
+class TestSyncSessionService:
+    """Test suite for sync session progress tracking."""
+
+    def test_progress_updates_are_buffered(self, db_session, test_user):
+        """Progress within the flush interval is held back and written on completion."""
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+
+        assert SyncSessionService.update_sync_progress(sync_session.id, emails_synced=10, db=db_session)
+        assert SyncSessionService.update_sync_progress(sync_session.id, emails_synced=20, db=db_session)
+
+        db_session.refresh(sync_session)
+        assert sync_session.status == 'running'
+        assert sync_session.emails_synced == 10
+
+        assert SyncSessionService.complete_sync_session(sync_session.id, db=db_session)
+        db_session.refresh(sync_session)
+        assert sync_session.status == 'completed'
+        assert sync_session.emails_synced == 20
+
+    def test_buffered_updates_are_coalesced(self, db_session, test_user):
+        """Updates within the interval merge field by field; failing the session writes them."""
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=10, db=db_session)
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=20, emails_processed=25, db=db_session)
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=30, db=db_session)
+
+        assert SyncSessionService.fail_sync_session(sync_session.id, "Gmail API error", db=db_session)
+        db_session.refresh(sync_session)
+        assert sync_session.status == 'failed'
+        assert sync_session.emails_synced == 30
+        assert sync_session.emails_processed == 25
+        assert sync_session.id not in _pending_progress
+
+    def test_trailing_update_is_flushed(self, db_session, test_user, monkeypatch):
+        """The last update inside the interval is written once the interval is up."""
+        import time
+
+        monkeypatch.setattr("app.services.sync_session_service.PROGRESS_FLUSH_INTERVAL", 0.05)
+        # The timer writes through its own session
+        monkeypatch.setattr("app.services.sync_session_service.SessionLocal", sessionmaker(bind=db_session.get_bind()))
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=10, db=db_session)
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=20, db=db_session)
+        time.sleep(0.5)
+
+        db_session.refresh(sync_session)
+        assert sync_session.emails_synced == 20
+        assert SyncSessionService.complete_sync_session(sync_session.id, db=db_session)
+
+    def test_late_flush_does_not_overwrite_final_counts(self, db_session, test_user):
+        """A progress write arriving after completion leaves the session's final counts alone."""
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=10, db=db_session)
+        assert SyncSessionService.complete_sync_session(
+            sync_session.id, final_stats={"emails_synced": 50}, db=db_session
+        )
+
+        assert not SyncSessionService._write_progress(sync_session.id, {"emails_synced": 30}, db_session)
+        db_session.refresh(sync_session)
+        assert sync_session.status == 'completed'
+        assert sync_session.emails_synced == 50
+        assert sync_session.id not in _pending_progress
+
+    def test_failed_write_is_kept_for_the_next_flush(self, db_session, test_user):
+        """Progress whose UPDATE fails goes back into the buffer instead of being lost."""
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=10, db=db_session)
+
+        broken_db = MagicMock()
+        broken_db.execute.side_effect = RuntimeError("connection lost")
+        assert not SyncSessionService._write_progress(sync_session.id, {"emails_synced": 40}, broken_db)
+        assert _pending_progress[sync_session.id] == {"emails_synced": 40}
+
+        assert SyncSessionService.complete_sync_session(sync_session.id, db=db_session)
+        db_session.refresh(sync_session)
+        assert sync_session.emails_synced == 40
+
+    def test_stale_session_cleanup_flushes_buffer(self, db_session, test_user):
+        """Closing a stale session writes its buffered progress and drops the entry."""
+        sync_session = SyncSessionService.create_sync_session(
+            user=test_user, sync_type='full', db=db_session
+        )
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=10, db=db_session)
+        SyncSessionService.update_sync_progress(sync_session.id, emails_synced=20, db=db_session)
+
+        sync_session.started_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        db_session.commit()
+
+        assert SyncSessionService.cleanup_stale_sessions(timeout_minutes=30, db=db_session) >= 1
+        db_session.refresh(sync_session)
+        assert sync_session.status == 'failed'
+        assert sync_session.emails_synced == 20
+        assert sync_session.id not in _pending_progress
+        assert sync_session.total_duration_seconds >= 2 * 3600 - 60